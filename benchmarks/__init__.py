@@ -0,0 +1,5 @@
+"""
+Offline benchmarks run against the stand-in servers in tests/servers.
+
+Run from the repository root, e.g.: python -m benchmarks.bench_dawgpath --help
+"""
@@ -0,0 +1,76 @@
+"""
+Benchmark the crawl pipeline against the stand-in schedule server.
+
+Crawls one synthetic page per department into an in-memory SQLite store with
+each number of parse processes, and reports pages/s and every stage's
+throughput, busy share and peak queue depth.
+
+Usage:
+    python -m benchmarks.bench_crawl
+    python -m benchmarks.bench_crawl --latency 0.2 --courses 200 --parse-workers 0 1 4
+"""
+
+import argparse
+import os
+import time
+from typing import List
+
+from swecc_course_scraper.commands import schedule
+from swecc_course_scraper.crawl import CrawlJob, CrawlManifest, Pipeline
+from swecc_course_scraper.crawl.pipeline import format_stages
+from swecc_course_scraper.export import SQLiteStore
+from swecc_course_scraper.fetch import Fetcher, set_default_fetcher
+from tests.servers.schedule import ScheduleServer
+
+
+def _run(jobs: List[CrawlJob], fetch_workers: int, parse_workers: int) -> None:
+    with SQLiteStore() as store:
+        pipeline = Pipeline(
+            store,
+            CrawlManifest(),
+            fetch_workers=fetch_workers,
+            parse_workers=parse_workers,
+        )
+        start = time.perf_counter()
+        stats = pipeline.run(jobs)
+        elapsed = time.perf_counter() - start
+    print(
+        f"\nparse_workers={parse_workers}: {stats.done} pages in {elapsed:.3f}s"
+        f" ({stats.done / elapsed:.1f} pages/s, {stats.failed} failed)"
+    )
+    print(format_stages(stats.stages))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.05, help="Seconds per response"
+    )
+    parser.add_argument("--departments", type=int, default=40)
+    parser.add_argument("--courses", type=int, default=100, help="Courses per page")
+    parser.add_argument("--workers", type=int, default=8, help="Fetch threads")
+    parser.add_argument("--parse-workers", type=int, nargs="+", default=[0, 2, 4])
+    args = parser.parse_args()
+
+    with ScheduleServer(latency=args.latency, pages_dir=None) as server:
+        jobs = []
+        for i in range(args.departments):
+            department = f"dept{chr(ord('a') + i % 26)}{chr(ord('a') + i // 26)}"
+            server.synthesize(department, "WIN", 2023, args.courses)
+            jobs.append(CrawlJob(department, "WIN", 2023))
+
+        os.environ[schedule.SCHEDULE_ENV] = server.schedule_url
+        # Without the default rate limit, which would cap every run at its rate
+        set_default_fetcher(Fetcher())
+        print(
+            f"latency={args.latency}s pages={len(jobs)} courses={args.courses}"
+            f" fetch_workers={args.workers}"
+        )
+        for parse_workers in args.parse_workers:
+            _run(jobs, args.workers, parse_workers)
+
+
+if __name__ == "__main__":
+    main()
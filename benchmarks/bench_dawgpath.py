@@ -0,0 +1,114 @@
+"""
+Benchmark DawgPath client throughput and cache effectiveness against the stand-in API.
+
+The stand-in can throttle (429) and reject sessions (401). The client retries
+throttled requests and logs in again after a rejection; the report counts both,
+and rounds cut short by a request that still failed.
+
+Usage:
+    python -m benchmarks.bench_dawgpath
+    python -m benchmarks.bench_dawgpath --latency 0.1 --lookups 400 --workers 1 8 32
+    python -m benchmarks.bench_dawgpath --rate-limit 20 --unauthorized-rate 0.05
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from typing import List
+
+from swecc_course_scraper.cache import TTLCache
+from swecc_course_scraper.client import DawgPathClient
+from swecc_course_scraper.paths import DATA_DIR_ENV
+from tests.servers.dawgpath import DawgPathServer
+
+DEPARTMENTS = ["cse", "math", "chem", "biol", "phys", "engl", "econ", "stat"]
+
+
+def _search_strings(lookups: int, duplicate_ratio: float) -> List[str]:
+    """Distinct search strings, with a share of them repeated as a real workload would."""
+    unique = max(1, int(lookups * (1 - duplicate_ratio)))
+    strings = [
+        f"{DEPARTMENTS[i % len(DEPARTMENTS)]} {100 + i // len(DEPARTMENTS)}"
+        for i in range(unique)
+    ]
+    return [strings[i % unique] for i in range(lookups)]
+
+
+def _run(
+    server: DawgPathServer, workers: int, searches: List[str], rounds: int, cached: bool
+) -> None:
+    cache = TTLCache(ttl=3600) if cached else None
+    server.requests = server.throttled = server.unauthorized = 0
+    failed = 0
+    with DawgPathClient(
+        server.make_session(),
+        root=server.url,
+        max_workers=workers,
+        relogin=server.make_session,
+        cache=cache,
+    ) as client:
+        start = time.perf_counter()
+        for _ in range(rounds):
+            try:
+                client.search_many(searches)
+            except (ConnectionError, PermissionError):
+                failed += 1
+        elapsed = time.perf_counter() - start
+
+    lookups = len(searches) * rounds
+    hit_ratio = f"{cache.stats.hit_ratio:6.1%}" if cache else "     -"
+    print(
+        f"{workers:>7}  {'yes' if cached else 'no':>6}  {lookups:>7}  {server.requests:>8}"
+        f"  {elapsed:>8.3f}  {lookups / elapsed:>9.1f}  {hit_ratio:>9}"
+        f"  {server.throttled:>4}  {server.unauthorized:>4}  {failed:>6}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.05, help="Server latency per request (s)"
+    )
+    parser.add_argument("--lookups", type=int, default=200, help="Searches per round")
+    parser.add_argument(
+        "--rounds", type=int, default=3, help="Times the workload is repeated"
+    )
+    parser.add_argument(
+        "--duplicates", type=float, default=0.25, help="Share of repeated searches"
+    )
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8, 16])
+    parser.add_argument(
+        "--rate-limit", type=int, default=None, help="Server requests/second limit"
+    )
+    parser.add_argument(
+        "--unauthorized-rate",
+        type=float,
+        default=0.0,
+        help="Share of requests the server answers with 401",
+    )
+    args = parser.parse_args()
+
+    searches = _search_strings(args.lookups, args.duplicates)
+    print(f"latency={args.latency}s lookups/round={args.lookups} rounds={args.rounds}")
+    print(
+        "workers  cached  lookups  requests  elapsed_s  lookups/s  hit_ratio"
+        "   429   401  failed"
+    )
+    # Logging in again clears the saved session, so keep the real one out of reach
+    with tempfile.TemporaryDirectory() as data_dir:
+        os.environ[DATA_DIR_ENV] = data_dir
+        with DawgPathServer(
+            latency=args.latency,
+            unauthorized_rate=args.unauthorized_rate,
+            rate_limit=args.rate_limit,
+        ) as server:
+            for workers in args.workers:
+                for cached in (False, True):
+                    _run(server, workers, searches, args.rounds, cached)
+
+
+if __name__ == "__main__":
+    main()
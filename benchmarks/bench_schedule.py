@@ -0,0 +1,85 @@
+"""
+Benchmark time schedule fetching against the stand-in schedule server.
+
+Fetches one synthetic page per (department, quarter) through schedule.command,
+serially and with a thread pool, and reports pages/s and failures by type.
+
+Usage:
+    python -m benchmarks.bench_schedule
+    python -m benchmarks.bench_schedule --latency 0.2 --bandwidth 200000 --error-rate 0.05
+"""
+
+import argparse
+import os
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+from swecc_course_scraper.commands import schedule
+from tests.servers.schedule import ScheduleServer
+
+Page = Tuple[str, str, int]
+
+
+def _fetch(page: Page) -> Optional[str]:
+    """Fetch one page, returning the name of the exception raised, if any."""
+    try:
+        schedule.command(*page)
+    except (FileNotFoundError, ConnectionError) as e:
+        return type(e).__name__
+    return None
+
+
+def _run(pages: List[Page], workers: int) -> None:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        failures = Counter(error for error in executor.map(_fetch, pages) if error)
+    elapsed = time.perf_counter() - start
+    failed = ", ".join(f"{name}={count}" for name, count in failures.items()) or "-"
+    print(
+        f"{workers:>7}  {len(pages):>5}  {elapsed:>9.3f}  {len(pages) / elapsed:>7.1f}"
+        f"  {failed}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.05, help="Seconds per response"
+    )
+    parser.add_argument(
+        "--bandwidth", type=int, default=None, help="Bytes/second per page"
+    )
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of 5xx")
+    parser.add_argument("--reset-rate", type=float, default=0.0, help="Share of resets")
+    parser.add_argument("--departments", type=int, default=10)
+    parser.add_argument("--courses", type=int, default=40, help="Courses per page")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 16])
+    args = parser.parse_args()
+
+    with ScheduleServer(
+        latency=args.latency,
+        bandwidth=args.bandwidth,
+        error_rate=args.error_rate,
+        reset_rate=args.reset_rate,
+        pages_dir=None,
+    ) as server:
+        pages: List[Page] = []
+        for i in range(args.departments):
+            for quarter in schedule.VALID_QUARTERS:
+                department = f"dept{chr(ord('a') + i % 26)}"
+                server.synthesize(department, quarter, 2023, args.courses)
+                pages.append((department, quarter, 2023))
+
+        os.environ[schedule.SCHEDULE_ENV] = server.schedule_url
+        print(f"latency={args.latency}s bandwidth={args.bandwidth} pages={len(pages)}")
+        print("workers  pages  elapsed_s  pages/s  failures")
+        for workers in args.workers:
+            _run(pages, workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+In-memory TTL cache with stale-while-revalidate.
+
+Each entry is fresh for its TTL, then stale for a further grace period
+during which reads still return it immediately while a background thread
+reloads it. Entries older than that are treated as missing.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Generic, Hashable, Optional, Set, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+DEFAULT_MAX_ENTRIES = 4096
+
+
+@dataclass
+class CacheStats:
+    """
+    Counters describing how a cache has been used.
+    """
+
+    hits: int = 0  # Fresh entries returned
+    stale_hits: int = 0  # Stale entries returned while a refresh ran
+    misses: int = 0  # Lookups with no usable entry
+    refreshes: int = 0  # Background refreshes completed
+    refresh_errors: int = 0  # Background refreshes that raised (stale value kept)
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.stale_hits + self.misses
+        return (self.hits + self.stale_hits) / lookups if lookups else 0.0
+
+
+@dataclass
+class _Entry(Generic[V]):
+    value: V
+    stored_at: float
+    ttl: float
+    stale_ttl: float
+
+
+class TTLCache(Generic[K, V]):
+    """
+    Thread-safe LRU cache whose entries expire after a per-entry TTL.
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        stale_ttl: float = 0.0,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Args:
+            ttl: Default seconds an entry is fresh.
+            stale_ttl: Default seconds after that an entry may still be served while it
+                is refreshed in the background.
+            max_entries: Least recently used entries are evicted beyond this size.
+            clock: Time source, in seconds.
+        """
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.stats = CacheStats()
+        self._clock = clock
+        self._entries: OrderedDict[K, _Entry[V]] = OrderedDict()
+        self._refreshing: Set[K] = set()
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def get(self, key: K, refresh: Optional[Callable[[], V]] = None) -> Optional[V]:
+        """
+        Return the cached value for key, or None if it is missing or expired.
+
+        Args:
+            key: The cache key.
+            refresh: Reloads the value. If given and the entry is stale, it is called in
+                a background thread and its result replaces the entry.
+
+        Returns:
+            Optional[V]: The fresh or stale value, or None.
+        """
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            age = now - entry.stored_at if entry is not None else 0.0
+            if entry is None or age >= entry.ttl + entry.stale_ttl:
+                self.stats.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            if age < entry.ttl:
+                self.stats.hits += 1
+                return entry.value
+
+            self.stats.stale_hits += 1
+            if refresh is not None and key not in self._refreshing:
+                self._refreshing.add(key)
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=2, thread_name_prefix="cache-refresh"
+                    )
+                self._executor.submit(
+                    self._refresh, key, refresh, entry.ttl, entry.stale_ttl
+                )
+            return entry.value
+
+    def set(
+        self,
+        key: K,
+        value: V,
+        ttl: Optional[float] = None,
+        stale_ttl: Optional[float] = None,
+    ) -> None:
+        """
+        Store a value, overriding the default TTLs if given.
+        """
+        entry = _Entry(
+            value=value,
+            stored_at=self._clock(),
+            ttl=self.ttl if ttl is None else ttl,
+            stale_ttl=self.stale_ttl if stale_ttl is None else stale_ttl,
+        )
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_load(
+        self,
+        key: K,
+        loader: Callable[[], V],
+        ttl: Optional[float] = None,
+        stale_ttl: Optional[float] = None,
+    ) -> V:
+        """
+        Return the cached value, loading (and storing) it on a miss.
+
+        Stale values are returned immediately and reloaded in the background.
+        """
+        value = self.get(key, refresh=loader)
+        if value is None:
+            value = loader()
+            self.set(key, value, ttl, stale_ttl)
+        return value
+
+    def invalidate(self, key: K) -> None:
+        """Drop one entry."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop every entry (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _refresh(
+        self, key: K, loader: Callable[[], V], ttl: float, stale_ttl: float
+    ) -> None:
+        try:
+            value = loader()
+        except Exception:
+            logging.exception(f"Background refresh failed for {key!r}")
+            with self._lock:
+                self.stats.refresh_errors += 1
+        else:
+            self.set(key, value, ttl, stale_ttl)
+            with self._lock:
+                self.stats.refreshes += 1
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
@@ -1,18 +1,80 @@
 import argparse
+import importlib
+import sys
+from typing import Any, Callable, Dict, List, Optional
 
-from swecc_course_scraper.commands.frequency import DEFAULT_YEARS_CHECK
-from swecc_course_scraper.commands.frequency import command as frequency
-from swecc_course_scraper.commands.login import command as login
-from swecc_course_scraper.commands.schedule import command as schedule
+from swecc_course_scraper.constants import (
+    DEFAULT_BUDGET,
+    DEFAULT_INTERVAL,
+    DEFAULT_WORKERS,
+    DEFAULT_YEARS_CHECK,
+    EARLIEST_RECORDED_YEAR,
+    MATRIX_FORMATS,
+    OUTPUT_FORMATS,
+)
 
+# Command modules, imported only when their command is dispatched so that short
+# invocations (e.g. --schedule) never pay for importing Selenium (used by login).
+COMMANDS: Dict[str, str] = {
+    "login": "swecc_course_scraper.commands.login",
+    "schedule": "swecc_course_scraper.commands.schedule",
+    "frequency": "swecc_course_scraper.commands.frequency",
+    "frequency_dept": "swecc_course_scraper.commands.frequency_dept",
+    "crawl": "swecc_course_scraper.commands.crawl",
+    "watch": "swecc_course_scraper.commands.watch",
+}
+
+
+def load_command(name: str) -> Callable[..., Any]:
+    """
+    Import a command module on first use and return its command function.
+
+    Args:
+        str: The command name, one of COMMANDS (e.g., "schedule").
+
+    Returns:
+        Callable: The module's command function.
+    """
+    command: Callable[..., Any] = importlib.import_module(COMMANDS[name]).command
+    return command
+
+
+def write_schedule(
+    html: str, quarter: str, year: int, output_format: str, fields: Optional[List[str]]
+) -> None:
+    """
+    Parse a schedule page and print one row per meeting in a structured format.
+
+    Args:
+        str: The raw HTML returned by the schedule command.
+        str: The quarter code (e.g., "WIN").
+        int: The year (e.g., 2023).
+        str: A structured output format (e.g., "csv").
+        List[str]: Meeting columns to output, or None for all of them.
+    """
+    # Imported here since only structured output needs the parser and writers
+    from swecc_course_scraper.commands.parser import iter_schedule_html  # noqa: PLC0415
+    from swecc_course_scraper.export import open_writer  # noqa: PLC0415
+
+    with open_writer(output_format, "-", fields=fields) as writer:
+        writer.write_courses(iter_schedule_html(html, quarter, year))
+
+
+def main(args: Optional[argparse.Namespace] = None) -> None:  # noqa: PLR0912
+    if args is None:
+        args = build_parser().parse_args()
 
-def main(args: argparse.Namespace) -> None:
     try:
         if args.login:
-            login(args)
+            load_command("login")(args)
         elif args.schedule:
             department, quarter, year = args.schedule
-            print(schedule(department, quarter, year))
+            html = load_command("schedule")(department, quarter, year)
+            if args.format == "html":
+                print(html)
+            else:
+                fields = args.fields.split(",") if args.fields else None
+                write_schedule(html, quarter.upper(), int(year), args.format, fields)
         elif args.frequency:
             course_code = args.frequency[0]
             check_years = (
@@ -20,7 +82,57 @@ def main(args: argparse.Namespace) -> None:
                 if len(args.frequency) > 1
                 else DEFAULT_YEARS_CHECK
             )
-            print(frequency(course_code, check_years))
+            print(load_command("frequency")(course_code, check_years))
+        elif args.frequency_dept:
+            department = args.frequency_dept[0]
+            check_years = (
+                int(args.frequency_dept[1])
+                if len(args.frequency_dept) > 1
+                else DEFAULT_YEARS_CHECK
+            )
+            # The matrix has no html form; default to CSV
+            output_format = "csv" if args.format == "html" else args.format
+            if output_format not in MATRIX_FORMATS:
+                raise ValueError(
+                    f"--frequency-dept output must be one of {', '.join(MATRIX_FORMATS)}"
+                )
+            print(
+                load_command("frequency_dept")(department, check_years, output_format),
+                end="",
+            )
+        elif args.crawl:
+            departments = args.departments.split(",") if args.departments else None
+            print(
+                load_command("crawl")(
+                    args.crawl,
+                    args.since,
+                    departments,
+                    args.workers,
+                    manifest_path=args.manifest,
+                    parse_workers=args.parse_workers,
+                    worker=args.worker,
+                )
+            )
+        elif args.watch:
+            departments, *when = args.watch
+            if len(when) not in (0, 2):
+                raise ValueError("--watch takes DEPARTMENTS, optionally QUARTER YEAR")
+            quarter, year = (when[0], int(when[1])) if when else (None, None)
+            # Events go to stdout; the summary to stderr so the output stays JSON Lines
+            summary = load_command("watch")(
+                departments.split(","),
+                quarter,
+                year,
+                interval=args.interval,
+                polls=args.polls,
+                budget=args.budget,
+                backfill_output=args.backfill,
+                backfill_since=args.since,
+                backfill_departments=(
+                    args.departments.split(",") if args.departments else None
+                ),
+            )
+            print(summary, file=sys.stderr)
         else:
             print("No command specified. Use --help to show all commands.")
 
@@ -30,8 +142,7 @@ def main(args: argparse.Namespace) -> None:
         print(f"An unexpected error occurred: {e}")
 
 
-if __name__ == "__main__":
-
+def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser()
     parser.add_argument("--login", action="store_true", help="Log in to DawgPath")
     parser.add_argument(
@@ -41,6 +152,24 @@ if __name__ == "__main__":
         type=str,
         help="Get previous quarters schedules. \n e.g.: --schedule cse [WIN|SPR|SUM|AUT] 2023",
     )
+    parser.add_argument(
+        "--format",
+        choices=OUTPUT_FORMATS,
+        default="html",
+        help=(
+            "Output format for --schedule. html prints the raw page; the others print one"
+            " parsed meeting per row. (Default html)"
+        ),
+    )
+    parser.add_argument(
+        "--fields",
+        metavar="FIELDS",
+        type=str,
+        help=(
+            "Comma-separated meeting columns to output with a structured --format. \n"
+            "e.g.: --fields sln,course_code,days,time,enrolled,capacity"
+        ),
+    )
     parser.add_argument(
         "--frequency",
         nargs="+",
@@ -55,4 +184,128 @@ if __name__ == "__main__":
             "e.g.: --frequency CSE143 5"
         ),
     )
-    main(parser.parse_args())
+    parser.add_argument(
+        "--frequency-dept",
+        nargs="+",
+        metavar=("DEPARTMENT", "YEARS_CHECK"),
+        type=str,
+        help=(
+            "Get how often every course of a department was offered, as a course x"
+            " quarter matrix (--format csv or json; default csv). Each quarter page is"
+            " fetched once. \n"
+            f"YEARS_CHECK: Number of years to check from today (Default {DEFAULT_YEARS_CHECK}"
+            " years) \n"
+            "e.g.: --frequency-dept cse 10 --format json"
+        ),
+    )
+    parser.add_argument(
+        "--crawl",
+        metavar="OUTPUT",
+        type=str,
+        help=(
+            "Crawl every department's schedule for every quarter since --since into a"
+            " .sqlite/.db or .jsonl file. Progress is saved next to OUTPUT, so running"
+            " the same crawl again resumes it. \n"
+            "e.g.: --crawl schedules.sqlite --since 2015 --departments cse,math"
+        ),
+    )
+    parser.add_argument(
+        "--since",
+        metavar="YEAR",
+        type=int,
+        default=EARLIEST_RECORDED_YEAR,
+        help=f"First year to --crawl (Default {EARLIEST_RECORDED_YEAR})",
+    )
+    parser.add_argument(
+        "--departments",
+        metavar="DEPARTMENTS",
+        type=str,
+        help="Comma-separated departments to --crawl (Default every department)",
+    )
+    parser.add_argument(
+        "--workers",
+        metavar="N",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Pages fetched at once by --crawl (Default {DEFAULT_WORKERS})",
+    )
+    parser.add_argument(
+        "--parse-workers",
+        metavar="N",
+        type=int,
+        help=(
+            "Processes parsing pages for --crawl; 0 parses in the crawling process"
+            " (Default one per core)"
+        ),
+    )
+    parser.add_argument(
+        "--manifest",
+        metavar="PATH",
+        type=str,
+        help="Progress file for --crawl (Default OUTPUT.manifest.sqlite3)",
+    )
+    parser.add_argument(
+        "--worker",
+        metavar="ID",
+        nargs="?",
+        const="",
+        type=str,
+        help=(
+            "Run --crawl as one of several workers sharing --manifest (e.g., on a"
+            " shared volume), leasing pages from it until none are left. ID defaults"
+            " to the host name and process ID. \n"
+            "e.g.: --crawl node1.jsonl --manifest /shared/crawl.sqlite3 --worker"
+        ),
+    )
+    parser.add_argument(
+        "--watch",
+        nargs="+",
+        metavar=("DEPARTMENTS", "QUARTER YEAR"),
+        type=str,
+        help=(
+            "Poll comma-separated departments' schedules every --interval seconds and"
+            " print a JSON line whenever a section's status, enrollment or capacity"
+            " changes. Unchanged pages cost a conditional request and aren't parsed."
+            " QUARTER YEAR defaults to the newest published quarter. \n"
+            "e.g.: --watch cse,math AUT 2023 --interval 60"
+        ),
+    )
+    parser.add_argument(
+        "--interval",
+        metavar="SECONDS",
+        type=float,
+        default=DEFAULT_INTERVAL,
+        help=f"Seconds between --watch polls (Default {DEFAULT_INTERVAL:g})",
+    )
+    parser.add_argument(
+        "--polls",
+        metavar="N",
+        type=int,
+        help="Polls before --watch stops (Default until interrupted)",
+    )
+    parser.add_argument(
+        "--budget",
+        metavar="N",
+        type=float,
+        default=DEFAULT_BUDGET,
+        help=(
+            "Requests per second --watch spends on polls and --backfill together;"
+            f" polls always go first (Default {DEFAULT_BUDGET:g})"
+        ),
+    )
+    parser.add_argument(
+        "--backfill",
+        metavar="OUTPUT",
+        type=str,
+        help=(
+            "While --watch runs, crawl historical schedules since --since (for"
+            " --departments) into a .sqlite/.db or .jsonl file with the requests polls"
+            " leave over. Resumable like --crawl. \n"
+            "e.g.: --watch cse --backfill history.sqlite --since 2015 --departments cse"
+        ),
+    )
+    return parser
+
+
+if __name__ == "__main__":
+    main(build_parser().parse_args())
@@ -0,0 +1,326 @@
+"""
+DawgPath API client.
+
+Wraps the cookie session from the browser login with a pooled connection
+adapter, fans out many lookups over a bounded thread pool and shares one
+request between callers asking for the same endpoint and query at once.
+Throttled (429) and failed (5xx) requests are retried with the fetch layer's
+backoff, honouring Retry-After. Responses can be cached per endpoint with
+stale-while-revalidate.
+"""
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from http import HTTPStatus
+from types import TracebackType
+from typing import Callable, Dict, Iterable, Optional, Tuple, Type, TypeVar
+from urllib.parse import quote
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.sessions import Session
+
+from swecc_course_scraper.cache import TTLCache
+from swecc_course_scraper.fetch.policy import (
+    RETRY_STATUS_CODES,
+    FetchPolicy,
+    parse_retry_after,
+)
+from swecc_course_scraper.responses import (
+    ApiResponse,
+    CourseDetailsResponse,
+    SearchResponse,
+)
+from swecc_course_scraper.session import AUTH_FAILURE_CODES, clear_session, load_session
+
+ROOT = "https://dawgpath.uw.edu"
+SEARCH_PATH = "/api/v1/search/"
+COURSE_DETAILS_PATH = "/api/v1/courses/details/"
+
+DEFAULT_MAX_WORKERS = 8
+# (connect, read) timeouts in seconds
+DEFAULT_TIMEOUT = (5.0, 30.0)
+
+# (fresh, stale) seconds per endpoint prefix for cached responses. Course data rarely
+# changes, so stale entries are served instantly while they are refreshed.
+HOUR = 60 * 60
+DEFAULT_TTLS: Dict[str, Tuple[float, float]] = {
+    SEARCH_PATH: (HOUR, 24 * HOUR),
+    COURSE_DETAILS_PATH: (24 * HOUR, 7 * 24 * HOUR),
+}
+
+ResponseT = TypeVar("ResponseT", bound=ApiResponse)
+RequestKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+ResponseCache = TTLCache[RequestKey, ApiResponse]
+
+
+def _browser_login() -> Session:
+    # Imported on demand: login pulls in Selenium, which most API calls never need
+    from swecc_course_scraper.commands.login import browser_login  # noqa: PLC0415
+
+    return browser_login()
+
+
+class DawgPathClient:
+    """
+    Pooled, concurrent client for the DawgPath API.
+
+    Can be used as a context manager to shut down its thread pool.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        session: Optional[Session] = None,
+        *,
+        root: str = ROOT,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        timeout: Tuple[float, float] = DEFAULT_TIMEOUT,
+        relogin: Optional[Callable[[], Session]] = _browser_login,
+        cache: Optional[ResponseCache] = None,
+        ttls: Optional[Dict[str, Tuple[float, float]]] = None,
+        policy: Optional[FetchPolicy] = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        """
+        Args:
+            session: Session with DawgPath cookies. Defaults to the saved session, or a
+                fresh browser login if there is none.
+            root: Base URL of the API.
+            max_workers: Maximum number of requests in flight at once.
+            timeout: (connect, read) timeouts in seconds.
+            relogin: Called for a new session when the API rejects the current one.
+                None disables re-login, so rejected requests raise PermissionError.
+            cache: Cache for responses (e.g. TTLCache(ttl=0)); None disables caching.
+                Its stats count hits and misses.
+            ttls: (fresh, stale) seconds per endpoint path prefix. Defaults to DEFAULT_TTLS;
+                other endpoints use the cache's own TTLs.
+            policy: Attempts and backoff for connection errors, 429s and 5xx
+                responses. Defaults to FetchPolicy(); timeout is used instead of its
+                timeouts.
+            sleep: Waits between retries, in seconds.
+        """
+        self.root = root.rstrip("/")
+        self.timeout = timeout
+        self.max_workers = max(1, max_workers)
+        self._relogin = relogin
+        self.cache = cache
+        self.ttls = DEFAULT_TTLS if ttls is None else ttls
+        self.policy = policy or FetchPolicy()
+        self.retries = 0  # Requests repeated after a connection error, 429 or 5xx
+        self._sleep = sleep
+        self._session = self._configure(session or load_session() or self._login())
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="dawgpath"
+        )
+        # Re-entrant: a request that finishes instantly runs _forget while _submit holds it
+        self._lock = threading.RLock()
+        self._in_flight: Dict[RequestKey, Future[ApiResponse]] = {}
+
+    def search(self, search_string: str) -> SearchResponse:
+        """
+        Search DawgPath courses.
+
+        Args:
+            str: The search text (e.g., "math", "cse 142").
+
+        Returns:
+            SearchResponse: The matching courses.
+        """
+        return self._submit(
+            SearchResponse, SEARCH_PATH, {"search_string": search_string}
+        ).result()
+
+    def course_details(self, course_id: str) -> CourseDetailsResponse:
+        """
+        Fetch the details (description, prerequisites, grades...) of one course.
+
+        Args:
+            str: The course code (e.g., "CSE 142").
+
+        Returns:
+            CourseDetailsResponse: The course details.
+        """
+        return self._submit(
+            CourseDetailsResponse, self._details_path(course_id), {}
+        ).result()
+
+    def search_many(self, search_strings: Iterable[str]) -> Dict[str, SearchResponse]:
+        """
+        Run many searches concurrently; repeated search strings are requested once.
+
+        Returns:
+            Dict[str, SearchResponse]: Responses keyed by search string.
+        """
+        futures = {
+            text: self._submit(SearchResponse, SEARCH_PATH, {"search_string": text})
+            for text in dict.fromkeys(search_strings)
+        }
+        return {text: future.result() for text, future in futures.items()}
+
+    def course_details_many(
+        self, course_ids: Iterable[str]
+    ) -> Dict[str, CourseDetailsResponse]:
+        """
+        Fetch many course details concurrently; repeated course codes are requested once.
+
+        Returns:
+            Dict[str, CourseDetailsResponse]: Responses keyed by course code.
+        """
+        futures = {
+            course_id: self._submit(
+                CourseDetailsResponse, self._details_path(course_id), {}
+            )
+            for course_id in dict.fromkeys(course_ids)
+        }
+        return {course_id: future.result() for course_id, future in futures.items()}
+
+    def close(self) -> None:
+        """Wait for outstanding requests and release the pool's threads and connections."""
+        self._executor.shutdown(wait=True)
+        self._session.close()
+
+    def __enter__(self) -> "DawgPathClient":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.close()
+
+    def _submit(
+        self, response_type: Type[ResponseT], path: str, params: Dict[str, str]
+    ) -> "Future[ResponseT]":
+        """Answer from the cache, join the identical request in flight, or start one."""
+        key: RequestKey = (path, tuple(sorted(params.items())))
+        if self.cache is not None:
+            cached = self.cache.get(
+                key, refresh=lambda: self._get(response_type, path, params)
+            )
+            if cached is not None:
+                done: Future[ApiResponse] = Future()
+                done.set_result(cached)
+                return done  # type: ignore[return-value]
+
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is None:
+                future = self._executor.submit(
+                    self._get_and_cache, response_type, path, params, key
+                )
+                self._in_flight[key] = future
+                future.add_done_callback(lambda _: self._forget(key))
+        return future  # type: ignore[return-value]
+
+    def _get_and_cache(
+        self,
+        response_type: Type[ResponseT],
+        path: str,
+        params: Dict[str, str],
+        key: RequestKey,
+    ) -> ResponseT:
+        response = self._get(response_type, path, params)
+        if self.cache is not None:
+            ttl, stale_ttl = self._ttls_for(path)
+            self.cache.set(key, response, ttl, stale_ttl)
+        return response
+
+    def _ttls_for(self, path: str) -> Tuple[Optional[float], Optional[float]]:
+        for prefix, (ttl, stale_ttl) in self.ttls.items():
+            if path.startswith(prefix):
+                return ttl, stale_ttl
+        return None, None
+
+    def _forget(self, key: RequestKey) -> None:
+        with self._lock:
+            self._in_flight.pop(key, None)
+
+    def _get(
+        self, response_type: Type[ResponseT], path: str, params: Dict[str, str]
+    ) -> ResponseT:
+        """
+        Perform one GET, logging in again once if the session is rejected.
+
+        Raises:
+            FileNotFoundError: If the endpoint or course does not exist (404).
+            PermissionError: If the API rejects the session even after logging in again.
+            ConnectionError: If there is a network issue or another HTTP error, or the
+                API is still throttling or failing after every attempt.
+        """
+        url = f"{self.root}{path}"
+        session = self._session
+        res = self._request(session, url, params)
+        if res.status_code in AUTH_FAILURE_CODES and self._relogin is not None:
+            with self._lock:
+                # Another thread may already have replaced the rejected session
+                if self._session is session:
+                    clear_session()
+                    self._session = self._configure(self._login())
+                session = self._session
+            res = self._request(session, url, params)
+
+        if res.status_code in AUTH_FAILURE_CODES:
+            raise PermissionError(f"DawgPath rejected the session for {res.url}")
+        if res.status_code == HTTPStatus.NOT_FOUND:
+            raise FileNotFoundError(f"DawgPath resource not found: {res.url}")
+        try:
+            res.raise_for_status()
+        except requests.exceptions.HTTPError as e:
+            raise ConnectionError(f"DawgPath request failed: \n{e}") from e
+        return response_type(
+            url=res.url, status_code=res.status_code, content=res.content
+        )
+
+    def _request(
+        self, session: Session, url: str, params: Dict[str, str]
+    ) -> requests.Response:
+        """
+        GET a URL, retrying connection errors, 429s and 5xx responses with backoff.
+
+        Returns:
+            requests.Response: The first response that isn't a transient failure, or
+                the last one once the policy's attempts are used up.
+        """
+        attempt = 0
+        while True:
+            attempt += 1
+            retry_after: Optional[float] = None
+            try:
+                res = session.get(url, params=params or None, timeout=self.timeout)
+            except requests.exceptions.RequestException as e:
+                if attempt >= self.policy.max_attempts:
+                    raise ConnectionError(f"Unable to connect to {url}: \n{e}") from e
+            else:
+                if (
+                    res.status_code not in RETRY_STATUS_CODES
+                    or attempt >= self.policy.max_attempts
+                ):
+                    return res
+                retry_after = parse_retry_after(
+                    res.status_code, res.headers.get("Retry-After")
+                )
+                res.close()
+            with self._lock:
+                self.retries += 1
+            self._sleep(self.policy.backoff(attempt, retry_after))
+
+    def _login(self) -> Session:
+        if self._relogin is None:
+            raise PermissionError(
+                "No saved DawgPath session; log in with --login first"
+            )
+        return self._relogin()
+
+    def _configure(self, session: Session) -> Session:
+        """Size the session's connection pool to the number of worker threads."""
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_workers)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    @staticmethod
+    def _details_path(course_id: str) -> str:
+        return f"{COURSE_DETAILS_PATH}{quote(course_id.upper(), safe='')}"
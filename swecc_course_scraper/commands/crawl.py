@@ -0,0 +1,100 @@
+from pathlib import Path
+from typing import Optional, Sequence
+
+from swecc_course_scraper.commands.schedule import CURRENT_YEAR
+from swecc_course_scraper.constants import EARLIEST_RECORDED_YEAR
+from swecc_course_scraper.crawl import (
+    DEFAULT_WORKERS,
+    CrawlManifest,
+    crawl,
+    enumerate_jobs,
+    open_sink,
+    run_worker,
+)
+from swecc_course_scraper.crawl.pipeline import format_stages
+from swecc_course_scraper.departments import check_department
+
+MANIFEST_SUFFIX = ".manifest.sqlite3"
+
+
+def command(  # noqa: PLR0913
+    output: str,
+    first_year: int = EARLIEST_RECORDED_YEAR,
+    departments: Optional[Sequence[str]] = None,
+    workers: int = DEFAULT_WORKERS,
+    *,
+    manifest_path: Optional[str] = None,
+    parse_workers: Optional[int] = None,
+    worker: Optional[str] = None,
+) -> str:
+    """
+    Crawls every department's schedule page for every quarter from first_year to the
+    current year into an output file.
+
+    Progress is checkpointed in a manifest next to the output, so running the same
+    crawl again resumes it: only pages not yet stored (or that failed) are fetched.
+
+    Given a worker ID, the crawl instead leases its pages from the manifest, so
+    workers on several machines pointed at the same manifest file (on a shared
+    volume) split the pages between them, each writing to its own output. Pages of a
+    worker that stops are leased to the others once its leases expire.
+
+    Args:
+        str: The output file: .sqlite/.sqlite3/.db for SQLite, or .jsonl.
+        int: The first year to crawl. Default is EARLIEST_RECORDED_YEAR.
+        Sequence[str]: Department codes to crawl (e.g., ["cse", "math"]). Default is
+            every department.
+        int: Pages fetched at once. Default is DEFAULT_WORKERS.
+        str: The manifest file. Default is the output path plus MANIFEST_SUFFIX.
+        int: Processes parsing pages. Default is one per core.
+        str: Crawl as this worker of a shared manifest ("" for an ID made from the
+            host name and process ID). Default is to crawl alone.
+
+    Returns:
+        str: A summary of the crawl.
+
+    Raises:
+        ValueError: If the output type, year or a department is invalid.
+    """
+    if first_year < EARLIEST_RECORDED_YEAR or first_year > CURRENT_YEAR:
+        raise ValueError(
+            f"Year must be between {EARLIEST_RECORDED_YEAR} and {CURRENT_YEAR}"
+        )
+    for department in departments or []:
+        check_department(department)
+
+    with open_sink(output) as sink:
+        manifest = CrawlManifest(manifest_path or f"{output}{MANIFEST_SUFFIX}")
+        try:
+            jobs = enumerate_jobs(first_year, CURRENT_YEAR, departments)
+            added = manifest.add_jobs(jobs)
+            if worker is None:
+                stats = crawl(manifest.jobs(), sink, manifest, workers, parse_workers)
+            else:
+                stats = run_worker(
+                    sink,
+                    manifest,
+                    worker or None,
+                    fetch_workers=workers,
+                    parse_workers=parse_workers,
+                )
+            counts = manifest.counts()
+        finally:
+            manifest.close()
+
+    result = [
+        f"Crawled {stats.done} pages ({stats.courses} courses) into {Path(output)}.",
+        f"New pages: {added}",
+        f"Missing pages: {stats.missing}",
+    ]
+    if stats.failed:
+        result.append(
+            f"Failed pages: {stats.failed} (run the crawl again to retry them)"
+        )
+    result.append(
+        "Manifest: "
+        + ", ".join(f"{count} {status}" for status, count in counts.items())
+    )
+    result.append("\nStages:")
+    result.append(format_stages(stats.stages))
+    return "\n".join(result)
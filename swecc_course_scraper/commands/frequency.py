@@ -1,16 +1,78 @@
-from typing import Dict, List
+import logging
+import time
+from typing import List, Tuple
 
 from swecc_course_scraper.commands.schedule import (
     CURRENT_YEAR,
-    EARLIEST_RECORDED_YEAR,
-    VALID_QUARTERS,
-)
-from swecc_course_scraper.commands.schedule import (
-    command as schedule_command,
+    fetch_html,
+    schedule_url,
 )
+from swecc_course_scraper.constants import DEFAULT_YEARS_CHECK, EARLIEST_RECORDED_YEAR
+from swecc_course_scraper.departments import check_department
+from swecc_course_scraper.offerings import OfferingIndex
+from swecc_course_scraper.quarters import latest_quarter, published_quarters
+
+# Seconds before a current-year page, which may still change, is fetched again
+IN_FLUX_MAX_AGE = 24 * 60 * 60
+
 
-# Constant for default years to check
-DEFAULT_YEARS_CHECK = 5
+def update_index(
+    index: OfferingIndex,
+    department: str,
+    earliest_year: int,
+    max_age: float = IN_FLUX_MAX_AGE,
+) -> Tuple[int, List[str]]:
+    """
+    Fetch and index the quarter pages of a department from earliest_year to the
+    current year that are missing from the index, last failed to fetch, or are from
+    the current year and were fetched more than max_age seconds ago.
+
+    Quarters the time schedule hasn't published yet are skipped and not counted.
+
+    Args:
+        OfferingIndex: The index to update (it is not saved).
+        str: The department code (e.g., "cse").
+        int: The first year to cover.
+        float: Seconds a current-year page is trusted for. Default is IN_FLUX_MAX_AGE.
+
+    Returns:
+        Tuple[int, List[str]]: The number of quarters covered, and the quarters (e.g.,
+        "WIN 2023") that could not be fetched and are left out of that number.
+    """
+    failed: List[str] = []
+    total_quarters: int = 0
+    now = time.time()
+    latest = latest_quarter()
+
+    for year in range(CURRENT_YEAR, earliest_year - 1, -1):
+        for quarter in published_quarters(year, latest):
+            total_quarters += 1
+            indexed = index.has_page(department, quarter, year)
+            if indexed and year < CURRENT_YEAR:
+                continue
+            fetched_at = index.fetched_at(department, quarter, year)
+            if indexed and fetched_at is not None and now - fetched_at < max_age:
+                continue
+            try:
+                html = fetch_html(schedule_url(department, quarter, year))
+                index.add_page(department, quarter, year, html, fetched_at=now)
+            except (FileNotFoundError, ConnectionError) as e:
+                logging.exception(
+                    f"Error fetching schedule for {department} {quarter} {year}"
+                )
+                # Unreachable quarters are unknown rather than "not offered", and
+                # are retried next time; an older copy of the page still counts
+                if isinstance(e, ConnectionError):
+                    index.add_failure(department, quarter, year)
+                    if not indexed:
+                        total_quarters -= 1
+                        failed.append(f"{quarter} {year}")
+                # A past quarter without a page had no courses; this year's may
+                # still be published
+                elif year < CURRENT_YEAR:
+                    index.add_page(department, quarter, year, "", fetched_at=now)
+
+    return total_quarters, failed
 
 
 def command(course_code: str, check_years: int = DEFAULT_YEARS_CHECK) -> str:
@@ -24,32 +86,27 @@ def command(course_code: str, check_years: int = DEFAULT_YEARS_CHECK) -> str:
 
     Returns:
         str: Lists course offering frequency.
+
+    Raises:
+        ValueError: If the time schedule doesn't list the course's department.
     """
 
     course_department = "".join(filter(str.isalpha, course_code)).lower()
     course_number = "".join(filter(str.isdigit, course_code))
     course_code = f"{course_department}{course_number}"
+    check_department(course_department)
 
-    frequency: Dict[str, int] = {}
-    offerings: List[str] = []
-    total_quarters: int = 0
-
+    # Quarters already indexed are answered without fetching their page again
+    index = OfferingIndex.load()
     earliest_year = max(CURRENT_YEAR - check_years + 1, EARLIEST_RECORDED_YEAR)
-    for year in range(CURRENT_YEAR, earliest_year - 1, -1):
-        for quarter in VALID_QUARTERS:
-            total_quarters += 1
-            try:
-                schedule_data = schedule_command(course_department, quarter, year)
-                if course_code in schedule_data:
-                    frequency[quarter] = frequency.get(quarter, 0) + 1
-                    offerings.append(f"{quarter} {year}")
-            except (FileNotFoundError, ConnectionError):
-                import logging
+    total_quarters, failed = update_index(index, course_department, earliest_year)
+    index.save()
 
-                logging.exception(
-                    f"Error fetching schedule for {course_department} {quarter} {year}"
-                )
-                continue
+    frequency = index.quarter_counts(course_code, earliest_year, CURRENT_YEAR)
+    offerings = [
+        f"{quarter} {year}"
+        for quarter, year in index.offerings(course_code, earliest_year, CURRENT_YEAR)
+    ]
 
     result = [f"Course {course_code.upper()}:"]
 
@@ -67,4 +124,9 @@ def command(course_code: str, check_years: int = DEFAULT_YEARS_CHECK) -> str:
     else:
         result.append("No offerings found for course in the time range.")
 
+    if failed:
+        result.append(f"\nCould not fetch {len(failed)} quarters (not counted):")
+        for quarter_year in failed:
+            result.append(f"- {quarter_year}")
+
     return "\n".join(result)
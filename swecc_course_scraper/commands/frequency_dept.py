@@ -0,0 +1,123 @@
+import csv
+import io
+import json
+import re
+from typing import Any, Dict, List, Tuple
+
+from swecc_course_scraper.commands.frequency import update_index
+from swecc_course_scraper.commands.schedule import CURRENT_YEAR, VALID_QUARTERS
+from swecc_course_scraper.constants import (
+    DEFAULT_YEARS_CHECK,
+    EARLIEST_RECORDED_YEAR,
+    MATRIX_FORMATS,
+)
+from swecc_course_scraper.departments import check_department
+from swecc_course_scraper.offerings import OfferingIndex
+
+
+def offering_matrix(
+    index: OfferingIndex, department: str, earliest_year: int
+) -> Tuple[List[str], List[Dict[str, Any]]]:
+    """
+    Build the course x quarter offering matrix of a department from the index.
+
+    Args:
+        OfferingIndex: An index covering the department's quarters.
+        str: The department code (e.g., "cse").
+        int: The first year of the window.
+
+    Returns:
+        Tuple[List[str], List[Dict[str, Any]]]: The indexed quarters, newest first
+        (e.g., "AUT 2023"), and one row per course with its code, number of
+        offerings, counts per quarter code and the quarters it was offered in.
+    """
+    quarters = [
+        (quarter, year)
+        for year in range(CURRENT_YEAR, earliest_year - 1, -1)
+        for quarter in reversed(VALID_QUARTERS)
+        if index.has_page(department, quarter, year)
+    ]
+
+    code_pattern = re.compile(rf"{re.escape(department)}(\d+)([a-z]*)")
+    codes = sorted(
+        (int(match.group(1)), match.group(2), code)
+        for code in index.courses
+        if (match := code_pattern.fullmatch(code))
+    )
+
+    rows = []
+    for _, _, code in codes:
+        offered = set(index.offerings(code, earliest_year, CURRENT_YEAR))
+        if not offered:
+            continue
+        rows.append(
+            {
+                "course_code": code.upper(),
+                "offered": len(offered),
+                "frequency": index.quarter_counts(code, earliest_year, CURRENT_YEAR),
+                "quarters": [f"{q} {y}" for q, y in quarters if (q, y) in offered],
+            }
+        )
+    return [f"{quarter} {year}" for quarter, year in quarters], rows
+
+
+def command(
+    department: str,
+    check_years: int = DEFAULT_YEARS_CHECK,
+    output_format: str = "csv",
+) -> str:
+    """
+    Returns how often every course of a department was offered, fetching each quarter
+    page of the department at most once.
+
+    Args:
+        str: The department code (e.g., "cse").
+        int: The number of years to check. Default is DEFAULT_YEARS_CHECK.
+        str: "csv" for one row per course and one column per quarter, or "json".
+
+    Returns:
+        str: The offering matrix.
+
+    Raises:
+        ValueError: If the output format is not csv or json.
+        ValueError: If the time schedule doesn't list the department.
+    """
+    if output_format not in MATRIX_FORMATS:
+        raise ValueError(f"Output format must be one of {', '.join(MATRIX_FORMATS)}")
+
+    department = "".join(filter(str.isalpha, department)).lower()
+    check_department(department)
+    index = OfferingIndex.load()
+    earliest_year = max(CURRENT_YEAR - check_years + 1, EARLIEST_RECORDED_YEAR)
+    total_quarters, failed = update_index(index, department, earliest_year)
+    index.save()
+
+    quarters, rows = offering_matrix(index, department, earliest_year)
+
+    if output_format == "json":
+        return json.dumps(
+            {
+                "department": department.upper(),
+                "years": check_years,
+                "total_quarters": total_quarters,
+                "quarters": quarters,
+                "unavailable": failed,
+                "courses": rows,
+            },
+            indent=2,
+        )
+
+    out = io.StringIO()
+    writer = csv.writer(out, lineterminator="\n")
+    writer.writerow(["course_code", "offered", *VALID_QUARTERS, *quarters])
+    for row in rows:
+        offered = set(row["quarters"])
+        writer.writerow(
+            [
+                row["course_code"],
+                row["offered"],
+                *(row["frequency"].get(quarter, 0) for quarter in VALID_QUARTERS),
+                *(int(quarter in offered) for quarter in quarters),
+            ]
+        )
+    return out.getvalue()
@@ -6,7 +6,13 @@ from requests.sessions import Session
 from selenium import webdriver
 from selenium.webdriver.chrome.webdriver import WebDriver
 
-ROOT = "https://dawgpath.uw.edu"
+from swecc_course_scraper.client import ROOT
+from swecc_course_scraper.session import (
+    AUTH_FAILURE_CODES,
+    clear_session,
+    load_session,
+    save_cookies,
+)
 
 
 def load_webdriver(url: str = ROOT) -> WebDriver:
@@ -35,33 +41,65 @@ def get_current_http_session(driver: WebDriver) -> Session:
         Session: A requests Session object with cookies from the WebDriver.
     """
 
-    cookies: List[Dict[str, Any]] = driver.get_cookies()  # type: ignore
+    cookies: List[Dict[str, Any]] = driver.get_cookies()
     session = requests.Session()
     for cookie in cookies:
         session.cookies.set(cookie["name"], cookie["value"])
     return session
 
 
-def command(parser: argparse.Namespace) -> None:
+def browser_login() -> Session:
     """
-    Example function demonstrating the workflow of logging in and making an API request.
+    Log in through Chrome, save the resulting cookies and return a session using them.
     1. Loads a WebDriver
     2. Waits for the user to log in manually
-    3. Extracts the session cookies
-    4. Makes an API request to search for "math" courses
+    3. Extracts and saves the session cookies
 
     Returns:
-        Dict[str, Any]: The JSON response from the API request.
+        Session: A requests Session object with the fresh login cookies.
     """
-
     driver = load_webdriver()
+    try:
+        input("Press any key to continue after logging in...")
+        session = get_current_http_session(driver)
+        save_cookies(driver.get_cookies())
+    finally:
+        driver.quit()
+    return session
+
+
+def get_session(force_login: bool = False) -> Session:
+    """
+    Return a DawgPath session, reusing saved cookies unless they are missing or expired.
+
+    Args:
+        bool: Ignore any saved session and log in through the browser again.
+
+    Returns:
+        Session: A requests Session object with DawgPath cookies.
+    """
+    session = None if force_login else load_session()
+    return session or browser_login()
+
+
+def command(parser: argparse.Namespace) -> None:
+    """
+    Example function demonstrating the workflow of logging in and making an API request.
+    1. Reuses the saved session, or logs in through the browser if there is none
+    2. Makes an API request to search for "math" courses
+    3. If the saved session was rejected, logs in again and retries once
+
+    Returns:
+        Dict[str, Any]: The JSON response from the API request.
+    """
 
-    input("Press any key to continue after logging in...")
-    session = get_current_http_session(driver)
+    session = get_session()
+    url = f"{ROOT}/api/v1/search/?search_string=math"
 
-    res = requests.get(
-        "https://dawgpath.uw.edu/api/v1/search/?search_string=math",
-        cookies=session.cookies,
-    )
+    res = session.get(url)
+    if res.status_code in AUTH_FAILURE_CODES:
+        clear_session()
+        session = browser_login()
+        res = session.get(url)
 
     print(res.json())
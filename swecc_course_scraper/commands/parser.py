@@ -6,10 +6,27 @@ pages into structured Course and CourseMeeting objects.
 """
 
 import re
-from typing import List, Dict, Optional
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Tuple
 from ..models.course import Course, CourseMeeting
 
 
+# Bit assigned to each meeting day in CourseMeeting.day_mask
+DAY_BITS = {
+    'M': 1 << 0,
+    'T': 1 << 1,
+    'W': 1 << 2,
+    'Th': 1 << 3,
+    'F': 1 << 4,
+    'Sa': 1 << 5,
+    'Su': 1 << 6,
+}
+
+# "Th"/"Sa"/"Su" must be tried before the single-letter days
+_DAY_TOKEN_PATTERN = re.compile(r'Th|Sa|Su|M|T|W|F')
+_TIME_SLOT_PATTERN = re.compile(r'(\d{3,4})-(\d{3,4})(P?)')
+
+
 # =============================================================================
 # SAMPLE OUTPUT - What your functions should return
 # =============================================================================
@@ -37,6 +54,9 @@ Example of what parse_schedule_html() should return:
                 time="1130-1220",
                 building="KNE",
                 room="130",
+                start_minutes=690,
+                end_minutes=740,
+                day_mask=20,
                 instructor="Natsuhara,Miya Kaye",
                 professor_name="Natsuhara,Miya Kaye",
                 status="Open",
@@ -64,6 +84,9 @@ Example of what parse_schedule_html() should return:
                 time="830-920",
                 building="MGH",
                 room="288",
+                start_minutes=510,
+                end_minutes=560,
+                day_mask=10,
                 instructor="Lin,Melissa",
                 professor_name="Lin,Melissa",
                 status="Open",
@@ -119,15 +142,42 @@ def parse_schedule_html(html: str, quarter: str, year: int) -> List[Course]:
     print(f"📅 Quarter: {quarter} {year}")
     print(f"📄 HTML length: {len(html)} characters")
     
-    # Step 1: Extract course blocks from HTML
-    print("\n🔍 Step 1: Extracting course blocks...")
-    course_blocks = _extract_course_blocks(html)
-    print(f"✅ Found {len(course_blocks)} course blocks")
+    courses = list(iter_schedule_html(html, quarter, year, show_debug=True))
+    
+    print(f"\n🎯 PARSING COMPLETE")
+    print(f"   Total courses parsed: {len(courses)}")
+    print(f"   Total meetings: {sum(len(course.meetings) for course in courses)}")
+    print("=" * 80)
     
-    courses = []
+    return courses
+
+
+def iter_schedule_html(html: str, quarter: str, year: int, show_debug: bool = False) -> Iterator[Course]:
+    """
+    Parse UW schedule HTML lazily, yielding one Course per course block.
+    
+    Courses are built as they are consumed, so writers can stream them out
+    without holding the whole page's results in memory.
+    
+    Args:
+        html: Raw HTML content from UW time schedule page
+        quarter: Quarter code (e.g., "WIN", "SPR", "SUM", "AUT")
+        year: Year (e.g., 2023)
+        show_debug: Print parsing progress (as parse_schedule_html does)
+    
+    Yields:
+        Course: Parsed Course objects with all sections, in page order
+    """
+    # Step 1: Extract course blocks from HTML
+    if show_debug:
+        print("\n🔍 Step 1: Extracting course blocks...")
+    course_blocks = _extract_course_blocks(html, show_debug=show_debug)
+    if show_debug:
+        print(f"✅ Found {len(course_blocks)} course blocks")
     
     # Step 2: Process each course block
-    print(f"\n🔍 Step 2: Processing {len(course_blocks)} course blocks...")
+    if show_debug:
+        print(f"\n🔍 Step 2: Processing {len(course_blocks)} course blocks...")
     
     for i, course_block in enumerate(course_blocks):
         # Parse course header first to get course code
@@ -137,7 +187,7 @@ def parse_schedule_html(html: str, quarter: str, year: int) -> List[Course]:
             continue
         
         course_code = header_data['code']
-        is_math116 = "116" in course_code
+        is_math116 = show_debug and "116" in course_code
         
         # Only show output for MATH 116 courses
         if is_math116:
@@ -149,7 +199,7 @@ def parse_schedule_html(html: str, quarter: str, year: int) -> List[Course]:
             print("📋 Parsing course meetings...")
         
         # Parse course meetings
-        meetings = _parse_course_meetings(course_block, course_code, quarter, year)
+        meetings = _parse_course_meetings(course_block, course_code, quarter, year, show_debug=show_debug)
         
         if is_math116:
             print(f"✅ Found {len(meetings)} meetings")
@@ -165,20 +215,13 @@ def parse_schedule_html(html: str, quarter: str, year: int) -> List[Course]:
             meetings=meetings
         )
         
-        courses.append(course)
-        
         if is_math116:
             print(f"✅ Course created: {course_code} with {len(meetings)} meetings")
-    
-    print(f"\n🎯 PARSING COMPLETE")
-    print(f"   Total courses parsed: {len(courses)}")
-    print(f"   Total meetings: {sum(len(course.meetings) for course in courses)}")
-    print("=" * 80)
-    
-    return courses
+        
+        yield course
 
 
-def _extract_course_blocks(html: str) -> List[str]:
+def _extract_course_blocks(html: str, show_debug: bool = True) -> List[str]:
     """
     Extract individual course blocks from HTML.
     
@@ -189,11 +232,13 @@ def _extract_course_blocks(html: str) -> List[str]:
     
     Args:
         html: Raw HTML content
+        show_debug: Print extraction progress
         
     Returns:
         List[str]: List of HTML blocks, each containing one complete course and its sections
     """
-    print("Extracting course blocks...")
+    if show_debug:
+        print("Extracting course blocks...")
     
     # Determine the background color based on quarter
     quarter_colors = {
@@ -208,7 +253,8 @@ def _extract_course_blocks(html: str) -> List[str]:
     for quarter, color in quarter_colors.items():
         if f'bgcolor="{color}"' in html or f"bgcolor='{color}'" in html:
             bgcolor = color
-            print(f"Detected {quarter} quarter (color: {color})")
+            if show_debug:
+                print(f"Detected {quarter} quarter (color: {color})")
             break
     
     # Step 1: Extract everything between </P> and <P> tags (or <p> and <P>)
@@ -222,7 +268,8 @@ def _extract_course_blocks(html: str) -> List[str]:
         p_open_match = re.search(r'<p>', html)
     
     if not p_close_match or not p_open_match:
-        print("Warning: Could not find </P> (or <p>) and <P> boundaries")
+        if show_debug:
+            print("Warning: Could not find </P> (or <p>) and <P> boundaries")
         return []
     
     # Extract content between the closing tag and <P> (including both tags)
@@ -230,13 +277,15 @@ def _extract_course_blocks(html: str) -> List[str]:
     end_pos = p_open_match.start()     # End before <P>
     course_schedule_html = html[start_pos:end_pos]
     
-    print(f"Extracted content between </P> and <P>: {len(course_schedule_html)} characters")
+    if show_debug:
+        print(f"Extracted content between </P> and <P>: {len(course_schedule_html)} characters")
     
     # Step 2: Remove the first table (header area) and the first <br> after it
     # Find the first table in the extracted content
     first_table_match = re.search(r'<table[^>]*>.*?</table>', course_schedule_html, re.DOTALL)
     if not first_table_match:
-        print("Warning: Could not find first table to remove")
+        if show_debug:
+            print("Warning: Could not find first table to remove")
         return []
     
     # Find the first <br> after the first table
@@ -244,7 +293,8 @@ def _extract_course_blocks(html: str) -> List[str]:
     first_br_match = re.search(r'<br>', after_first_table)
     
     if not first_br_match:
-        print("Warning: Could not find <br> after first table")
+        if show_debug:
+            print("Warning: Could not find <br> after first table")
         return []
     
     # Remove the first table and the first <br> after it
@@ -252,14 +302,16 @@ def _extract_course_blocks(html: str) -> List[str]:
     br_end_pos = first_table_match.end() + first_br_match.end()
     cleaned_html = course_schedule_html[br_end_pos:]
     
-    print(f"After removing first table and <br>: {len(cleaned_html)} characters")
+    if show_debug:
+        print(f"After removing first table and <br>: {len(cleaned_html)} characters")
     
     # Step 3: Extract course blocks from the cleaned content
     # Pattern: course header table + everything until next course header
     pattern = f'(<table bgcolor=[\'"]{re.escape(bgcolor)}[\'"].*?</table>.*?)(?=<table bgcolor=[\'"]{re.escape(bgcolor)}[\'"]|$)'
     course_blocks = re.findall(pattern, cleaned_html, re.DOTALL)
     
-    print(f"Found {len(course_blocks)} course blocks")
+    if show_debug:
+        print(f"Found {len(course_blocks)} course blocks")
     return course_blocks
 
 
@@ -376,7 +428,7 @@ def _parse_course_header(course_block: str, show_debug: bool = True) -> Dict[str
     return result
 
 
-def _parse_course_meetings(course_block: str, course_code: str, quarter: str, year: int) -> List[CourseMeeting]:
+def _parse_course_meetings(course_block: str, course_code: str, quarter: str, year: int, show_debug: bool = True) -> List[CourseMeeting]:
     """
     Parse individual meetings from a course block.
     
@@ -385,6 +437,7 @@ def _parse_course_meetings(course_block: str, course_code: str, quarter: str, ye
         course_code: Course code (e.g., "CSE 122")
         quarter: Quarter code (e.g., "WIN")
         year: Year (e.g., 2023)
+        show_debug: Print parsing details (only ever shown for MATH 116)
         
     Returns:
         List[CourseMeeting]: List of parsed meeting objects
@@ -393,7 +446,7 @@ def _parse_course_meetings(course_block: str, course_code: str, quarter: str, ye
         
     """
     # Only show debug output for MATH 116
-    is_math116 = "116" in course_code
+    is_math116 = show_debug and "116" in course_code
     if is_math116:
         print("=" * 60)
         print("PARSING COURSE MEETINGS")
@@ -549,21 +602,15 @@ def _parse_course_meetings(course_block: str, course_code: str, quarter: str, ye
                     additional_code = meeting_match.group(12) if meeting_match.lastindex >= 12 and meeting_match.group(12) else ""  # Additional codes like "B"
                 else:
                     # Without Restr: [>] <A HREF=...>SLN</A> MeetingID Credits/Type MeetingDate Time [Building/Room] Instructor Status Enrolled/Capacity [AdditionalCode]
-                    building_room = (meeting_match.group(6) or "").strip()  # Building/Room info (may be "* *" for to be arranged)
-                    instructor = (meeting_match.group(7) or "").strip()  # Instructor name (can have spaces/commas)
-                    status = meeting_match.group(8)           # Open/Closed
-                    enrolled = int(meeting_match.group(9))   # Enrolled count
-                    capacity_str = (meeting_match.group(10) or "").strip()  # Capacity (may have E suffix)
-                    additional_code = meeting_match.group(11) if meeting_match.lastindex >= 11 and meeting_match.group(11) else ""  # Additional codes like "B"
-                    
-                    # Parse building/room for non-Restr entries
-                    if building_room == "* *":
-                        building = ""
-                        room = ""
-                    else:
-                        # Try to extract building and room from the combined string
-                        building = ""
-                        room = ""
+                    # Building/Room is not captured separately here, so group 6 holds the
+                    # instructor (with any building/room text in front of it)
+                    instructor = (meeting_match.group(6) or "").strip()  # Instructor name (can have spaces/commas)
+                    status = meeting_match.group(7)           # Open/Closed
+                    enrolled = int(meeting_match.group(8))   # Enrolled count
+                    capacity_str = (meeting_match.group(9) or "").strip()  # Capacity (may have E suffix)
+                    additional_code = meeting_match.group(10) if meeting_match.lastindex >= 10 and meeting_match.group(10) else ""  # Additional codes like "B"
+                    building = ""
+                    room = ""
             else:  # pattern_type == "arranged"
                 if has_restr:
                     # With Restr: Restr <A HREF=...>SLN</A> MeetingID Credits/Type MeetingDate "to be arranged" [Building/Room] Instructor Status Enrolled/Capacity [AdditionalCode]
@@ -626,6 +673,8 @@ def _parse_course_meetings(course_block: str, course_code: str, quarter: str, ye
                             additional_code = capacity_str
             
             days = meeting_date  # For now, set days same as meeting_date
+            start_minutes, end_minutes = _parse_time_slot(time)
+            day_mask = _parse_days(days)
             
             # Determine if this is credits or meeting type code based on meeting_id length
             if len(meeting_id) == 1:
@@ -681,6 +730,9 @@ def _parse_course_meetings(course_block: str, course_code: str, quarter: str, ye
                 time=time,
                 building=building,
                 room=room,
+                start_minutes=start_minutes,
+                end_minutes=end_minutes,
+                day_mask=day_mask,
                 instructor=instructor,
                 professor_name=instructor,  # Keep for compatibility but they're the same
                 status=status,
@@ -704,6 +756,7 @@ def _parse_course_meetings(course_block: str, course_code: str, quarter: str, ye
             for i, add_time in enumerate(additional_meeting_times):
                 # Create a unique meeting ID for additional times (e.g., "AA-1", "AA-2")
                 additional_meeting_id = f"{meeting_id}-{i+1}"
+                additional_start, additional_end = _parse_time_slot(add_time['time'])
                 
                 additional_meeting = CourseMeeting(
                     sln=sln,  # Same SLN as main meeting
@@ -716,6 +769,9 @@ def _parse_course_meetings(course_block: str, course_code: str, quarter: str, ye
                     time=add_time['time'],
                     building=add_time['building'],
                     room=add_time['room'],
+                    start_minutes=additional_start,
+                    end_minutes=additional_end,
+                    day_mask=_parse_days(add_time['day']),
                     instructor=add_time['instructor'],
                     professor_name=add_time['instructor'],  # Keep for compatibility
                     status=status,  # Same status as main meeting
@@ -786,22 +842,69 @@ def _clean_instructor_name(instructor: str) -> str:
     pass
 
 
-def _parse_time_slot(time_str: str) -> str:
+@lru_cache(maxsize=1024)
+def _parse_time_slot(time_str: str) -> Tuple[Optional[int], Optional[int]]:
     """
-    Parse and normalize time slot information.
+    Parse a time slot into start/end minutes since midnight.
+    
+    The schedule writes times without AM/PM: hours 8-11 are morning, 12 is noon
+    and 1-7 are afternoon/evening. A trailing "P" (e.g. "630-920P") marks an
+    evening meeting. Results are cached since a page only has a few dozen
+    distinct time strings.
     
     Args:
-        time_str: Raw time string from HTML
+        time_str: Raw time string from HTML (e.g., "1130-1220", "MWF    930-1020")
         
     Returns:
-        str: Normalized time string
+        Tuple[Optional[int], Optional[int]]: (start_minutes, end_minutes), or
+        (None, None) for "to be arranged" and unrecognized times
     """
-    # TODO: Implement this function
-    # 1. Handle various time formats (1130-1220, 9:30-10:20, etc.)
-    # 2. Normalize to consistent format
-    # 3. Handle edge cases (TBA, TBD, etc.)
-    # 4. Return clean time string
-    pass
+    time_match = _TIME_SLOT_PATTERN.search(time_str)
+    if not time_match:
+        return None, None
+    
+    start = _clock_to_minutes(time_match.group(1))
+    end = _clock_to_minutes(time_match.group(2))
+    evening = time_match.group(3) == "P"
+    
+    if evening and end < 12 * 60:
+        end += 12 * 60
+    # Ranges like "1030-120" or "800-950P" roll the end (or start) past noon
+    if end <= start:
+        end += 12 * 60
+    if evening and start < 12 * 60 and start + 12 * 60 < end:
+        start += 12 * 60
+    return start, end
+
+
+@lru_cache(maxsize=1024)
+def _parse_days(days: str) -> int:
+    """
+    Parse meeting days into a 7-bit day mask (see DAY_BITS).
+    
+    Args:
+        days: Raw days string from HTML (e.g., "MWF", "TTh", "to be arranged")
+        
+    Returns:
+        int: Bitmask of meeting days, 0 for "to be arranged" and unrecognized days
+    """
+    days = days.strip()
+    tokens = _DAY_TOKEN_PATTERN.findall(days)
+    if not tokens or "".join(tokens) != days:
+        return 0
+    mask = 0
+    for token in tokens:
+        mask |= DAY_BITS[token]
+    return mask
+
+
+def _clock_to_minutes(clock: str) -> int:
+    """Convert an "hmm"/"hhmm" schedule time to minutes since midnight."""
+    hours, minutes = int(clock[:-2]), int(clock[-2:])
+    # 1-7 o'clock is always afternoon/evening on the time schedule
+    if 1 <= hours < 8:
+        hours += 12
+    return hours * 60 + minutes
 
 
 def _parse_enrollment_numbers(enrollment_str: str) -> tuple[int, int]:
@@ -1,13 +1,29 @@
+import os
 from datetime import datetime
 
-import requests
+from swecc_course_scraper.constants import EARLIEST_RECORDED_YEAR
+from swecc_course_scraper.fetch import default_fetcher
 
 SCHEDULE = "https://www.washington.edu/students/timeschd/"
-EARLIEST_RECORDED_YEAR = 2003
+# Points the scraper at another copy of the time schedule, e.g. a local stand-in server
+SCHEDULE_ENV = "SWECC_SCHEDULE_URL"
 CURRENT_YEAR = datetime.now().year
 VALID_QUARTERS = ["WIN", "SPR", "SUM", "AUT"]
 
 
+def schedule_root() -> str:
+    """
+    Returns the base URL of the time schedule.
+
+    Defaults to SCHEDULE unless SWECC_SCHEDULE_URL is set.
+
+    Returns:
+        str: The base URL, ending with a slash.
+    """
+    root = os.environ.get(SCHEDULE_ENV) or SCHEDULE
+    return root if root.endswith("/") else f"{root}/"
+
+
 def fetch_html(url: str) -> str:
     """
     Fetches the HTML content of the given UW time schedule webpage.
@@ -20,21 +36,15 @@ def fetch_html(url: str) -> str:
 
     Raises:
         FileNotFoundError: If the page does not exist (404).
-        ConnectionError: If there is a network issue.
+        ConnectionError: If there is a network issue, or the server kept failing after
+            retries.
     """
-    try:
-        res = requests.get(url)
-        res.raise_for_status()
-        return res.text
-    except requests.exceptions.HTTPError as e:
-        raise FileNotFoundError(f"Page not found or no courses available: \n{e}") from e
-    except requests.exceptions.RequestException as e:
-        raise ConnectionError(f"Unable to connect to {url}: \n{e}") from e
+    return default_fetcher().fetch_text(url)
 
 
-def command(department: str, quarter: str, year: int) -> str:
+def schedule_url(department: str, quarter: str, year: int) -> str:
     """
-    Returns the text of the schedule webpage for the given department, quarter, and year.
+    Returns the URL of the schedule webpage for the given department, quarter, and year.
 
     Args:
         str: The department code (e.g., "cse").
@@ -42,7 +52,7 @@ def command(department: str, quarter: str, year: int) -> str:
         int: The year code (e.g., 2023).
 
     Returns:
-        str: The raw HTML content as text of the webpage.
+        str: The URL of the webpage.
 
     Raises:
         ValueError: If the quarter is not one of WIN, SPR, SUM, or AUT.
@@ -65,4 +75,28 @@ def command(department: str, quarter: str, year: int) -> str:
             f"Year must be between {EARLIEST_RECORDED_YEAR} and {CURRENT_YEAR}"
         )
 
-    return fetch_html(f"{SCHEDULE}{quarter}{year}/{department}.html")
+    return f"{schedule_root()}{quarter}{year}/{department}.html"
+
+
+def command(department: str, quarter: str, year: int) -> str:
+    """
+    Returns the text of the schedule webpage for the given department, quarter, and year.
+
+    Args:
+        str: The department code (e.g., "cse").
+        str: The quarter code (e.g., "WIN").
+        int: The year code (e.g., 2023).
+
+    Returns:
+        str: The raw HTML content as text of the webpage.
+
+    Raises:
+        ValueError: If the quarter is not one of WIN, SPR, SUM, or AUT.
+        ValueError: Invalid year
+        ValueError: If the time schedule doesn't list the department.
+    """
+    from swecc_course_scraper.departments import check_department  # noqa: PLC0415
+
+    url = schedule_url(department, quarter, year)
+    check_department(department, quarter, year)
+    return fetch_html(url)
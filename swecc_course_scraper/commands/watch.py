@@ -0,0 +1,199 @@
+import itertools
+import json
+import logging
+import sys
+import threading
+from typing import IO, List, Optional, Sequence, Tuple
+
+from swecc_course_scraper.commands.crawl import MANIFEST_SUFFIX
+from swecc_course_scraper.commands.schedule import CURRENT_YEAR, VALID_QUARTERS
+from swecc_course_scraper.constants import (
+    DEFAULT_BUDGET,
+    DEFAULT_INTERVAL,
+    EARLIEST_RECORDED_YEAR,
+)
+from swecc_course_scraper.crawl import (
+    CrawlManifest,
+    CrawlStats,
+    Pipeline,
+    enumerate_jobs,
+    open_sink,
+)
+from swecc_course_scraper.crawl.pipeline import fetch_page
+from swecc_course_scraper.departments import check_department
+from swecc_course_scraper.fetch import COLD, HOT, FetchScheduler
+from swecc_course_scraper.quarters import latest_quarter
+from swecc_course_scraper.watch import Event, Watcher
+
+
+def backfill(  # noqa: PLR0913
+    output: str,
+    scheduler: FetchScheduler,
+    stop: threading.Event,
+    *,
+    first_year: int,
+    departments: Optional[Sequence[str]],
+    watched: Tuple[str, int],
+) -> CrawlStats:
+    """
+    Crawls historical schedule pages into output through a scheduler's COLD slots.
+
+    Progress is checkpointed like a --crawl, so an interrupted backfill resumes
+    where it stopped. Pages of the watched quarter are left out.
+
+    Args:
+        str: The output file: .sqlite/.sqlite3/.db for SQLite, or .jsonl.
+        FetchScheduler: Hands out the request slots.
+        threading.Event: Stops the backfill once set; pages in flight are retried
+            next time.
+        int: The first year to crawl.
+        Sequence[str]: Department codes to crawl, or None for every department.
+        Tuple[str, int]: The watched quarter and year (e.g., ("AUT", 2023)).
+
+    Returns:
+        CrawlStats: What happened to the pages.
+    """
+    with open_sink(output) as sink:
+        manifest = CrawlManifest(f"{output}{MANIFEST_SUFFIX}")
+        try:
+            manifest.add_jobs(
+                job
+                for job in enumerate_jobs(first_year, CURRENT_YEAR, departments)
+                if (job.quarter, job.year) != watched
+            )
+            pipeline = Pipeline(
+                sink,
+                manifest,
+                fetch_workers=1,
+                parse_workers=0,
+                fetch=scheduler.gate(fetch_page, COLD, stop),
+            )
+            jobs = itertools.takewhile(lambda _: not stop.is_set(), manifest.jobs())
+            return pipeline.run(jobs)
+        finally:
+            manifest.close()
+
+
+def command(  # noqa: PLR0913
+    departments: Sequence[str],
+    quarter: Optional[str] = None,
+    year: Optional[int] = None,
+    *,
+    interval: float = DEFAULT_INTERVAL,
+    polls: Optional[int] = None,
+    output: Optional[IO[str]] = None,
+    budget: float = DEFAULT_BUDGET,
+    backfill_output: Optional[str] = None,
+    backfill_since: int = EARLIEST_RECORDED_YEAR,
+    backfill_departments: Optional[Sequence[str]] = None,
+) -> str:
+    """
+    Watches departments' schedule pages for a quarter, writing a JSON Lines event
+    whenever a section (SLN) is added or removed, or its status, enrollment or
+    capacity changes.
+
+    Pages are polled with conditional requests, so departments whose page hasn't
+    changed cost a 304 and are not parsed again. Each department is polled on its
+    own jittered schedule within a budget of requests per second. Given a backfill
+    output, historical pages are crawled into it with whatever budget the polls
+    leave over; polls always go first.
+
+    Args:
+        Sequence[str]: Department codes to watch (e.g., ["cse", "math"]).
+        str: The quarter code (e.g., "AUT"). Default is the newest published quarter.
+        int: The year (e.g., 2023). Required with a quarter.
+        float: Seconds between polls of each department. Default is DEFAULT_INTERVAL.
+        int: Polls of every department to run. Default is to watch until interrupted.
+        IO[str]: Where events are written. Default is stdout.
+        float: Requests per second, polls and backfill together. Default is
+            DEFAULT_BUDGET.
+        str: A .sqlite/.db or .jsonl file to backfill historical pages into. Default
+            is no backfill.
+        int: The first year to backfill. Default is EARLIEST_RECORDED_YEAR.
+        Sequence[str]: Department codes to backfill. Default is every department.
+
+    Returns:
+        str: A summary of the polls (and backfill).
+
+    Raises:
+        ValueError: If no departments are given, the quarter or budget is invalid, or
+            the time schedule doesn't list a department.
+    """
+    if not departments:
+        raise ValueError("No departments to watch")
+    if quarter is None:
+        latest = latest_quarter()
+        if latest is None:
+            raise ValueError("Unable to find the current quarter; give one instead")
+        quarter, year = latest
+    quarter = quarter.upper()
+    if quarter not in VALID_QUARTERS:
+        raise ValueError("Quarter must be WIN, SPR, SUM, or AUT")
+    if year is None:
+        raise ValueError("A year is required with the quarter")
+    for department in departments:
+        check_department(department, quarter, year)
+    for department in backfill_departments or []:
+        check_department(department)
+    scheduler = FetchScheduler(budget)
+
+    out = output or sys.stdout
+
+    def emit(event: Event) -> None:
+        out.write(json.dumps(event) + "\n")
+        out.flush()
+
+    stop = threading.Event()
+    backfilled: List[CrawlStats] = []
+    thread = None
+    if backfill_output is not None:
+        # Opened first so an invalid output is reported before watching starts
+        with open_sink(backfill_output):
+            pass
+
+        def run_backfill() -> None:
+            try:
+                backfilled.append(
+                    backfill(
+                        backfill_output,
+                        scheduler,
+                        stop,
+                        first_year=backfill_since,
+                        departments=backfill_departments,
+                        watched=(quarter, year),
+                    )
+                )
+            except Exception:
+                logging.exception(f"Error backfilling {backfill_output}")
+
+        thread = threading.Thread(target=run_backfill, daemon=True)
+        thread.start()
+
+    watcher = Watcher(departments, quarter, year)
+    try:
+        stats = watcher.run_scheduled(scheduler, emit, interval, polls, stop)
+    except KeyboardInterrupt:
+        stats = watcher.stats
+    finally:
+        stop.set()
+        if thread is not None:
+            thread.join()
+
+    result = [
+        f"Watched {len(departments)} departments for {quarter} {year}: "
+        f"{stats.polls} polls, {stats.fetches} requests, "
+        f"{stats.not_modified} not modified, {stats.unchanged} unchanged, "
+        f"{stats.parsed} parsed, {stats.errors} errors, {stats.events} events"
+    ]
+    if backfilled:
+        result.append(
+            f"Backfilled {backfilled[0].done} pages into {backfill_output} "
+            f"({backfilled[0].failed} to retry)"
+        )
+    slots = scheduler.stats
+    result.append(
+        f"Requests: {slots.granted.get(HOT, 0)} polls, "
+        f"{slots.granted.get(COLD, 0)} backfill; longest poll wait "
+        f"{slots.max_wait.get(HOT, 0.0):.2f}s"
+    )
+    return "\n".join(result)
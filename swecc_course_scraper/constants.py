@@ -0,0 +1,13 @@
+"""
+Defaults and choices shared by the command line and the modules it dispatches to.
+
+Kept free of imports so that building the argument parser stays cheap.
+"""
+
+DEFAULT_YEARS_CHECK = 5  # Years --frequency and --frequency-dept look back
+OUTPUT_FORMATS = ["html", "csv", "json", "jsonl", "table"]  # html, then export.WRITERS
+MATRIX_FORMATS = ["csv", "json"]  # Formats of --frequency-dept's offering matrix
+EARLIEST_RECORDED_YEAR = 2003  # First year the time schedule is published for
+DEFAULT_WORKERS = 4  # Pages a crawl fetches at once
+DEFAULT_INTERVAL = 60.0  # Seconds between polls of every department
+DEFAULT_BUDGET = 5.0  # Requests per second, as the default fetcher's rate limit
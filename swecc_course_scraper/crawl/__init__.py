@@ -0,0 +1,45 @@
+"""
+Campus-wide crawling for the SWECC Course Scraper.
+
+A crawl enumerates (department, quarter, year) schedule pages from the
+department directory, fetches them with bounded concurrency, parses them into
+a sink (a SQLite store or a JSON Lines file) and checkpoints every page in a
+manifest, so an interrupted crawl resumes where it stopped. Pages flow through
+a Pipeline of fetch threads, parse processes and a single writer. Workers on
+several machines can share one manifest file, leasing pages from it with
+run_worker().
+"""
+
+from ..constants import DEFAULT_WORKERS
+from .crawler import crawl, enumerate_jobs, open_sink
+from .manifest import (
+    DONE,
+    FAILED,
+    LEASED,
+    MISSING,
+    PENDING,
+    CrawlJob,
+    CrawlManifest,
+)
+from .pipeline import CrawlStats, Pipeline, StageStats
+from .worker import default_worker_id, leased_jobs, run_worker
+
+__all__ = [
+    "DEFAULT_WORKERS",
+    "DONE",
+    "FAILED",
+    "LEASED",
+    "MISSING",
+    "PENDING",
+    "CrawlJob",
+    "CrawlManifest",
+    "CrawlStats",
+    "Pipeline",
+    "StageStats",
+    "crawl",
+    "default_worker_id",
+    "enumerate_jobs",
+    "leased_jobs",
+    "open_sink",
+    "run_worker",
+]
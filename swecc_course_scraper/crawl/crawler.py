@@ -0,0 +1,170 @@
+"""
+Crawl many schedule pages into a sink, checkpointing each page in a manifest.
+"""
+
+import hashlib
+import json
+import logging
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Any, Iterable, Iterator, List, Optional, Sequence, Set, Union
+
+from swecc_course_scraper.commands.schedule import CURRENT_YEAR
+from swecc_course_scraper.constants import DEFAULT_WORKERS, EARLIEST_RECORDED_YEAR
+from swecc_course_scraper.crawl.manifest import CrawlJob, CrawlManifest
+from swecc_course_scraper.crawl.pipeline import CrawlStats, Pipeline, Sink
+from swecc_course_scraper.departments import quarter_departments
+from swecc_course_scraper.export import JsonLinesWriter, SQLiteStore
+from swecc_course_scraper.quarters import latest_quarter, published_quarters
+
+# Output file suffixes and the sink each is written with. Both sinks can be resumed:
+# SQLite upserts, and JSON Lines is appended to, skipping lines of the page that may
+# have been stored without being marked done.
+SQLITE_SUFFIXES = (".sqlite", ".sqlite3", ".db")
+JSONL_SUFFIXES = (".jsonl",)
+
+
+class _AppendingJsonLinesWriter(JsonLinesWriter):
+    """
+    Appends courses to a JSON Lines file, leaving out lines it ended with already.
+
+    Pages are stored at least once (see CrawlManifest), so a resumed crawl can write
+    the courses of the page it stored last again; those lines are only written once.
+    """
+
+    def __init__(self, stream: IO[str], seen: Set[bytes]) -> None:
+        """
+        Args:
+            stream: The file, opened for appending.
+            seen: Digests of the lines the file ends with (see _last_quarter_digests()).
+        """
+        self._seen = seen
+        super().__init__(stream, kind="courses")
+
+    def _write_batch(self, batch: List[Any]) -> None:
+        # Filtered in place, so rows_written counts only the lines written
+        if self._seen:
+            batch[:] = [line for line in batch if _line_digest(line) not in self._seen]
+        if batch:
+            super()._write_batch(batch)
+
+
+def _line_digest(line: str) -> bytes:
+    return hashlib.blake2b(line.encode("utf-8"), digest_size=16).digest()
+
+
+def _last_quarter_digests(path: Union[str, Path]) -> Set[bytes]:
+    """
+    Returns the digests of the lines a JSON Lines file ends with that share its last
+    line's quarter, if the file exists.
+
+    The store stage writes, flushes and marks done one page at a time, so only the
+    page written last can be in the file without being done, and its lines are among
+    these. Memory is bounded by one quarter's courses however large the file grows.
+    """
+    digests: Set[bytes] = set()
+    last_quarter = None
+    try:
+        with open(path, encoding="utf-8") as f:
+            for raw_line in f:
+                line = raw_line.rstrip("\n")
+                if not line.strip():
+                    continue
+                try:
+                    course = json.loads(line)
+                    quarter = (course.get("quarter"), course.get("year"))
+                except (ValueError, AttributeError):  # e.g., a line cut short
+                    quarter = None
+                if quarter != last_quarter:
+                    digests, last_quarter = set(), quarter
+                digests.add(_line_digest(line))
+    except FileNotFoundError:
+        pass
+    return digests
+
+
+def enumerate_jobs(
+    first_year: int = EARLIEST_RECORDED_YEAR,
+    last_year: int = CURRENT_YEAR,
+    departments: Optional[Sequence[str]] = None,
+) -> Iterator[CrawlJob]:
+    """
+    Yield every published (department, quarter, year) page, newest quarter first.
+
+    Departments come from each quarter's department list. Quarters whose list can't
+    be fetched are left out (and logged); running the crawl again adds them.
+
+    Args:
+        int: The first year to crawl.
+        int: The last year to crawl, inclusive.
+        Optional[Sequence[str]]: Department codes to crawl. Defaults to every listed
+            department.
+    """
+    wanted = [department.lower() for department in departments or []]
+    latest = latest_quarter()
+    for year in range(last_year, first_year - 1, -1):
+        for quarter in reversed(published_quarters(year, latest)):
+            listed = quarter_departments(quarter, year)
+            if listed is None:
+                logging.warning(f"Not crawling {quarter} {year}: no department list")
+                continue
+            if wanted:
+                codes = [department for department in wanted if department in listed]
+            else:
+                codes = sorted(listed)
+            for department in codes:
+                yield CrawlJob(department, quarter, year)
+
+
+@contextmanager
+def open_sink(path: Union[str, Path]) -> Iterator[Sink]:
+    """
+    Open the sink for an output file: SQLite for .sqlite/.sqlite3/.db, or JSON Lines
+    (one course per line, appended) for .jsonl. Courses of the page a JSON Lines file
+    was last written with are not appended again.
+
+    Raises:
+        ValueError: If the file has another suffix.
+    """
+    suffix = Path(path).suffix.lower()
+    if suffix in SQLITE_SUFFIXES:
+        with SQLiteStore(path) as store:
+            yield store
+    elif suffix in JSONL_SUFFIXES:
+        seen = _last_quarter_digests(path)
+        with open(path, "a", newline="", encoding="utf-8") as f:
+            with _AppendingJsonLinesWriter(f, seen) as writer:
+                yield writer
+    else:
+        suffixes = ", ".join(SQLITE_SUFFIXES + JSONL_SUFFIXES)
+        raise ValueError(f"Crawl output must end with one of {suffixes}")
+
+
+def crawl(
+    jobs: Iterable[CrawlJob],
+    sink: Sink,
+    manifest: CrawlManifest,
+    workers: int = DEFAULT_WORKERS,
+    parse_workers: Optional[int] = None,
+) -> CrawlStats:
+    """
+    Fetch, parse and store pages, recording each one's outcome in the manifest.
+
+    Runs the pages through a Pipeline: fetch threads, parse processes and a single
+    writer on the calling thread.
+
+    Args:
+        Iterable[CrawlJob]: The pages to crawl.
+        Sink: Where courses are written (an export writer or SQLiteStore).
+        CrawlManifest: The crawl's checkpoint manifest.
+        int: Pages fetched at once. Default is DEFAULT_WORKERS.
+        Optional[int]: Processes parsing pages. Default is one per core; 0 parses on
+            one thread instead.
+
+    Returns:
+        CrawlStats: What happened to the pages, and each stage's stats.
+    """
+    pipeline = Pipeline(
+        sink, manifest, fetch_workers=workers, parse_workers=parse_workers
+    )
+    return pipeline.run(jobs)
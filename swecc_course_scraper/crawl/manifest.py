@@ -0,0 +1,366 @@
+"""
+Checkpoint manifest of a crawl.
+
+Every (department, quarter, year) page of a crawl has a row recording its
+status, the hash of the content last stored and when it was added and last
+updated. Pages are marked done only after their courses have been flushed to
+the sink, so a crawl that stops part way resumes from the pages that aren't.
+
+The manifest is also a work queue that crawls on several machines can share,
+as a file on a shared volume: each worker leases pages, renews its leases with
+heartbeats while it works on them and reports their outcome. A worker that
+stops without reporting loses its leases once they expire, and the pages go to
+the next worker that asks. Before storing a page, a worker claims it, which
+fails once its lease has expired, so pages taken over are not stored twice.
+Completing a page that is already done with the same content changes nothing,
+so a page finished twice is counted once.
+
+Courses reach the sink at least once, not exactly once: a page is written again
+if its worker stops between flushing it and marking it done, or stalls for longer
+than a lease between claiming and marking it. The SQLite sink upserts, so the
+repeat replaces the rows; the JSON Lines sink skips lines the file already has
+when a crawl resumes.
+
+The manifest keeps SQLite's rollback journal rather than WAL, which relies on
+memory shared between the processes opening the file and so is unsafe when
+they run on different machines. The shared volume must support file locking
+(e.g., NFS with lockd, or SMB).
+"""
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Union
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    department TEXT NOT NULL,
+    quarter TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    content_hash TEXT,
+    courses INTEGER,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    owner TEXT,
+    lease_expires REAL,
+    added REAL NOT NULL,
+    updated REAL NOT NULL,
+    PRIMARY KEY (department, quarter, year)
+);
+
+CREATE INDEX IF NOT EXISTS idx_pages_status ON pages (status);
+"""
+
+# Page statuses
+PENDING = "pending"  # Not fetched yet
+DONE = "done"  # Fetched, parsed and stored
+MISSING = "missing"  # The time schedule has no such page (404)
+FAILED = "failed"  # Couldn't be fetched; retried when the crawl resumes
+LEASED = "leased"  # Being crawled by a worker, until its lease expires
+STATUSES = [PENDING, DONE, MISSING, FAILED, LEASED]
+
+LEASE_DURATION = 5 * 60  # Seconds a worker holds a page without a heartbeat
+MAX_ATTEMPTS = 3  # Attempts before a failed page is no longer leased
+BUSY_TIMEOUT = 30  # Seconds to wait for another process's write to the manifest
+
+
+class CrawlJob(NamedTuple):
+    """One department's schedule page for one quarter."""
+
+    department: str
+    quarter: str
+    year: int
+
+
+class CrawlManifest:
+    """
+    SQLite-backed record of every page of a crawl and how far it got.
+    """
+
+    def __init__(self, path: Union[str, Path] = ":memory:") -> None:
+        """
+        Args:
+            path: The manifest file, created if missing. Reopening it resumes the crawl.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            str(path),
+            timeout=BUSY_TIMEOUT,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        with self._lock:
+            # Also switches back a manifest left in WAL mode by older versions
+            if str(path) != ":memory:":
+                self._connection.execute("PRAGMA journal_mode=DELETE")
+            self._connection.executescript(SCHEMA)
+
+    def add_jobs(self, jobs: Iterable[CrawlJob]) -> int:
+        """
+        Add pages to the crawl. Pages already in the manifest keep their status.
+
+        Returns:
+            int: The number of pages that were new.
+        """
+        now = time.time()
+        rows = [
+            (job.department, job.quarter, job.year, PENDING, now, now) for job in jobs
+        ]
+        with self._lock:
+            db = self._connection
+            before = db.total_changes
+            db.execute("BEGIN")
+            db.executemany(
+                "INSERT OR IGNORE INTO pages "
+                "(department, quarter, year, status, added, updated) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            db.execute("COMMIT")
+            return db.total_changes - before
+
+    def jobs(self, *statuses: str) -> List[CrawlJob]:
+        """
+        Returns the pages with any of the statuses, newest quarter first.
+
+        Args:
+            statuses: Page statuses. Defaults to the pages left to do (pending and
+                failed).
+        """
+        statuses = statuses or (PENDING, FAILED)
+        placeholders = ", ".join("?" * len(statuses))
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT department, quarter, year FROM pages "
+                f"WHERE status IN ({placeholders}) "
+                "ORDER BY year DESC, quarter, department",
+                statuses,
+            ).fetchall()
+        return [CrawlJob(*row) for row in rows]
+
+    def content_hash(self, job: CrawlJob) -> Optional[str]:
+        """Returns the hash of the content last stored for a done page, if any."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT content_hash FROM pages WHERE department = ? AND quarter = ? "
+                "AND year = ? AND status = ?",
+                (*job, DONE),
+            ).fetchone()
+        return row[0] if row else None
+
+    def lease(
+        self,
+        worker: str,
+        count: int = 1,
+        duration: float = LEASE_DURATION,
+        max_attempts: int = MAX_ATTEMPTS,
+    ) -> List[CrawlJob]:
+        """
+        Lease pages left to do to a worker, newest quarter first.
+
+        Pending pages, failed pages with fewer than max_attempts attempts and pages
+        whose lease has expired can be leased. Leasing is atomic across processes
+        sharing the manifest file, so no page is leased to two workers at once.
+
+        Args:
+            worker: The worker's ID, unique across machines (e.g., host and pid).
+            count: The most pages to lease.
+            duration: Seconds until the leases expire unless renewed by heartbeat().
+            max_attempts: Attempts after which a failed page is left alone.
+
+        Returns:
+            List[CrawlJob]: The leased pages; empty if none are left to lease.
+        """
+        now = time.time()
+        with self._lock:
+            db = self._connection
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                rows = db.execute(
+                    "SELECT department, quarter, year FROM pages "
+                    "WHERE status = ? OR (status = ? AND attempts < ?) "
+                    "OR (status = ? AND lease_expires < ?) "
+                    "ORDER BY year DESC, quarter, department LIMIT ?",
+                    (PENDING, FAILED, max_attempts, LEASED, now, count),
+                ).fetchall()
+                db.executemany(
+                    "UPDATE pages SET status = ?, owner = ?, lease_expires = ?, "
+                    "updated = ? WHERE department = ? AND quarter = ? AND year = ?",
+                    [(LEASED, worker, now + duration, now, *row) for row in rows],
+                )
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+        return [CrawlJob(*row) for row in rows]
+
+    def heartbeat(self, worker: str, duration: float = LEASE_DURATION) -> int:
+        """
+        Renew every lease a worker still holds for another duration seconds.
+
+        Returns:
+            int: The number of leases renewed. Leases that expired and were taken by
+                another worker are not renewed.
+        """
+        now = time.time()
+        with self._lock:
+            cursor = self._connection.execute(
+                "UPDATE pages SET lease_expires = ? WHERE status = ? AND owner = ?",
+                (now + duration, LEASED, worker),
+            )
+        return cursor.rowcount
+
+    def release(self, worker: str) -> int:
+        """
+        Return the pages a worker still holds to pending, e.g. when it stops early.
+
+        Returns:
+            int: The number of pages released.
+        """
+        with self._lock:
+            cursor = self._connection.execute(
+                "UPDATE pages SET status = ?, owner = NULL, lease_expires = NULL "
+                "WHERE status = ? AND owner = ?",
+                (PENDING, LEASED, worker),
+            )
+        return cursor.rowcount
+
+    def claim(
+        self, job: CrawlJob, worker: str, duration: float = LEASE_DURATION
+    ) -> bool:
+        """
+        Renew a worker's lease of one page before it stores the page.
+
+        Returns:
+            bool: Whether the worker still held an unexpired lease, so no other worker
+                can take the page over for another duration seconds.
+        """
+        now = time.time()
+        with self._lock:
+            cursor = self._connection.execute(
+                "UPDATE pages SET lease_expires = ? WHERE department = ? "
+                "AND quarter = ? AND year = ? AND status = ? AND owner = ? "
+                "AND lease_expires >= ?",
+                (now + duration, *job, LEASED, worker, now),
+            )
+        return cursor.rowcount > 0
+
+    def leased(self, exclude: Optional[str] = None) -> int:
+        """
+        Returns the number of pages leased, including expired leases.
+
+        Args:
+            exclude: A worker whose leases aren't counted.
+        """
+        with self._lock:
+            (count,) = self._connection.execute(
+                "SELECT COUNT(*) FROM pages WHERE status = ? AND owner IS NOT ?",
+                (LEASED, exclude),
+            ).fetchone()
+        return int(count)
+
+    def mark_done(
+        self,
+        job: CrawlJob,
+        content_hash: str,
+        courses: int,
+        *,
+        worker: Optional[str] = None,
+    ) -> bool:
+        """
+        Record that a page's courses have been stored.
+
+        Completion is idempotent: a page already done with the same content hash
+        (e.g., finished by a worker whose lease expired and by the one that took it
+        over) is left as it is.
+
+        Returns:
+            bool: Whether the page was recorded, False if it was already done.
+        """
+        return self._update(
+            job, DONE, content_hash=content_hash, courses=courses, worker=worker
+        )
+
+    def mark_missing(self, job: CrawlJob, *, worker: Optional[str] = None) -> bool:
+        """
+        Record that the time schedule has no such page.
+
+        Returns:
+            bool: Whether the page was recorded. A worker's report is ignored once
+                its lease has been taken over.
+        """
+        return self._update(job, MISSING, worker=worker)
+
+    def mark_failed(
+        self, job: CrawlJob, error: str, *, worker: Optional[str] = None
+    ) -> bool:
+        """
+        Record that a page couldn't be fetched, so a later run retries it.
+
+        Returns:
+            bool: Whether the page was recorded. A worker's report is ignored once
+                its lease has been taken over.
+        """
+        return self._update(job, FAILED, error=error, worker=worker)
+
+    def counts(self) -> Dict[str, int]:
+        """Returns the number of pages per status."""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT status, COUNT(*) FROM pages GROUP BY status"
+            ).fetchall()
+        counts = dict.fromkeys(STATUSES, 0)
+        counts.update(rows)
+        return counts
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def _update(  # noqa: PLR0913
+        self,
+        job: CrawlJob,
+        status: str,
+        *,
+        content_hash: Optional[str] = None,
+        courses: Optional[int] = None,
+        error: Optional[str] = None,
+        worker: Optional[str] = None,
+    ) -> bool:
+        now = time.time()
+        with self._lock:
+            cursor = self._connection.execute(
+                "INSERT INTO pages (department, quarter, year, status, content_hash, "
+                "courses, attempts, error, added, updated) "
+                "VALUES (?, ?, ?, ?, ?, ?, 1, ?, ?, ?) "
+                "ON CONFLICT (department, quarter, year) DO UPDATE SET "
+                "status = excluded.status, content_hash = excluded.content_hash, "
+                "courses = excluded.courses, attempts = attempts + 1, "
+                "error = excluded.error, owner = NULL, lease_expires = NULL, "
+                "updated = excluded.updated "
+                # Completing a page again with the same content is a no-op
+                "WHERE NOT (pages.status = ? AND excluded.status = ? "
+                "AND pages.content_hash IS excluded.content_hash) "
+                # Only the lease holder reports a leased page as missing or failed
+                "AND (? IS NULL OR excluded.status = ? "
+                "OR (pages.status = ? AND pages.owner = ?))",
+                (
+                    *job,
+                    status,
+                    content_hash,
+                    courses,
+                    error,
+                    now,
+                    now,
+                    DONE,
+                    DONE,
+                    worker,
+                    DONE,
+                    LEASED,
+                    worker,
+                ),
+            )
+        return cursor.rowcount > 0
@@ -0,0 +1,430 @@
+"""
+Staged fetch -> parse -> store pipeline for crawls.
+
+Fetching is I/O-bound, parsing is CPU-bound and storing needs a single
+writer, so each runs as its own stage:
+
+- fetch: a pool of threads downloading pages through the shared fetcher.
+- parse: a process pool running the parser, so parsing uses every core
+  instead of contending for the GIL with the fetch threads.
+- store: the calling thread, writing courses to the sink and checkpointing
+  the manifest.
+
+Stages are connected by bounded queues. When a later stage falls behind, the
+queue in front of it fills and the earlier stage blocks, so a slow sink slows
+fetching down instead of growing memory. Every stage counts the items it has
+processed and the time it spent, and its input queue's depth can be read at
+any time through Pipeline.stage_stats().
+"""
+
+import hashlib
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Union
+
+from swecc_course_scraper.commands.parser import iter_schedule_html
+from swecc_course_scraper.commands.schedule import fetch_html, schedule_url
+from swecc_course_scraper.constants import DEFAULT_WORKERS
+from swecc_course_scraper.crawl.manifest import (
+    FAILED,
+    LEASE_DURATION,
+    MISSING,
+    CrawlJob,
+    CrawlManifest,
+)
+from swecc_course_scraper.export import CourseWriter, SQLiteStore
+from swecc_course_scraper.models import Course
+
+DEFAULT_QUEUE_SIZE = 8  # Items each queue holds before the stage feeding it blocks
+QUEUE_POLL_INTERVAL = 0.1  # Seconds between checks for a stopped pipeline
+
+Sink = Union[CourseWriter, SQLiteStore]
+
+# Outcomes of a page besides MISSING and FAILED
+PARSED = "parsed"
+UNCHANGED = "unchanged"
+
+# Marks the end of a queue's items
+_END = object()
+
+
+@dataclass
+class CrawlStats:
+    """
+    Counters describing a crawl run.
+    """
+
+    done: int = 0  # Pages stored
+    unchanged: int = 0  # Pages refetched with the same content as stored before
+    missing: int = 0  # Pages the time schedule doesn't have
+    failed: int = 0  # Pages that couldn't be fetched or parsed
+    taken_over: int = 0  # Leased pages another worker took over before they were stored
+    courses: int = 0  # Courses written to the sink
+    # Each pipeline stage's stats at the end of the run
+    stages: Dict[str, "StageStats"] = field(default_factory=dict)
+
+
+@dataclass
+class StageStats:
+    """
+    Counters describing one stage of a pipeline.
+    """
+
+    name: str
+    workers: int
+    processed: int = 0  # Items the stage has finished
+    busy: float = 0.0  # Seconds spent working, summed over the stage's workers
+    depth: int = 0  # Items waiting in the stage's input queue
+    max_depth: int = 0  # Most items seen waiting in the input queue
+    elapsed: float = 0.0  # Seconds since the pipeline started
+
+    @property
+    def throughput(self) -> float:
+        """Items processed per second since the pipeline started."""
+        return self.processed / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def utilization(self) -> float:
+        """Fraction of the stage's worker time spent working."""
+        capacity = self.elapsed * self.workers
+        return self.busy / capacity if capacity else 0.0
+
+
+class _Page(NamedTuple):
+    """A page on its way through the pipeline."""
+
+    job: CrawlJob
+    outcome: str  # PARSED, UNCHANGED, MISSING or FAILED
+    html: Optional[str] = None
+    content_hash: Optional[str] = None
+    courses: Optional[List[Course]] = None
+    error: Optional[str] = None
+
+
+class _StoppedError(Exception):
+    """Raised in a worker when the pipeline has been stopped."""
+
+
+def fetch_page(job: CrawlJob) -> str:
+    """Fetch a job's schedule page through the shared fetcher."""
+    return fetch_html(schedule_url(*job))
+
+
+def parse_page(html: str, quarter: str, year: int) -> List[Course]:
+    """Parse a schedule page into its courses (run in the parse processes)."""
+    return list(iter_schedule_html(html, quarter, year))
+
+
+class Pipeline:
+    """
+    Runs crawl jobs through fetch, parse and store stages connected by bounded queues.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        sink: Sink,
+        manifest: CrawlManifest,
+        *,
+        fetch_workers: int = DEFAULT_WORKERS,
+        parse_workers: Optional[int] = None,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        report_interval: Optional[float] = None,
+        fetch: Callable[[CrawlJob], str] = fetch_page,
+        clock: Callable[[], float] = time.monotonic,
+        worker: Optional[str] = None,
+        lease_duration: float = LEASE_DURATION,
+        stop: Optional[threading.Event] = None,
+    ) -> None:
+        """
+        Args:
+            sink: Where courses are written (an export writer or SQLiteStore).
+            manifest: The crawl's checkpoint manifest.
+            fetch_workers: Threads fetching pages.
+            parse_workers: Processes parsing pages. None uses one per core; 0 parses
+                on a single thread instead (no process pool).
+            queue_size: Items each queue between stages holds.
+            report_interval: Seconds between logging the stage stats (None never).
+            fetch: Returns the HTML of a job's page. Defaults to fetch_page().
+            clock: Time source for the stats, in seconds.
+            worker: The worker ID pages are reported under, when the jobs are leased
+                from a shared manifest.
+            lease_duration: Seconds a worker's lease of a page is renewed for when it
+                claims the page to store it.
+            stop: Set when a stage fails or storing is interrupted, so that a job
+                iterator waiting for more work (e.g., leased_jobs()) can return.
+        """
+        self.sink = sink
+        self.manifest = manifest
+        self.fetch_workers = max(1, fetch_workers)
+        self.parse_workers = parse_workers
+        self.report_interval = report_interval
+        self._fetch = fetch
+        self._clock = clock
+        self.worker = worker
+        self.lease_duration = lease_duration
+        self._started = clock()
+        self._stop = stop or threading.Event()
+        self._error: Optional[BaseException] = None  # What stopped a stage, if any
+        self._lock = threading.Lock()
+        self._queues: Dict[str, queue.Queue[Any]] = {
+            name: queue.Queue(max(1, queue_size))
+            for name in ("fetch", "parse", "store")
+        }
+        parse_threads = 1 if parse_workers == 0 else parse_workers
+        self._stats = {
+            "fetch": StageStats("fetch", self.fetch_workers),
+            "parse": StageStats("parse", parse_threads or os.cpu_count() or 1),
+            "store": StageStats("store", 1),
+        }
+
+    def run(self, jobs: Iterable[CrawlJob]) -> CrawlStats:
+        """
+        Crawl the jobs, returning once every page is stored or has failed.
+
+        Pages are marked done in the manifest only once their courses are flushed to
+        the sink, so a page can be written twice if the run stops in between. A
+        worker's pages are only written while it still holds their lease. Pages whose
+        content hash matches what the manifest recorded are not parsed or written
+        again. If any stage raises (or storing is interrupted), the other stages are
+        stopped and the error is raised.
+        """
+        self._started = self._clock()
+        # Spawned rather than forked, since the other stages' threads are running
+        pool = (
+            ProcessPoolExecutor(
+                self._stats["parse"].workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            if self.parse_workers != 0
+            else None
+        )
+        threads = [threading.Thread(target=self._feed, args=(jobs,), daemon=True)]
+        remaining = {
+            "fetch": _Counter(self._stats["fetch"].workers),
+            "parse": _Counter(self._stats["parse"].workers),
+        }
+        threads += [
+            threading.Thread(
+                target=self._fetch_worker, args=(remaining["fetch"],), daemon=True
+            )
+            for _ in range(self._stats["fetch"].workers)
+        ]
+        threads += [
+            threading.Thread(
+                target=self._parse_worker, args=(pool, remaining["parse"]), daemon=True
+            )
+            for _ in range(self._stats["parse"].workers)
+        ]
+        for thread in threads:
+            thread.start()
+
+        try:
+            stats = self._store()
+        except _StoppedError:
+            pass  # Another stage failed; its error is raised below
+        except BaseException:
+            self._stop.set()
+            raise
+        finally:
+            for thread in threads:
+                thread.join()
+            if pool is not None:
+                pool.shutdown(wait=True, cancel_futures=True)
+        if self._error is not None:
+            raise self._error
+        return stats
+
+    def stage_stats(self) -> Dict[str, StageStats]:
+        """Returns a snapshot of each stage's counters and input queue depth."""
+        elapsed = self._clock() - self._started
+        with self._lock:
+            return {
+                name: replace(stats, depth=self._queues[name].qsize(), elapsed=elapsed)
+                for name, stats in self._stats.items()
+            }
+
+    def report(self) -> str:
+        """Returns one line per stage with its queue depth and throughput."""
+        return format_stages(self.stage_stats())
+
+    def _feed(self, jobs: Iterable[CrawlJob]) -> None:
+        try:
+            for job in jobs:
+                self._put("fetch", job)
+            for _ in range(self._stats["fetch"].workers):
+                self._put("fetch", _END)
+        except _StoppedError:
+            pass
+        except BaseException as e:
+            self._fail(e)
+
+    def _fetch_worker(self, remaining: "_Counter") -> None:
+        try:
+            while (job := self._get("fetch")) is not _END:
+                start = self._clock()
+                page = self._fetch_page(job)
+                self._record("fetch", start)
+                self._put("parse", page)
+            if remaining.decrement() == 0:
+                for _ in range(self._stats["parse"].workers):
+                    self._put("parse", _END)
+        except _StoppedError:
+            pass
+        except BaseException as e:
+            self._fail(e)
+
+    def _fetch_page(self, job: CrawlJob) -> _Page:
+        try:
+            html = self._fetch(job)
+        except FileNotFoundError:
+            return _Page(job, MISSING)
+        except Exception as e:  # Connection errors, and anything else, are retried
+            logging.exception(f"Error fetching schedule for {' '.join(map(str, job))}")
+            return _Page(job, FAILED, error=str(e))
+
+        content_hash = hashlib.sha256(html.encode("utf-8")).hexdigest()
+        if self.manifest.content_hash(job) == content_hash:
+            return _Page(job, UNCHANGED)
+        return _Page(job, PARSED, html=html, content_hash=content_hash)
+
+    def _parse_worker(
+        self, pool: Optional[ProcessPoolExecutor], remaining: "_Counter"
+    ) -> None:
+        try:
+            while (page := self._get("parse")) is not _END:
+                if page.outcome == PARSED:
+                    start = self._clock()
+                    page = self._parse_page(pool, page)
+                    self._record("parse", start)
+                self._put("store", page)
+            if remaining.decrement() == 0:
+                self._put("store", _END)
+        except _StoppedError:
+            pass
+        except BaseException as e:
+            self._fail(e)
+
+    def _parse_page(self, pool: Optional[ProcessPoolExecutor], page: _Page) -> _Page:
+        job = page.job
+        assert page.html is not None
+        try:
+            if pool is None:
+                courses = parse_page(page.html, job.quarter, job.year)
+            else:
+                courses = pool.submit(
+                    parse_page, page.html, job.quarter, job.year
+                ).result()
+        except Exception as e:
+            logging.exception(f"Error parsing schedule for {' '.join(map(str, job))}")
+            return _Page(job, FAILED, error=f"Parse error: {e}")
+        return page._replace(html=None, courses=courses)
+
+    def _store(self) -> CrawlStats:
+        stats = CrawlStats()
+        last_report = self._clock()
+        while (page := self._get("store")) is not _END:
+            start = self._clock()
+            job = page.job
+            if (
+                page.outcome == PARSED
+                and self.worker is not None
+                and not self.manifest.claim(job, self.worker, self.lease_duration)
+            ):
+                stats.taken_over += 1
+            elif page.outcome == PARSED:
+                assert page.content_hash is not None and page.courses is not None
+                self.sink.write_courses(page.courses)
+                self.sink.flush()
+                if self.manifest.mark_done(
+                    job, page.content_hash, len(page.courses), worker=self.worker
+                ):
+                    stats.done += 1
+                    stats.courses += len(page.courses)
+                else:  # Already completed by a worker whose lease had expired
+                    stats.unchanged += 1
+            elif page.outcome == UNCHANGED:
+                stats.unchanged += 1
+            elif page.outcome == MISSING:
+                self.manifest.mark_missing(job, worker=self.worker)
+                stats.missing += 1
+            else:
+                self.manifest.mark_failed(job, page.error or "", worker=self.worker)
+                stats.failed += 1
+            self._record("store", start)
+
+            if (
+                self.report_interval is not None
+                and self._clock() - last_report >= self.report_interval
+            ):
+                last_report = self._clock()
+                logging.info(self.report())
+        stats.stages = self.stage_stats()
+        return stats
+
+    def _fail(self, error: BaseException) -> None:
+        """Record the first error raised in a stage and stop the others."""
+        with self._lock:
+            if self._error is None:
+                self._error = error
+        self._stop.set()
+
+    def _put(self, name: str, item: Any) -> None:
+        """Put an item on a queue, blocking while it is full."""
+        destination = self._queues[name]
+        while True:
+            if self._stop.is_set():
+                raise _StoppedError
+            try:
+                destination.put(item, timeout=QUEUE_POLL_INTERVAL)
+            except queue.Full:
+                continue
+            depth = destination.qsize()
+            with self._lock:
+                stats = self._stats[name]
+                stats.max_depth = max(stats.max_depth, depth)
+            return
+
+    def _get(self, name: str) -> Any:
+        """Take an item from a queue, blocking while it is empty."""
+        source = self._queues[name]
+        while True:
+            if self._stop.is_set():
+                raise _StoppedError
+            try:
+                return source.get(timeout=QUEUE_POLL_INTERVAL)
+            except queue.Empty:
+                continue
+
+    def _record(self, name: str, start: float) -> None:
+        with self._lock:
+            stats = self._stats[name]
+            stats.processed += 1
+            stats.busy += self._clock() - start
+
+
+def format_stages(stages: Dict[str, StageStats]) -> str:
+    """One line per stage with its throughput, busy time and queue depth."""
+    return "\n".join(
+        f"{stats.name}: {stats.processed} done, {stats.throughput:.1f}/s, "
+        f"{stats.utilization:.0%} busy, queue {stats.depth} (max {stats.max_depth})"
+        for stats in stages.values()
+    )
+
+
+class _Counter:
+    """Thread-safe countdown of a stage's workers still running."""
+
+    def __init__(self, count: int) -> None:
+        self._count = count
+        self._lock = threading.Lock()
+
+    def decrement(self) -> int:
+        with self._lock:
+            self._count -= 1
+            return self._count
@@ -0,0 +1,139 @@
+"""
+Crawl pages leased from a manifest shared by workers on several machines.
+
+Every worker opens the same manifest file (e.g., on a shared volume), leases a
+batch of pages at a time and runs them through its own Pipeline into its own
+sink. A heartbeat thread renews the worker's leases while its pages are queued
+or in flight, so only the pages of a worker that stopped expire and get leased
+again. A worker exits once no pages are left to lease and no other worker holds
+a lease that could still expire back to the queue.
+"""
+
+import os
+import socket
+import threading
+from typing import Iterator, Optional
+
+from swecc_course_scraper.constants import DEFAULT_WORKERS
+from swecc_course_scraper.crawl.manifest import (
+    LEASE_DURATION,
+    MAX_ATTEMPTS,
+    CrawlJob,
+    CrawlManifest,
+)
+from swecc_course_scraper.crawl.pipeline import CrawlStats, Pipeline, Sink
+
+DEFAULT_LEASE_BATCH = 8  # Pages leased at once
+LEASE_POLL_INTERVAL = 5.0  # Seconds between asking for pages held by other workers
+
+
+def default_worker_id() -> str:
+    """Returns an ID for this process that is unique across machines."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def leased_jobs(  # noqa: PLR0913
+    manifest: CrawlManifest,
+    worker: str,
+    *,
+    batch: int = DEFAULT_LEASE_BATCH,
+    duration: float = LEASE_DURATION,
+    max_attempts: int = MAX_ATTEMPTS,
+    poll_interval: float = LEASE_POLL_INTERVAL,
+    stop: Optional[threading.Event] = None,
+) -> Iterator[CrawlJob]:
+    """
+    Yield pages leased from the manifest, a batch at a time, until none are left.
+
+    While other workers hold leases, waits for them to finish or expire rather than
+    stopping, so the pages of a worker that died are still crawled. This worker's own
+    leases aren't waited for; pages of its that fail are left to the workers still
+    running, or to the next run.
+
+    Args:
+        manifest: The shared manifest.
+        worker: This worker's ID.
+        batch: Pages leased at once.
+        duration: Seconds each lease lasts without a heartbeat.
+        max_attempts: Attempts after which a failed page is left alone.
+        poll_interval: Seconds between asking for pages while others hold leases.
+        stop: Stops leasing once set.
+    """
+    stop = stop or threading.Event()
+    while not stop.is_set():
+        jobs = manifest.lease(worker, batch, duration, max_attempts)
+        if jobs:
+            yield from jobs
+        elif manifest.leased(exclude=worker):
+            stop.wait(poll_interval)
+        else:
+            return
+
+
+def run_worker(  # noqa: PLR0913
+    sink: Sink,
+    manifest: CrawlManifest,
+    worker: Optional[str] = None,
+    *,
+    fetch_workers: int = DEFAULT_WORKERS,
+    parse_workers: Optional[int] = None,
+    batch: int = DEFAULT_LEASE_BATCH,
+    duration: float = LEASE_DURATION,
+    poll_interval: float = LEASE_POLL_INTERVAL,
+) -> CrawlStats:
+    """
+    Crawl pages leased from a shared manifest until none are left.
+
+    If the crawl stops early (e.g., it's interrupted or the sink raises), the pages
+    this worker still holds are released so other workers take them straight away.
+
+    Args:
+        sink: Where this worker writes courses.
+        manifest: The shared manifest.
+        worker: This worker's ID. Defaults to default_worker_id().
+        fetch_workers: Threads fetching pages.
+        parse_workers: Processes parsing pages, as for Pipeline.
+        batch: Pages leased at once.
+        duration: Seconds each lease lasts without a heartbeat. Leases are renewed
+            every third of it.
+        poll_interval: Seconds between asking for pages while others hold leases.
+
+    Returns:
+        CrawlStats: What happened to the pages this worker crawled.
+    """
+    worker = worker or default_worker_id()
+    stop = threading.Event()
+
+    def heartbeat() -> None:
+        while not stop.wait(duration / 3):
+            manifest.heartbeat(worker, duration)
+
+    heartbeats = threading.Thread(target=heartbeat, daemon=True)
+    heartbeats.start()
+    pipeline = Pipeline(
+        sink,
+        manifest,
+        fetch_workers=fetch_workers,
+        parse_workers=parse_workers,
+        worker=worker,
+        lease_duration=duration,
+        stop=stop,
+    )
+    try:
+        return pipeline.run(
+            leased_jobs(
+                manifest,
+                worker,
+                batch=batch,
+                duration=duration,
+                poll_interval=poll_interval,
+                stop=stop,
+            )
+        )
+    except BaseException:
+        stop.set()
+        manifest.release(worker)
+        raise
+    finally:
+        stop.set()
+        heartbeats.join()
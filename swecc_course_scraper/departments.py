@@ -0,0 +1,298 @@
+"""
+Directory of the departments listed in each quarter's time schedule.
+
+Each quarter's index page (e.g. .../timeschd/AUT2023/) links the schedule
+page of every department offering courses that quarter. The directory keeps
+those department codes and page filenames per quarter in the data directory,
+so department codes can be checked with a set lookup instead of a 404 per
+quarter, and campus-wide crawls know which pages exist.
+
+Past quarters' lists are kept as they are; the current year's are fetched
+again once they are older than DEPARTMENTS_MAX_AGE.
+"""
+
+import difflib
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from swecc_course_scraper.commands.schedule import (
+    CURRENT_YEAR,
+    fetch_html,
+    schedule_root,
+)
+from swecc_course_scraper.paths import data_dir
+from swecc_course_scraper.quarters import latest_quarter
+
+DEPARTMENTS_FILE = "departments.json"
+DIRECTORY_VERSION = 1
+DEPARTMENTS_MAX_AGE = 7 * 24 * 60 * 60  # Seconds a current-year list is trusted for
+
+# Department page links on a quarter's index page, e.g. <a href="cse.html">
+DEPARTMENT_LINK_PATTERN = re.compile(
+    r"href\s*=\s*[\"']?([a-z]+)\.html\b", re.IGNORECASE
+)
+
+
+def directory_path() -> Path:
+    """
+    Returns:
+        Path: The file the department directory is saved to.
+    """
+    return data_dir() / DEPARTMENTS_FILE
+
+
+def parse_departments(html: str) -> Dict[str, str]:
+    """
+    Returns the departments linked from a quarter's time schedule index page.
+
+    Args:
+        str: The index page HTML.
+
+    Returns:
+        Dict[str, str]: Department code (e.g., "cse") to page filename (e.g.,
+        "cse.html").
+    """
+    return {
+        page.lower(): f"{page.lower()}.html"
+        for page in DEPARTMENT_LINK_PATTERN.findall(html)
+    }
+
+
+class DepartmentDirectory:
+    """
+    Department codes and schedule page filenames, per quarter.
+    """
+
+    def __init__(self, path: Optional[Path] = None, root: Optional[str] = None) -> None:
+        """
+        Args:
+            path: The file the directory is loaded from and saved to. Defaults to
+                directory_path().
+            root: The time schedule the lists are from. Defaults to schedule_root().
+        """
+        self.path = path or directory_path()
+        self.root = root or schedule_root()
+        self.quarters: Dict[str, Dict[str, str]] = {}  # "AUT 2023" -> code -> page
+        self.fetched: Dict[str, float] = {}  # "AUT 2023" -> when its list was fetched
+        self._known: Set[str] = set()  # Codes listed in any quarter
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()  # Held while writing the file
+
+    @classmethod
+    def load(
+        cls, path: Optional[Path] = None, root: Optional[str] = None
+    ) -> "DepartmentDirectory":
+        """
+        Load the saved directory, or start an empty one if there is none (or it is
+        from another directory version or time schedule).
+        """
+        directory = cls(path, root)
+        try:
+            with open(directory.path, encoding="utf-8") as f:
+                data = json.load(f)
+            if (
+                data.get("version") != DIRECTORY_VERSION
+                or data.get("root") != directory.root
+            ):
+                return directory
+            for key, entry in data["quarters"].items():
+                directory.quarters[key] = dict(entry["departments"])
+                directory.fetched[key] = float(entry["fetched"])
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            directory.quarters, directory.fetched = {}, {}
+        directory._known = {
+            code for departments in directory.quarters.values() for code in departments
+        }
+        return directory
+
+    def save(self) -> None:
+        """
+        Write the directory atomically.
+
+        Saves are serialized, so an older snapshot never replaces a newer one, and each
+        writes a temporary file of its own that replaces the directory once complete.
+        """
+        with self._save_lock:
+            with self._lock:
+                data = {
+                    "version": DIRECTORY_VERSION,
+                    "root": self.root,
+                    "quarters": {
+                        key: {"fetched": self.fetched[key], "departments": departments}
+                        for key, departments in self.quarters.items()
+                    },
+                }
+            fd, tmp_path = tempfile.mkstemp(
+                dir=self.path.parent, prefix=f"{self.path.name}.", suffix=".tmp"
+            )
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(data, f, separators=(",", ":"))
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                os.remove(tmp_path)
+                raise
+
+    def add_quarter(
+        self, quarter: str, year: int, html: str, fetched_at: Optional[float] = None
+    ) -> int:
+        """
+        Replace a quarter's list with the departments linked from its index page.
+
+        Args:
+            quarter: The quarter code (e.g., "WIN").
+            year: The year (e.g., 2023).
+            html: The quarter's index page.
+            fetched_at: When the page was fetched (epoch seconds). Defaults to now.
+
+        Returns:
+            int: The number of departments listed.
+        """
+        departments = parse_departments(html)
+        key = f"{quarter.upper()} {year}"
+        with self._lock:
+            self.quarters[key] = departments
+            self.fetched[key] = time.time() if fetched_at is None else fetched_at
+            self._known |= departments.keys()
+        return len(departments)
+
+    def has_quarter(
+        self, quarter: str, year: int, max_age: Optional[float] = None
+    ) -> bool:
+        """
+        Returns whether a quarter's list is in the directory (and, if max_age is given
+        and the quarter is from the current year, fetched less than max_age seconds ago).
+        """
+        key = f"{quarter.upper()} {year}"
+        if key not in self.quarters:
+            return False
+        if max_age is None or year < CURRENT_YEAR:
+            return True
+        return time.time() - self.fetched[key] < max_age
+
+    def departments(self, quarter: str, year: int) -> Dict[str, str]:
+        """Returns a quarter's department codes and page filenames (empty if unknown)."""
+        return dict(self.quarters.get(f"{quarter.upper()} {year}", {}))
+
+    def __contains__(self, department: object) -> bool:
+        """Whether a department code is listed in any quarter of the directory."""
+        return isinstance(department, str) and department.lower() in self._known
+
+    def __len__(self) -> int:
+        return len(self._known)
+
+    def suggestions(self, department: str) -> List[str]:
+        """Listed department codes that look like a misspelling of department."""
+        return difflib.get_close_matches(department.lower(), sorted(self._known), n=3)
+
+
+_directory: Optional[DepartmentDirectory] = None
+_directory_lock = threading.Lock()
+
+
+def load_directory() -> DepartmentDirectory:
+    """
+    Returns the saved directory, loading it once per process (and again if the data
+    directory or time schedule changes).
+    """
+    global _directory  # noqa: PLW0603
+    with _directory_lock:
+        if (
+            _directory is None
+            or _directory.path != directory_path()
+            or _directory.root != schedule_root()
+        ):
+            _directory = DepartmentDirectory.load()
+        return _directory
+
+
+def quarter_departments(
+    quarter: str, year: int, max_age: float = DEPARTMENTS_MAX_AGE
+) -> Optional[Dict[str, str]]:
+    """
+    Returns the departments with a schedule page for a quarter, fetching the quarter's
+    index page if its list isn't in the directory (or is a current-year list older
+    than max_age).
+
+    Args:
+        str: The quarter code (e.g., "WIN").
+        int: The year (e.g., 2023).
+        float: Seconds a current-year list is used for. Default is DEPARTMENTS_MAX_AGE.
+
+    Returns:
+        Optional[Dict[str, str]]: Department code to page filename (empty for a past
+        quarter without an index page), or None if the quarter's index page isn't
+        published yet or couldn't be fetched.
+    """
+    directory = load_directory()
+    quarter = quarter.upper()
+    if not directory.has_quarter(quarter, year, max_age):
+        url = f"{directory.root}{quarter}{year}/"
+        try:
+            directory.add_quarter(quarter, year, fetch_html(url))
+        except FileNotFoundError:
+            # A past quarter without an index had no departments; this year's may
+            # still be published
+            if year < CURRENT_YEAR:
+                directory.add_quarter(quarter, year, "")
+                directory.save()
+        except ConnectionError:
+            logging.exception(f"Error fetching the department list {url}")
+        else:
+            directory.save()
+    if not directory.has_quarter(quarter, year):
+        return None
+    return directory.departments(quarter, year)
+
+
+def _quarters_to_check(
+    quarter: Optional[str], year: Optional[int]
+) -> Iterator[Tuple[str, int]]:
+    """The given quarter, then the newest published one (probed only if needed)."""
+    if quarter is not None and year is not None:
+        yield quarter, int(year)
+    latest = latest_quarter()
+    if latest is not None:
+        yield latest
+
+
+def check_department(
+    department: str, quarter: Optional[str] = None, year: Optional[int] = None
+) -> None:
+    """
+    Reject a department code the time schedule doesn't list.
+
+    Known codes are a set lookup. An unlisted code fetches the lists of the given
+    quarter and the newest published quarter first, if they aren't in the directory
+    already, in case it is new. If no list can be fetched the code is let through.
+
+    Args:
+        str: The department code (e.g., "cse").
+        Optional[str]: The quarter the department is needed for (e.g., "WIN").
+        Optional[int]: The year the department is needed for (e.g., 2023).
+
+    Raises:
+        ValueError: If the department isn't listed.
+    """
+    directory = load_directory()
+    if department in directory:
+        return
+
+    for listed in _quarters_to_check(quarter, year):
+        departments = quarter_departments(*listed)
+        if departments is not None and department.lower() in departments:
+            return
+
+    if len(directory):
+        message = f"Unknown department: {department}"
+        suggestions = directory.suggestions(department)
+        if suggestions:
+            message += f" (did you mean {', '.join(suggestions)}?)"
+        raise ValueError(message)
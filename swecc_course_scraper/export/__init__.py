@@ -0,0 +1,31 @@
+"""
+Export writers for the SWECC Course Scraper.
+
+This package contains streaming writers that turn parsed Course and
+CourseMeeting objects into CSV, JSON, JSON Lines and table output, and a
+SQLite store.
+"""
+
+from .sqlite import SQLiteStore
+from .writers import (
+    DEFAULT_BATCH_SIZE,
+    WRITERS,
+    CourseWriter,
+    CsvWriter,
+    JsonLinesWriter,
+    JsonWriter,
+    TableWriter,
+    open_writer,
+)
+
+__all__ = [
+    "DEFAULT_BATCH_SIZE",
+    "WRITERS",
+    "CourseWriter",
+    "CsvWriter",
+    "JsonLinesWriter",
+    "JsonWriter",
+    "SQLiteStore",
+    "TableWriter",
+    "open_writer",
+]
@@ -0,0 +1,296 @@
+"""
+SQLite storage for parsed schedule data.
+
+Courses are stored in a normalized schema (courses, sections and
+meeting_times) keyed by (quarter, year, ...). Writes are buffered and
+applied with executemany inside one transaction per batch. Every write is
+an upsert, so re-parsing a page replaces its rows instead of duplicating
+them.
+"""
+
+import sqlite3
+from pathlib import Path
+from types import TracebackType
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type, Union
+
+from swecc_course_scraper.export.writers import DEFAULT_BATCH_SIZE
+from swecc_course_scraper.models import Course
+
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS courses (
+    quarter TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    course_code TEXT NOT NULL,
+    title TEXT NOT NULL,
+    prerequisites TEXT NOT NULL,
+    credits TEXT NOT NULL,
+    credit_types TEXT NOT NULL,
+    PRIMARY KEY (quarter, year, course_code)
+);
+
+CREATE TABLE IF NOT EXISTS sections (
+    quarter TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    sln TEXT NOT NULL,
+    course_code TEXT NOT NULL,
+    meeting_id TEXT NOT NULL,
+    meeting_type_code TEXT NOT NULL,
+    credits TEXT NOT NULL,
+    instructor TEXT NOT NULL,
+    status TEXT NOT NULL,
+    enrolled INTEGER NOT NULL,
+    capacity INTEGER NOT NULL,
+    estimated_enrollment INTEGER NOT NULL,
+    enrl_restr TEXT NOT NULL,
+    additional_code TEXT NOT NULL,
+    description TEXT NOT NULL,
+    notes TEXT,
+    PRIMARY KEY (quarter, year, sln)
+);
+
+CREATE TABLE IF NOT EXISTS meeting_times (
+    quarter TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    sln TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    meeting_id TEXT NOT NULL,
+    days TEXT NOT NULL,
+    time TEXT NOT NULL,
+    start_minutes INTEGER,
+    end_minutes INTEGER,
+    day_mask INTEGER NOT NULL,
+    building TEXT NOT NULL,
+    room TEXT NOT NULL,
+    instructor TEXT NOT NULL,
+    PRIMARY KEY (quarter, year, sln, seq)
+);
+
+-- (quarter, year) lookups are served by the primary keys, which all start with them
+CREATE INDEX IF NOT EXISTS idx_courses_course_code ON courses (course_code);
+CREATE INDEX IF NOT EXISTS idx_sections_course_code ON sections (course_code, year, quarter);
+CREATE INDEX IF NOT EXISTS idx_sections_instructor ON sections (instructor);
+CREATE INDEX IF NOT EXISTS idx_meeting_times_room ON meeting_times (building, room);
+"""
+
+_UPSERT_COURSE = """
+INSERT INTO courses (quarter, year, course_code, title, prerequisites, credits, credit_types)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (quarter, year, course_code) DO UPDATE SET
+    title = excluded.title,
+    prerequisites = excluded.prerequisites,
+    credits = excluded.credits,
+    credit_types = excluded.credit_types
+"""
+
+_UPSERT_SECTION = """
+INSERT INTO sections (
+    quarter, year, sln, course_code, meeting_id, meeting_type_code, credits, instructor,
+    status, enrolled, capacity, estimated_enrollment, enrl_restr, additional_code,
+    description, notes
+)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (quarter, year, sln) DO UPDATE SET
+    course_code = excluded.course_code,
+    meeting_id = excluded.meeting_id,
+    meeting_type_code = excluded.meeting_type_code,
+    credits = excluded.credits,
+    instructor = excluded.instructor,
+    status = excluded.status,
+    enrolled = excluded.enrolled,
+    capacity = excluded.capacity,
+    estimated_enrollment = excluded.estimated_enrollment,
+    enrl_restr = excluded.enrl_restr,
+    additional_code = excluded.additional_code,
+    description = excluded.description,
+    notes = excluded.notes
+"""
+
+# A section's meeting times are replaced wholesale, since a re-parsed page may list fewer
+_DELETE_MEETING_TIMES = (
+    "DELETE FROM meeting_times WHERE quarter = ? AND year = ? AND sln = ?"
+)
+
+_INSERT_MEETING_TIME = """
+INSERT INTO meeting_times (
+    quarter, year, sln, seq, meeting_id, days, time, start_minutes, end_minutes, day_mask,
+    building, room, instructor
+)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+class SQLiteStore:
+    """
+    Buffered, upserting writer of Course objects into a SQLite database.
+
+    Has the same write_course()/write_courses()/flush()/close() interface as the
+    export writers, so it can be used wherever they are.
+    """
+
+    def __init__(
+        self, path: Union[str, Path] = ":memory:", batch_size: int = DEFAULT_BATCH_SIZE
+    ) -> None:
+        """
+        Args:
+            path: Database file, created (with its schema) if missing.
+            batch_size: Courses buffered per transaction.
+        """
+        self.connection = sqlite3.connect(str(path))
+        self.batch_size = max(1, batch_size)
+        self.courses_written = 0
+        self._courses: List[Tuple[Any, ...]] = []
+        self._sections: Dict[Tuple[str, int, str], Tuple[Any, ...]] = {}
+        self._meeting_times: Dict[Tuple[str, int, str, int], Tuple[Any, ...]] = {}
+
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        with self.connection:
+            self.connection.executescript(SCHEMA)
+            self.connection.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+    def write_course(self, course: Course) -> None:
+        """Buffer one course and its meetings, writing a batch once the buffer is full."""
+        self._courses.append(
+            (
+                course.quarter,
+                course.year,
+                course.course_code,
+                course.title,
+                course.prerequisites,
+                course.credits,
+                course.credit_types,
+            )
+        )
+
+        seq_by_sln: Dict[str, int] = {}
+        for meeting in course.meetings:
+            key = (meeting.quarter, meeting.year, meeting.sln)
+            seq = seq_by_sln.get(meeting.sln, 0)
+            seq_by_sln[meeting.sln] = seq + 1
+            # The first meeting listed for an SLN carries the section's details
+            if seq == 0:
+                # A section written again in the same batch replaces all its rows
+                stale = 1
+                while self._meeting_times.pop((*key, stale), None) is not None:
+                    stale += 1
+                self._sections[key] = (
+                    meeting.quarter,
+                    meeting.year,
+                    meeting.sln,
+                    meeting.course_code,
+                    meeting.meeting_id,
+                    meeting.meeting_type_code,
+                    meeting.credits,
+                    meeting.instructor,
+                    meeting.status,
+                    meeting.enrolled,
+                    meeting.capacity,
+                    int(meeting.estimated_enrollment),
+                    meeting.enrl_restr,
+                    meeting.additional_code,
+                    meeting.description,
+                    meeting.notes,
+                )
+            row_key = (*key, seq)
+            self._meeting_times[row_key] = (
+                meeting.quarter,
+                meeting.year,
+                meeting.sln,
+                seq,
+                meeting.meeting_id,
+                meeting.days,
+                meeting.time,
+                meeting.start_minutes,
+                meeting.end_minutes,
+                meeting.day_mask,
+                meeting.building,
+                meeting.room,
+                meeting.instructor,
+            )
+
+        if len(self._courses) >= self.batch_size:
+            self.flush()
+
+    def write_courses(self, courses: Iterable[Course]) -> int:
+        """
+        Write every course from an iterable, consuming it lazily.
+
+        Returns:
+            int: The number of courses consumed.
+        """
+        count = 0
+        for course in courses:
+            self.write_course(course)
+            count += 1
+        return count
+
+    def flush(self) -> None:
+        """
+        Write buffered rows in a single transaction.
+
+        If the transaction fails, it is rolled back and the rows stay buffered, so
+        flushing again retries them.
+        """
+        if not self._courses:
+            return
+
+        with self.connection:
+            self.connection.executemany(_UPSERT_COURSE, self._courses)
+            self.connection.executemany(_UPSERT_SECTION, self._sections.values())
+            self.connection.executemany(_DELETE_MEETING_TIMES, self._sections.keys())
+            self.connection.executemany(
+                _INSERT_MEETING_TIME, self._meeting_times.values()
+            )
+        self.courses_written += len(self._courses)
+        self._courses.clear()
+        self._sections.clear()
+        self._meeting_times.clear()
+
+    def close(self) -> None:
+        """Flush remaining rows and close the database."""
+        self.flush()
+        self.connection.close()
+
+    def __enter__(self) -> "SQLiteStore":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.close()
+
+    def sections_for_course(
+        self,
+        course_code: str,
+        quarter: Optional[str] = None,
+        year: Optional[int] = None,
+    ) -> List[sqlite3.Row]:
+        """
+        Return the stored sections of a course, newest first.
+
+        Args:
+            course_code: Course code as parsed (e.g., "CSE 122").
+            quarter: Only return sections from this quarter (e.g., "WIN").
+            year: Only return sections from this year.
+
+        Returns:
+            List[sqlite3.Row]: Rows of the sections table.
+        """
+        sql = "SELECT * FROM sections WHERE course_code = ?"
+        params: List[Any] = [course_code]
+        if quarter is not None:
+            sql += " AND quarter = ?"
+            params.append(quarter)
+        if year is not None:
+            sql += " AND year = ?"
+            params.append(year)
+        sql += " ORDER BY year DESC, quarter, sln"
+
+        cursor = self.connection.execute(sql, params)
+        cursor.row_factory = sqlite3.Row
+        return list(cursor)
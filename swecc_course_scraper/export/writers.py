@@ -0,0 +1,282 @@
+"""
+Streaming CSV, JSON, JSON Lines and table writers for parsed schedule data.
+
+Writers accept courses one at a time (typically straight from
+parser.iter_schedule_html), buffer a batch of encoded rows and write each
+batch in one call, so memory use stays flat no matter how many pages are
+exported.
+"""
+
+import csv
+import json
+import sys
+from pathlib import Path
+from types import TracebackType
+from typing import (
+    IO,
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+)
+
+from swecc_course_scraper.models import COURSE_FIELDS, MEETING_FIELDS, Course
+
+# Number of rows buffered before they are written out and flushed
+DEFAULT_BATCH_SIZE = 500
+VALID_KINDS = ["meetings", "courses"]
+
+Destination = Union[str, Path, IO[str]]
+
+
+class CourseWriter:
+    """
+    Base class for streaming writers.
+
+    With kind="meetings" one row is written per CourseMeeting; with kind="courses"
+    one row is written per Course. Use as a context manager, or call close() when
+    done so the last partial batch is written.
+    """
+
+    def __init__(
+        self,
+        destination: Destination = "-",
+        kind: str = "meetings",
+        fields: Optional[Sequence[str]] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ) -> None:
+        """
+        Args:
+            destination: A file path, an open text stream, or "-" for stdout.
+            kind: "meetings" or "courses".
+            fields: Columns to write, in order. Defaults to every column of the kind.
+            batch_size: Rows buffered between writes.
+
+        Raises:
+            ValueError: If kind or any of the fields is unknown.
+        """
+        if kind not in VALID_KINDS:
+            raise ValueError(f"Kind must be one of {', '.join(VALID_KINDS)}")
+
+        all_fields = MEETING_FIELDS if kind == "meetings" else COURSE_FIELDS
+        self.fields: Tuple[str, ...] = tuple(fields) if fields else all_fields
+        unknown = [name for name in self.fields if name not in all_fields]
+        if unknown:
+            raise ValueError(f"Unknown {kind} field(s): {', '.join(unknown)}")
+
+        self.kind = kind
+        self.batch_size = max(1, batch_size)
+        self.rows_written = 0
+        self._buffer: List[Any] = []
+        self._stream, self._owns_stream = _open_destination(destination)
+        self._start()
+
+    def write_course(self, course: Course) -> None:
+        """Buffer the rows for one course, writing a batch once the buffer is full."""
+        if self.kind == "meetings":
+            self._buffer.extend(
+                self._encode_meeting_row(m.to_row(self.fields)) for m in course.meetings
+            )
+        else:
+            self._buffer.append(self._encode_course(course))
+
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def write_courses(self, courses: Iterable[Course]) -> int:
+        """
+        Write every course from an iterable, consuming it lazily.
+
+        Returns:
+            int: The number of courses consumed.
+        """
+        count = 0
+        for course in courses:
+            self.write_course(course)
+            count += 1
+        return count
+
+    def flush(self) -> None:
+        """Write any buffered rows and flush the underlying stream."""
+        if self._buffer:
+            self._write_batch(self._buffer)
+            self.rows_written += len(self._buffer)
+            self._buffer.clear()
+        self._stream.flush()
+
+    def close(self) -> None:
+        """Flush remaining rows and close the destination if this writer opened it."""
+        self.flush()
+        self._finish()
+        self._stream.flush()
+        if self._owns_stream:
+            self._stream.close()
+
+    def __enter__(self) -> "CourseWriter":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.close()
+
+    def _start(self) -> None:
+        """Write anything that precedes the rows (e.g. a header)."""
+
+    def _finish(self) -> None:
+        """Write anything that follows the rows (e.g. a closing bracket)."""
+
+    def _encode_meeting_row(self, row: Tuple[Any, ...]) -> Any:
+        raise NotImplementedError
+
+    def _encode_course(self, course: Course) -> Any:
+        raise NotImplementedError
+
+    def _write_batch(self, batch: List[Any]) -> None:
+        raise NotImplementedError
+
+
+class CsvWriter(CourseWriter):
+    """
+    Writes one CSV row per meeting (or per course, without meetings) under a header row.
+    """
+
+    def _start(self) -> None:
+        self._csv = csv.writer(self._stream)
+        self._csv.writerow(self.fields)
+
+    def _encode_meeting_row(self, row: Tuple[Any, ...]) -> Any:
+        return row
+
+    def _encode_course(self, course: Course) -> Any:
+        return course.to_row(self.fields)
+
+    def _write_batch(self, batch: List[Any]) -> None:
+        self._csv.writerows(batch)
+
+
+class JsonLinesWriter(CourseWriter):
+    """
+    Writes one JSON object per line for each meeting (or each course, with its meetings nested).
+    """
+
+    def _encode_meeting_row(self, row: Tuple[Any, ...]) -> Any:
+        return json.dumps(dict(zip(self.fields, row)), ensure_ascii=False)
+
+    def _encode_course(self, course: Course) -> Any:
+        data: Dict[str, Any] = course.to_dict(self.fields)
+        return json.dumps(data, ensure_ascii=False)
+
+    def _write_batch(self, batch: List[Any]) -> None:
+        self._stream.write("\n".join(batch))
+        self._stream.write("\n")
+
+
+class JsonWriter(JsonLinesWriter):
+    """
+    Writes a single JSON array, streamed one element per line.
+    """
+
+    def _start(self) -> None:
+        self._stream.write("[")
+        self._separator = "\n"
+
+    def _write_batch(self, batch: List[Any]) -> None:
+        self._stream.write(self._separator)
+        self._stream.write(",\n".join(batch))
+        self._separator = ",\n"
+
+    def _finish(self) -> None:
+        self._stream.write("\n]\n")
+
+
+class TableWriter(CourseWriter):
+    """
+    Writes a plain-text table with aligned columns.
+
+    Column widths depend on every row, so all rows are held until close().
+    """
+
+    def _start(self) -> None:
+        self.batch_size = sys.maxsize
+        self._rows: List[Tuple[str, ...]] = []
+
+    def _encode_meeting_row(self, row: Tuple[Any, ...]) -> Any:
+        return tuple("" if value is None else str(value) for value in row)
+
+    def _encode_course(self, course: Course) -> Any:
+        return self._encode_meeting_row(course.to_row(self.fields))
+
+    def _write_batch(self, batch: List[Any]) -> None:
+        self._rows.extend(batch)
+
+    def _finish(self) -> None:
+        widths = [len(name) for name in self.fields]
+        for row in self._rows:
+            widths = [max(width, len(value)) for width, value in zip(widths, row)]
+
+        def render(values: Sequence[str]) -> str:
+            return "  ".join(
+                value.ljust(width) for value, width in zip(values, widths)
+            ).rstrip()
+
+        lines = [render(self.fields), render(["-" * width for width in widths])]
+        lines.extend(render(row) for row in self._rows)
+        self._stream.write("\n".join(lines))
+        self._stream.write("\n")
+        self._rows.clear()
+
+
+WRITERS: Dict[str, Type[CourseWriter]] = {
+    "csv": CsvWriter,
+    "json": JsonWriter,
+    "jsonl": JsonLinesWriter,
+    "table": TableWriter,
+}
+
+
+def open_writer(
+    output_format: str,
+    destination: Destination = "-",
+    kind: str = "meetings",
+    fields: Optional[Sequence[str]] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> CourseWriter:
+    """
+    Create the writer registered for an output format.
+
+    Args:
+        output_format: One of the keys of WRITERS ("csv", "json", "jsonl", "table").
+        destination: A file path, an open text stream, or "-" for stdout.
+        kind: "meetings" or "courses".
+        fields: Columns to write, in order. Defaults to every column of the kind.
+        batch_size: Rows buffered between writes.
+
+    Returns:
+        CourseWriter: The writer, ready for write_course()/write_courses().
+
+    Raises:
+        ValueError: If the format, kind or any field is unknown.
+    """
+    try:
+        writer_class = WRITERS[output_format]
+    except KeyError as err:
+        raise ValueError(f"Format must be one of {', '.join(WRITERS)}") from err
+    return writer_class(destination, kind=kind, fields=fields, batch_size=batch_size)
+
+
+def _open_destination(destination: Destination) -> Tuple[IO[str], bool]:
+    """Return (stream, owned) for a path, an open stream or "-" (stdout)."""
+    if isinstance(destination, (str, Path)):
+        if str(destination) == "-":
+            return sys.stdout, False
+        return open(destination, "w", newline="", encoding="utf-8"), True
+    return destination, False
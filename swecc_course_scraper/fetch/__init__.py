@@ -0,0 +1,42 @@
+"""
+Fetch layer for the SWECC Course Scraper.
+
+Every page request goes through a Fetcher, which applies timeouts, retries
+with jittered backoff, optional hedged requests and per-host circuit
+breakers as configured by a FetchPolicy, and a RateLimiter that can be
+shared between processes. Concurrent fetches of the same page share one
+request through SingleFlight. Fetcher.fetch_if_changed() sends conditional
+requests, so pages that haven't changed since a PageVersion cost a 304. A
+FetchScheduler shares a request budget between HOT refreshes and COLD backfill.
+"""
+
+from .breaker import CircuitBreaker, CircuitOpenError
+from .fetcher import (
+    Fetcher,
+    FetchStats,
+    PageVersion,
+    default_fetcher,
+    set_default_fetcher,
+)
+from .policy import RETRY_STATUS_CODES, FetchPolicy
+from .ratelimit import RateLimiter
+from .scheduler import COLD, HOT, FetchScheduler, SchedulerStats
+from .singleflight import SingleFlight
+
+__all__ = [
+    "COLD",
+    "HOT",
+    "RETRY_STATUS_CODES",
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "FetchPolicy",
+    "FetchScheduler",
+    "FetchStats",
+    "Fetcher",
+    "PageVersion",
+    "RateLimiter",
+    "SchedulerStats",
+    "SingleFlight",
+    "default_fetcher",
+    "set_default_fetcher",
+]
@@ -0,0 +1,94 @@
+"""
+Per-host circuit breaker.
+
+After a run of consecutive failures the breaker opens and requests to the
+host fail immediately instead of waiting on timeouts. Once the cooldown has
+passed a single probe request is let through: success closes the breaker,
+failure opens it for another cooldown.
+"""
+
+import threading
+import time
+from typing import Callable, Optional
+
+
+class CircuitOpenError(ConnectionError):
+    """Raised instead of sending a request while a host's breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Thread-safe closed/open/half-open circuit breaker.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(
+        self,
+        threshold: int = 5,
+        cooldown: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Args:
+            threshold: Consecutive failures that open the breaker.
+            cooldown: Seconds the breaker stays open before allowing a probe.
+            clock: Time source, in seconds.
+        """
+        self.threshold = max(1, threshold)
+        self.cooldown = cooldown
+        self.failures = 0  # Consecutive failures
+        self._clock = clock
+        self._opened_at: Optional[float] = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def allow(self) -> bool:
+        """
+        Returns whether a request may be sent now.
+
+        In the half-open state only one caller at a time is allowed through.
+        """
+        with self._lock:
+            state = self._state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self._probing or self.failures >= self.threshold:
+                self._opened_at = self._clock()
+            self._probing = False
+
+    def release_probe(self) -> None:
+        """
+        Let another caller probe, after a probe that ended with neither a success nor a
+        failure of the host (e.g., it was interrupted).
+        """
+        with self._lock:
+            self._probing = False
+
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return self.CLOSED
+        if self._clock() - self._opened_at >= self.cooldown:
+            return self.HALF_OPEN
+        return self.OPEN
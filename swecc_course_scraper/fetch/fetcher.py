@@ -0,0 +1,410 @@
+"""
+HTTP fetching with timeouts, jittered retries, hedged requests,
+per-host circuit breakers and conditional requests.
+"""
+
+import hashlib
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from http import HTTPStatus
+from typing import Any, Callable, Deque, Dict, Hashable, NamedTuple, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from swecc_course_scraper.fetch.breaker import CircuitBreaker, CircuitOpenError
+from swecc_course_scraper.fetch.policy import (
+    RETRY_STATUS_CODES,
+    FetchPolicy,
+    parse_retry_after,
+)
+from swecc_course_scraper.fetch.ratelimit import RateLimiter
+from swecc_course_scraper.fetch.singleflight import SingleFlight
+from swecc_course_scraper.paths import data_dir
+
+# Connections kept open per host, and threads available for hedged requests
+POOL_SIZE = 16
+LATENCY_WINDOW = 200  # Recent latencies the hedging delay is computed from
+
+# Budget per host shared by every process using the default fetcher, to stay polite
+# to washington.edu when several crawls run at once
+DEFAULT_RATE_LIMIT = 5.0  # Requests per second
+DEFAULT_MAX_IN_FLIGHT = 4
+RATE_LIMIT_FILE = "ratelimit.sqlite3"
+
+
+@dataclass
+class FetchStats:
+    """
+    Counters describing how a fetcher has been used.
+    """
+
+    requests: int = 0  # HTTP requests sent, including retries and hedges
+    retries: int = 0  # Attempts repeated after a transient failure
+    hedges: int = 0  # Second requests sent because the first was slow
+    hedge_wins: int = 0  # Hedges that answered before the request they duplicated
+    rejected: int = 0  # Fetches refused because a circuit breaker was open
+    coalesced: int = 0  # Fetches answered by an identical fetch already in flight
+    not_modified: int = 0  # Conditional fetches answered 304 Not Modified
+
+
+class PageVersion(NamedTuple):
+    """
+    What identifies the version of a page last fetched, for conditional requests.
+    """
+
+    etag: Optional[str] = None  # The ETag response header
+    last_modified: Optional[str] = None  # The Last-Modified response header
+    content_hash: Optional[str] = None  # SHA-256 of the body
+
+    def headers(self) -> Dict[str, str]:
+        """Returns the headers asking the server for the page only if it changed."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class _LatencyWindow:
+    """Thread-safe sliding window of recent request latencies."""
+
+    def __init__(self, size: int = LATENCY_WINDOW) -> None:
+        self._samples: Deque[float] = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def quantile(self, q: float) -> float:
+        with self._lock:
+            samples = sorted(self._samples)
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+class Fetcher:
+    """
+    Fetches pages over a pooled session according to a FetchPolicy.
+
+    Transient failures (connection errors, timeouts, resets, 429 and 5xx) are
+    retried with jittered exponential backoff. Hosts that keep failing trip a
+    circuit breaker so later fetches fail fast instead of waiting on timeouts.
+    """
+
+    def __init__(
+        self,
+        policy: Optional[FetchPolicy] = None,
+        session: Optional[requests.Session] = None,
+        *,
+        limiter: Optional[RateLimiter] = None,
+        sleep: Callable[[float], None] = time.sleep,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Args:
+            policy: Timeouts, retries, hedging and breaker settings. Defaults to
+                FetchPolicy().
+            session: Session to send requests with; a new pooled one by default.
+            limiter: Limits requests per host, including retries and hedges. None
+                sends them as fast as they come.
+            sleep: Waits between retries, in seconds.
+            clock: Time source for latencies and breakers, in seconds.
+        """
+        self.policy = policy or FetchPolicy()
+        self.stats = FetchStats()
+        self.limiter = limiter
+        self._session = session or requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_SIZE)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+        self._sleep = sleep
+        self._clock = clock
+        self._random = random.Random()
+        self._latencies = _LatencyWindow()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # Keyed by URL for fetch_text() and by (URL, version) for fetch_if_changed()
+        self._in_flight: SingleFlight[Hashable, Any] = SingleFlight()
+
+    def get(
+        self, url: str, headers: Optional[Dict[str, str]] = None
+    ) -> requests.Response:
+        """
+        GET a URL, retrying transient failures.
+
+        Args:
+            url: The URL to fetch.
+            headers: Extra request headers.
+
+        Returns:
+            requests.Response: The first response that isn't a transient failure,
+                with its body read. Its status may still be an error (e.g., 404).
+
+        Raises:
+            CircuitOpenError: If the host's circuit breaker is open.
+            ConnectionError: If every attempt failed.
+        """
+        breaker = self.breaker(url)
+        attempt = 0
+        while True:
+            attempt += 1
+            if not breaker.allow():
+                self._count("rejected")
+                raise CircuitOpenError(
+                    f"Too many recent failures from {urlsplit(url).netloc}; "
+                    f"not fetching {url} for up to {breaker.cooldown:g}s"
+                )
+
+            retry_after: Optional[float] = None
+            try:
+                res = self._send(url, headers)
+            except requests.exceptions.RequestException as e:
+                error: Exception = e
+            except BaseException:
+                breaker.release_probe()
+                raise
+            else:
+                if res.status_code not in RETRY_STATUS_CODES:
+                    breaker.record_success()
+                    return res
+                try:
+                    res.raise_for_status()
+                except requests.exceptions.HTTPError as e:
+                    error = e
+                retry_after = parse_retry_after(
+                    res.status_code, res.headers.get("Retry-After")
+                )
+                res.close()
+            breaker.record_failure()
+
+            if attempt >= self.policy.max_attempts:
+                raise ConnectionError(
+                    f"Unable to fetch {url} after {attempt} attempts: \n{error}"
+                ) from error
+            self._count("retries")
+            self._sleep(self.policy.backoff(attempt, retry_after, self._random))
+
+    def fetch_text(self, url: str) -> str:
+        """
+        Fetch the text of a page.
+
+        Concurrent calls for the same URL share one request.
+
+        Args:
+            url: The URL of the page.
+
+        Returns:
+            str: The decoded body.
+
+        Raises:
+            FileNotFoundError: If the page does not exist (404 or another client error).
+            ConnectionError: If there is a network issue or the server keeps failing.
+        """
+        text: str
+        text, shared = self._in_flight.do(url, lambda: self._fetch_text(url))
+        if shared:
+            self._count("coalesced")
+        return text
+
+    def _fetch_text(self, url: str) -> str:
+        res = self.get(url)
+        try:
+            res.raise_for_status()
+        except requests.exceptions.HTTPError as e:
+            raise FileNotFoundError(
+                f"Page not found or no courses available: \n{e}"
+            ) from e
+        return res.text
+
+    def fetch_if_changed(
+        self, url: str, version: Optional[PageVersion] = None
+    ) -> Tuple[Optional[str], PageVersion]:
+        """
+        Fetch the text of a page unless it is the same as the version given.
+
+        Sends If-None-Match/If-Modified-Since from the version's validators, so a
+        server supporting them answers an unchanged page with an empty 304. Servers
+        that don't send the whole page, which counts as unchanged when its hash
+        matches the version's.
+
+        Concurrent calls for the same URL and version share one request.
+
+        Args:
+            url: The URL of the page.
+            version: The version last fetched, or None to fetch the page outright.
+
+        Returns:
+            Tuple[Optional[str], PageVersion]: The decoded body, or None if the page
+                hasn't changed, and the version to pass next time.
+
+        Raises:
+            FileNotFoundError: If the page does not exist (404 or another client error).
+            ConnectionError: If there is a network issue or the server keeps failing.
+        """
+        result: Tuple[Optional[str], PageVersion]
+        result, shared = self._in_flight.do(
+            (url, version), lambda: self._fetch_if_changed(url, version)
+        )
+        if shared:
+            self._count("coalesced")
+        return result
+
+    def _fetch_if_changed(
+        self, url: str, version: Optional[PageVersion]
+    ) -> Tuple[Optional[str], PageVersion]:
+        res = self.get(url, headers=version.headers() if version else None)
+        if version is not None and res.status_code == HTTPStatus.NOT_MODIFIED:
+            self._count("not_modified")
+            return None, version
+        try:
+            res.raise_for_status()
+        except requests.exceptions.HTTPError as e:
+            raise FileNotFoundError(
+                f"Page not found or no courses available: \n{e}"
+            ) from e
+
+        current = PageVersion(
+            res.headers.get("ETag"),
+            res.headers.get("Last-Modified"),
+            hashlib.sha256(res.content).hexdigest(),
+        )
+        if version is not None and version.content_hash == current.content_hash:
+            return None, current
+        return res.text, current
+
+    def breaker(self, url: str) -> CircuitBreaker:
+        """Return the circuit breaker of a URL's host."""
+        host = urlsplit(url).netloc
+        with self._lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                breaker = CircuitBreaker(
+                    self.policy.breaker_threshold,
+                    self.policy.breaker_cooldown,
+                    self._clock,
+                )
+                self._breakers[host] = breaker
+            return breaker
+
+    def close(self) -> None:
+        """Release the pooled connections and hedging threads."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+        self._session.close()
+
+    def _send(
+        self, url: str, headers: Optional[Dict[str, str]] = None
+    ) -> requests.Response:
+        """Send one request, hedging it with a second if it is unusually slow."""
+        delay = self._hedge_delay()
+        if delay is None:
+            return self._timed_get(url, headers)
+
+        executor = self._hedge_executor()
+        primary = executor.submit(self._timed_get, url, headers)
+        if wait([primary], timeout=delay).done:
+            return primary.result()
+
+        self._count("hedges")
+        hedge = executor.submit(self._timed_get, url, headers)
+        pending = {primary, hedge}
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                error = future.exception()
+                if error is None:
+                    if future is hedge:
+                        self._count("hedge_wins")
+                    for loser in pending:
+                        loser.add_done_callback(_close_response)
+                    return future.result()
+        assert error is not None
+        raise error
+
+    def _timed_get(
+        self, url: str, headers: Optional[Dict[str, str]] = None
+    ) -> requests.Response:
+        if self.limiter is None:
+            return self._timed_get_now(url, headers)
+        with self.limiter.limit(urlsplit(url).netloc):
+            return self._timed_get_now(url, headers)
+
+    def _timed_get_now(
+        self, url: str, headers: Optional[Dict[str, str]] = None
+    ) -> requests.Response:
+        self._count("requests")
+        start = self._clock()
+        res = self._session.get(url, headers=headers, timeout=self.policy.timeout)
+        # Only full downloads are comparable latencies for hedging
+        if (
+            res.status_code not in RETRY_STATUS_CODES
+            and res.status_code != HTTPStatus.NOT_MODIFIED
+        ):
+            self._latencies.add(self._clock() - start)
+        return res
+
+    def _hedge_delay(self) -> Optional[float]:
+        policy = self.policy
+        if not policy.hedge or len(self._latencies) < policy.hedge_min_samples:
+            return None
+        return self._latencies.quantile(policy.hedge_quantile)
+
+    def _hedge_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=POOL_SIZE, thread_name_prefix="fetch-hedge"
+                )
+            return self._executor
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            setattr(self.stats, name, getattr(self.stats, name) + 1)
+
+
+def _close_response(future: "Future[requests.Response]") -> None:
+    if future.exception() is None:
+        future.result().close()
+
+
+_default: Optional[Fetcher] = None
+_default_lock = threading.Lock()
+
+
+def default_fetcher() -> Fetcher:
+    """
+    Returns the fetcher shared by the commands, creating it on first use.
+
+    Its rate limit is shared with other processes through the data directory.
+    """
+    global _default  # noqa: PLW0603
+    with _default_lock:
+        if _default is None:
+            limiter = RateLimiter(
+                DEFAULT_RATE_LIMIT,
+                max_in_flight=DEFAULT_MAX_IN_FLIGHT,
+                path=data_dir() / RATE_LIMIT_FILE,
+            )
+            _default = Fetcher(limiter=limiter)
+        return _default
+
+
+def set_default_fetcher(fetcher: Optional[Fetcher]) -> None:
+    """
+    Replace the shared fetcher, e.g. to use another policy. None resets it.
+    """
+    global _default  # noqa: PLW0603
+    with _default_lock:
+        _default = fetcher
@@ -0,0 +1,79 @@
+"""
+Retry, backoff and hedging settings for page fetches.
+"""
+
+import random
+from dataclasses import dataclass
+from http import HTTPStatus
+from typing import Optional, Tuple
+
+# Responses worth retrying: throttling and transient server errors
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+def parse_retry_after(status_code: int, header: Optional[str]) -> Optional[float]:
+    """
+    The delay asked for by a 429/503 response's Retry-After header, in seconds.
+
+    Returns:
+        Optional[float]: The delay, or None for other responses and for headers that
+            aren't a number of seconds.
+    """
+    if status_code not in (
+        HTTPStatus.TOO_MANY_REQUESTS,
+        HTTPStatus.SERVICE_UNAVAILABLE,
+    ):
+        return None
+    try:
+        return float(header or "")
+    except ValueError:
+        return None
+
+
+@dataclass(frozen=True)
+class FetchPolicy:
+    """
+    How a Fetcher times out, retries, hedges and trips its circuit breakers.
+    """
+
+    connect_timeout: float = 5.0  # Seconds to establish a connection
+    read_timeout: float = 30.0  # Seconds to wait between bytes of the response
+    max_attempts: int = 4  # Attempts per fetch, including the first
+    backoff_base: float = 0.5  # Backoff ceiling for the first retry, in seconds
+    backoff_max: float = 10.0  # Largest backoff ceiling, in seconds
+    max_retry_after: float = 60.0  # Longest Retry-After the server may ask for
+    # Send a second request when one takes longer than this quantile of recent latencies
+    hedge: bool = False
+    hedge_quantile: float = 0.95
+    hedge_min_samples: int = 20  # Latencies needed before hedging starts
+    breaker_threshold: int = 5  # Consecutive failures that open a host's breaker
+    breaker_cooldown: float = 30.0  # Seconds an open breaker waits before a probe
+
+    @property
+    def timeout(self) -> Tuple[float, float]:
+        """(connect, read) timeouts in the form requests takes."""
+        return (self.connect_timeout, self.read_timeout)
+
+    def backoff(
+        self,
+        attempt: int,
+        retry_after: Optional[float] = None,
+        rng: Optional[random.Random] = None,
+    ) -> float:
+        """
+        Seconds to wait before retrying, using exponential backoff with full jitter.
+
+        Args:
+            attempt: The number of attempts made so far (1 after the first failure).
+            retry_after: Delay the server asked for, which is honoured up to
+                max_retry_after.
+            rng: Source of jitter.
+
+        Returns:
+            float: The delay in seconds.
+        """
+        ceiling = min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1))
+        delay = (rng or random).uniform(0, ceiling)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_retry_after))
+        return delay
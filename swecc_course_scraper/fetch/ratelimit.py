@@ -0,0 +1,171 @@
+"""
+Token-bucket rate limiter shared between threads and processes.
+
+The bucket state and the in-flight request slots live in a small SQLite
+database, so every process pointing at the same file (e.g. cron jobs
+crawling at the same time) draws from one budget. Each acquisition is a
+short BEGIN IMMEDIATE transaction; callers that have to wait sleep for
+exactly the time until the next token instead of polling.
+
+Slots are leased rather than counted, so a process that dies mid-request
+only holds its slot until the lease expires.
+"""
+
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator, Optional, Tuple, Union
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS buckets (
+    key TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS slots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    key TEXT NOT NULL,
+    expires REAL NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_slots_key ON slots (key, expires);
+"""
+
+DEFAULT_LEASE = 120.0  # Seconds before a slot held by a crashed process is reclaimed
+SLOT_POLL_INTERVAL = 0.05  # Seconds between checks while every slot is taken
+# Tolerance for refill rounding, so a caller that slept exactly long enough gets its token
+_EPSILON = 1e-9
+
+
+class RateLimiter:
+    """
+    Limits requests per second and requests in flight, per key (e.g., per host).
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        rate: float,
+        burst: int = 1,
+        max_in_flight: Optional[int] = None,
+        path: Union[str, Path] = ":memory:",
+        *,
+        lease: float = DEFAULT_LEASE,
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        """
+        Args:
+            rate: Requests per second allowed across everything sharing path.
+            burst: Requests that may be sent back to back after an idle period.
+            max_in_flight: Requests allowed in progress at once (None for no limit).
+            path: SQLite file holding the shared state; ":memory:" limits only this
+                process.
+            lease: Seconds a slot is held before it is presumed abandoned.
+            clock: Wall-clock time source, in seconds; shared between processes.
+            sleep: Waits for a token or slot, in seconds.
+        """
+        if rate <= 0:
+            raise ValueError("Rate must be positive.")
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.max_in_flight = max_in_flight
+        self.lease = lease
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            str(path), timeout=30.0, isolation_level=None, check_same_thread=False
+        )
+        with self._lock:
+            if str(path) != ":memory:":
+                self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.executescript(SCHEMA)
+
+    def acquire(self, key: str = "") -> Optional[int]:
+        """
+        Block until a token (and a slot, if limited) is available, then take it.
+
+        Args:
+            key: The budget to draw from (e.g., a host name).
+
+        Returns:
+            Optional[int]: The slot to pass to release(), or None if in-flight
+                requests aren't limited.
+        """
+        while True:
+            acquired, slot, wait = self._try_acquire(key)
+            if acquired:
+                return slot
+            self._sleep(wait)
+
+    def release(self, slot: Optional[int]) -> None:
+        """Give back a slot returned by acquire()."""
+        if slot is None:
+            return
+        with self._lock:
+            self._connection.execute("DELETE FROM slots WHERE id = ?", (slot,))
+
+    @contextmanager
+    def limit(self, key: str = "") -> Iterator[None]:
+        """Hold a token and slot for the duration of a with block."""
+        slot = self.acquire(key)
+        try:
+            yield
+        finally:
+            self.release(slot)
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def _try_acquire(self, key: str) -> Tuple[bool, Optional[int], float]:
+        """Returns (acquired, slot, seconds to wait before trying again)."""
+        with self._lock:
+            db = self._connection
+            now = self._clock()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                row = db.execute(
+                    "SELECT tokens, updated FROM buckets WHERE key = ?", (key,)
+                ).fetchone()
+                tokens = float(self.burst)
+                if row is not None:
+                    elapsed = max(0.0, now - row[1])
+                    tokens = min(tokens, row[0] + elapsed * self.rate)
+
+                acquired, slot, wait = False, None, 0.0
+                if tokens < 1 - _EPSILON:
+                    wait = (1 - tokens) / self.rate
+                elif self.max_in_flight is not None and not self._slot_free(key, now):
+                    wait = SLOT_POLL_INTERVAL
+                else:
+                    tokens = max(0.0, tokens - 1)
+                    acquired = True
+                    if self.max_in_flight is not None:
+                        slot = db.execute(
+                            "INSERT INTO slots (key, expires) VALUES (?, ?)",
+                            (key, now + self.lease),
+                        ).lastrowid
+
+                db.execute(
+                    "INSERT INTO buckets (key, tokens, updated) VALUES (?, ?, ?) "
+                    "ON CONFLICT (key) DO UPDATE SET "
+                    "tokens = excluded.tokens, updated = excluded.updated",
+                    (key, tokens, now),
+                )
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+            return acquired, slot, wait
+
+    def _slot_free(self, key: str, now: float) -> bool:
+        db = self._connection
+        db.execute("DELETE FROM slots WHERE expires <= ?", (now,))
+        (in_flight,) = db.execute(
+            "SELECT COUNT(*) FROM slots WHERE key = ?", (key,)
+        ).fetchone()
+        return bool(in_flight < (self.max_in_flight or 0))
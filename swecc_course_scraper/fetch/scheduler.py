@@ -0,0 +1,228 @@
+"""
+Priority scheduler sharing a fixed request budget between hot and cold work.
+
+Live monitoring refreshes current-quarter pages every few minutes, while a
+backfill fetches historical pages once each. Both spend the same budget of
+requests per second, handed out one slot at a time:
+
+- Every slot goes to the most urgent waiter: a HOT request always goes ahead
+  of any COLD one waiting, so backfill only ever uses slots refreshes don't
+  need and can't delay them by more than one slot.
+- Slots are spaced by the budget with jitter, so requests don't go out in
+  bursts at fixed instants.
+- Recurring jobs are refreshed every interval (jittered too, and staggered
+  when added) and dispatched through the same slots by run().
+"""
+
+import heapq
+import itertools
+import random
+import threading
+import time
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from swecc_course_scraper.constants import DEFAULT_BUDGET
+
+# Priorities; lower is served first
+HOT = 0  # Live refreshes of current-quarter pages
+COLD = 1  # Historical backfill
+
+DEFAULT_JITTER = 0.2  # Fraction by which slot spacing and refresh intervals vary
+
+
+@dataclass
+class SchedulerStats:
+    """
+    Counters describing how a scheduler has handed out its budget.
+    """
+
+    granted: Dict[int, int] = field(default_factory=dict)  # Slots per priority
+    waited: Dict[int, float] = field(default_factory=dict)  # Seconds spent waiting
+    max_wait: Dict[int, float] = field(default_factory=dict)  # Longest single wait
+    late: float = 0.0  # Longest a recurring job ran after it was due, in seconds
+
+
+@dataclass(order=True)
+class ScheduledJob:
+    """A recurring (or one-off) job, ordered by when it is due and its priority."""
+
+    due: float
+    priority: int
+    key: Hashable = field(compare=False)
+    interval: Optional[float] = field(default=None, compare=False)  # None runs once
+
+
+class FetchScheduler:
+    """
+    Hands out a fixed budget of request slots, most urgent priority first.
+    """
+
+    def __init__(
+        self,
+        budget: float = DEFAULT_BUDGET,
+        *,
+        jitter: float = DEFAULT_JITTER,
+        clock: Callable[[], float] = time.monotonic,
+        rng: Optional[random.Random] = None,
+    ) -> None:
+        """
+        Args:
+            budget: Requests per second shared by every priority.
+            jitter: Fraction by which slot spacing and refresh intervals vary
+                randomly, both ways.
+            clock: Time source, in seconds. Waits are timed by it, so it must follow
+                real time.
+            rng: Source of the jitter.
+        """
+        if budget <= 0:
+            raise ValueError("The request budget must be positive")
+        self.budget = budget
+        self.jitter = jitter
+        self.stats = SchedulerStats()
+        self._clock = clock
+        self._random = rng or random.Random()
+        self._condition = threading.Condition()
+        self._next_slot = clock()
+        self._waiters: List[Tuple[int, int]] = []  # Heap of (priority, ticket)
+        self._tickets = itertools.count()
+        self._jobs: List[ScheduledJob] = []  # Heap by due time
+
+    def acquire(
+        self, priority: int = COLD, stop: Optional[threading.Event] = None
+    ) -> bool:
+        """
+        Wait for a request slot.
+
+        Args:
+            priority: HOT or COLD. Waiters of a lower priority value always go first.
+            stop: Give up waiting once set.
+
+        Returns:
+            bool: True once a slot is granted, or False if stop was set first.
+        """
+        start = self._clock()
+        with self._condition:
+            ticket = (priority, next(self._tickets))
+            heapq.heappush(self._waiters, ticket)
+            try:
+                while True:
+                    if stop is not None and stop.is_set():
+                        return False
+                    now = self._clock()
+                    if self._waiters[0] == ticket and now >= self._next_slot:
+                        break
+                    timeout = (
+                        self._next_slot - now if self._waiters[0] == ticket else None
+                    )
+                    # Woken early by a new waiter, a grant or notify(); stop is
+                    # checked at least every second
+                    self._condition.wait(min(timeout, 1.0) if timeout else 1.0)
+            finally:
+                self._waiters.remove(ticket)
+                heapq.heapify(self._waiters)
+                self._condition.notify_all()
+
+            spacing = self._jittered(1 / self.budget)
+            self._next_slot = max(self._next_slot, now) + spacing
+            waited = self._clock() - start
+            stats = self.stats
+            stats.granted[priority] = stats.granted.get(priority, 0) + 1
+            stats.waited[priority] = stats.waited.get(priority, 0.0) + waited
+            stats.max_wait[priority] = max(stats.max_wait.get(priority, 0.0), waited)
+        return True
+
+    def gate(
+        self,
+        fetch: Callable[..., str],
+        priority: int = COLD,
+        stop: Optional[threading.Event] = None,
+    ) -> Callable[..., str]:
+        """
+        Wrap a fetch function so every call first waits for a slot of a priority.
+
+        The wrapper raises ConnectionError if stop is set while it waits, so callers
+        treat the page as one to retry.
+        """
+
+        def gated(*args: Any, **kwargs: Any) -> str:
+            if not self.acquire(priority, stop):
+                raise ConnectionError("Stopped waiting for a request slot")
+            return fetch(*args, **kwargs)
+
+        return gated
+
+    def add(
+        self,
+        key: Hashable,
+        priority: int = HOT,
+        interval: Optional[float] = None,
+    ) -> None:
+        """
+        Add a job for run() to dispatch.
+
+        Recurring jobs start at a random point of their first interval, so jobs added
+        together are spread out instead of falling due at once.
+
+        Args:
+            key: Passed to run()'s handler (e.g., a department code).
+            priority: HOT or COLD.
+            interval: Seconds between runs, jittered. None runs the job once, now.
+        """
+        now = self._clock()
+        due = now + self._random.uniform(0, interval) if interval is not None else now
+        with self._condition:
+            heapq.heappush(self._jobs, ScheduledJob(due, priority, key, interval))
+            self._condition.notify_all()
+
+    def __len__(self) -> int:
+        with self._condition:
+            return len(self._jobs)
+
+    def run(
+        self,
+        handler: Callable[[Hashable], None],
+        stop: Optional[threading.Event] = None,
+    ) -> None:
+        """
+        Dispatch added jobs as they fall due, one slot each, until none are left or
+        stop is set.
+
+        Each job waits for a slot of its priority, so hot jobs overtake cold requests
+        waiting through acquire() or gate(). Recurring jobs are added back one
+        jittered interval after they were due (or after they ran, if that was
+        later). The handler runs on the calling thread; exceptions it raises stop
+        the scheduler.
+
+        Args:
+            handler: Called with each job's key.
+            stop: Returns once set.
+        """
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            job = self._next_job(stop)
+            if job is None or not self.acquire(job.priority, stop):
+                return
+            now = self._clock()
+            with self._condition:
+                self.stats.late = max(self.stats.late, now - job.due)
+            handler(job.key)
+            if job.interval is not None:
+                due = max(job.due + self._jittered(job.interval), self._clock())
+                with self._condition:
+                    heapq.heappush(self._jobs, replace(job, due=due))
+
+    def _next_job(self, stop: threading.Event) -> Optional[ScheduledJob]:
+        """Wait for the next job to fall due and take it off the heap."""
+        with self._condition:
+            while not stop.is_set():
+                if not self._jobs:
+                    return None
+                wait = self._jobs[0].due - self._clock()
+                if wait <= 0:
+                    return heapq.heappop(self._jobs)
+                self._condition.wait(min(wait, 1.0))
+        return None
+
+    def _jittered(self, seconds: float) -> float:
+        return seconds * self._random.uniform(1 - self.jitter, 1 + self.jitter)
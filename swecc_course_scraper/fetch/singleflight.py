@@ -0,0 +1,64 @@
+"""
+Single-flight coalescing of identical concurrent calls.
+
+The first caller for a key runs the call; callers arriving while it is in
+progress wait for and share its result (or exception) instead of repeating
+it. Nothing is kept once the call finishes, so later callers run it again.
+"""
+
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict, Generic, Hashable, Tuple, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class SingleFlight(Generic[K, V]):
+    """
+    Thread-safe group of in-flight calls keyed by K.
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[K, Future[V]] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: K, call: Callable[[], V]) -> Tuple[V, bool]:
+        """
+        Run call, or wait for the identical call already in flight.
+
+        Args:
+            key: Identifies calls that may share a result (e.g., a URL).
+            call: Produces the result.
+
+        Returns:
+            Tuple[V, bool]: The result, and whether it came from another caller's call.
+
+        Raises:
+            Exception: Whatever the call raised, in every caller that shared it.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if future is None:
+                future = Future()
+                self._calls[key] = future
+
+        if not leader:
+            return future.result(), True
+
+        try:
+            value = call()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(value)
+            return value, False
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    def __len__(self) -> int:
+        """The number of calls in flight."""
+        return len(self._calls)
@@ -5,6 +5,6 @@ This package contains dataclasses for representing course and meeting data
 extracted from UW's time schedule pages.
 """
 
-from .course import Course, CourseMeeting
+from .course import COURSE_FIELDS, MEETING_FIELDS, Course, CourseMeeting
 
-__all__ = ['Course', 'CourseMeeting']
+__all__ = ["COURSE_FIELDS", "MEETING_FIELDS", "Course", "CourseMeeting"]
@@ -5,15 +5,57 @@ This module defines the core data structures for representing course information
 extracted from UW's time schedule pages.
 """
 
-from dataclasses import dataclass, field
-from typing import Optional, List
+from dataclasses import dataclass, field, fields
+from functools import lru_cache
+from operator import attrgetter
+from typing import Any, Callable, ClassVar, Dict, List, Optional, Sequence, Tuple
+
+# attrgetter returns a tuple only when given at least this many names.
+_ATTRGETTER_TUPLE_MIN = 2
+
+
+@lru_cache(maxsize=None)
+def _row_getter(field_names: Tuple[str, ...]) -> Callable[[Any], Tuple[Any, ...]]:
+    """
+    Build (once per field order) a function that reads the given attributes into a tuple.
+
+    attrgetter does the attribute lookups in C, so rows are produced without the
+    recursive copying done by dataclasses.asdict/astuple. It only returns a tuple
+    for two or more names, so shorter rows are built one attribute at a time.
+    """
+    if len(field_names) >= _ATTRGETTER_TUPLE_MIN:
+        return attrgetter(*field_names)
+    getters = tuple(attrgetter(name) for name in field_names)
+    return lambda obj: tuple(getter(obj) for getter in getters)
+
+
+class _RowSerializable:
+    """
+    Fast, flat serialization shared by the models.
+
+    Subclasses set FIELDS to their column order; see MEETING_FIELDS and COURSE_FIELDS.
+    """
+    FIELDS: ClassVar[Tuple[str, ...]] = ()
+
+    def to_tuple(self) -> Tuple[Any, ...]:
+        """Return every column as a tuple in FIELDS order."""
+        return _row_getter(self.FIELDS)(self)
+
+    def to_row(self, field_names: Optional[Sequence[str]] = None) -> Tuple[Any, ...]:
+        """Return the given columns (default: all of FIELDS) as a tuple, e.g. for csv.writer."""
+        return _row_getter(self.FIELDS if field_names is None else tuple(field_names))(self)
+
+    def to_dict(self, field_names: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """Return the given columns (default: all of FIELDS) as a flat dict, e.g. for JSON."""
+        names = self.FIELDS if field_names is None else tuple(field_names)
+        return dict(zip(names, _row_getter(names)(self)))
 
 
 @dataclass
-class CourseMeeting:
+class CourseMeeting(_RowSerializable):
     """
     Represents a single scheduled meeting of a course (lecture, quiz, lab, seminar, etc.).
-    
+
     This is the most granular unit of course data, containing all the
     information needed for enrollment and scheduling.
     """
@@ -31,6 +73,12 @@ class CourseMeeting:
     building: str = ""              # Building code (e.g., "MGH", "KNE") - where the meeting occurs
     room: str = ""                  # Room number (e.g., "130", "288") - specific room location
     meeting_date: str = ""          # Meeting date information - handles days correctly
+    start_minutes: Optional[int] = None  # Start in minutes since midnight (e.g., 690 for "1130-1220")
+                                         # - None if to be arranged
+    end_minutes: Optional[int] = None    # End in minutes since midnight (e.g., 740 for "1130-1220")
+                                         # - None if to be arranged
+    day_mask: int = 0               # Meeting days as bits M=1, T=2, W=4, Th=8, F=16, Sa=32, Su=64
+                                    # - 0 if to be arranged
     
     # Personnel
     instructor: str = ""            # Instructor name (e.g., "Natsuhara,Miya Kaye") - who teaches
@@ -60,7 +108,7 @@ class CourseMeeting:
 
 
 @dataclass
-class Course:
+class Course(_RowSerializable):
     """
     Represents a complete course with all its scheduled meetings.
     
@@ -82,3 +130,28 @@ class Course:
     # Temporal information
     quarter: str               # Quarter (e.g., "WIN") - when this course is offered
     year: int                  # Year (e.g., 2023) - when this course is offered
+
+    def to_dict(
+        self, field_names: Optional[Sequence[str]] = None, include_meetings: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Return the course columns as a dict, with meetings nested as a list of meeting dicts.
+
+        Args:
+            field_names: Course columns to include (default: all of COURSE_FIELDS)
+            include_meetings: Whether to add a "meetings" key with every meeting's to_dict()
+        """
+        data = super().to_dict(field_names)
+        if include_meetings:
+            data["meetings"] = [meeting.to_dict() for meeting in self.meetings]
+        return data
+
+
+# Column order used by to_tuple()/to_row()/to_dict() and by every writer built on them.
+# CourseMeeting columns follow the dataclass field order; Course columns leave out the
+# nested meetings list.
+MEETING_FIELDS: Tuple[str, ...] = tuple(f.name for f in fields(CourseMeeting))
+COURSE_FIELDS: Tuple[str, ...] = tuple(f.name for f in fields(Course) if f.name != "meetings")
+
+CourseMeeting.FIELDS = MEETING_FIELDS
+Course.FIELDS = COURSE_FIELDS
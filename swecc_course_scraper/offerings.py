@@ -0,0 +1,301 @@
+"""
+Persisted index of which quarters each course was offered in.
+
+Every quarter since EARLIEST_RECORDED_YEAR has an ordinal
+((year - 2003) * 4 + quarter position), and each course maps to an integer
+bitset over those ordinals, built from the <A NAME=math124> anchors of the
+department pages. A second bitset per department records which quarters'
+pages have been indexed, so unindexed quarters can be told apart from
+quarters a course wasn't offered in. Frequency questions for any window are
+then a mask and a popcount.
+
+The index also remembers when each page was fetched, so pages that may still
+change (this year's) can be refreshed, and which quarters could not be fetched,
+so they are retried on the next run instead of being taken as not offered.
+"""
+
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from swecc_course_scraper.commands.schedule import VALID_QUARTERS
+from swecc_course_scraper.constants import EARLIEST_RECORDED_YEAR
+from swecc_course_scraper.paths import data_dir
+
+INDEX_FILE = "offerings.json"
+INDEX_VERSION = 1
+
+# Course anchors in schedule pages, e.g. <A NAME=math124> or <A NAME=cse599h>
+COURSE_ANCHOR_PATTERN = re.compile(
+    r"<a\s+name\s*=\s*[\"']?([a-z]+\d+[a-z]*)\b", re.IGNORECASE
+)
+
+_QUARTERS_PER_YEAR = len(VALID_QUARTERS)
+
+
+def index_path() -> Path:
+    """
+    Returns:
+        Path: The file the offering index is saved to.
+    """
+    return data_dir() / INDEX_FILE
+
+
+def quarter_ordinal(quarter: str, year: int) -> int:
+    """
+    Returns the position of a quarter counting from WIN EARLIEST_RECORDED_YEAR (0).
+
+    Args:
+        str: The quarter code (e.g., "WIN").
+        int: The year (e.g., 2023).
+    """
+    position = VALID_QUARTERS.index(quarter)
+    return (year - EARLIEST_RECORDED_YEAR) * _QUARTERS_PER_YEAR + position
+
+
+def ordinal_quarter(ordinal: int) -> Tuple[str, int]:
+    """Returns the (quarter, year) at an ordinal; the inverse of quarter_ordinal."""
+    year, position = divmod(ordinal, _QUARTERS_PER_YEAR)
+    return VALID_QUARTERS[position], EARLIEST_RECORDED_YEAR + year
+
+
+def _year_mask(first_year: int, last_year: int) -> int:
+    """Bits of every quarter from WIN first_year to AUT last_year."""
+    low = max(0, quarter_ordinal(VALID_QUARTERS[0], first_year))
+    high = quarter_ordinal(VALID_QUARTERS[-1], last_year) + 1
+    return 0 if high <= low else ((1 << high) - 1) ^ ((1 << low) - 1)
+
+
+@lru_cache(maxsize=256)
+def _quarter_mask(quarter: str, length: int) -> int:
+    """Bits of every ordinal of one quarter below 1 << length."""
+    position = VALID_QUARTERS.index(quarter)
+    mask = 0
+    for ordinal in range(position, length, _QUARTERS_PER_YEAR):
+        mask |= 1 << ordinal
+    return mask
+
+
+def _quarters(bits: int) -> List[Tuple[str, int]]:
+    """The (quarter, year) of every set bit, oldest first."""
+    quarters = []
+    while bits:
+        low = bits & -bits
+        quarters.append(ordinal_quarter(low.bit_length() - 1))
+        bits ^= low
+    return quarters
+
+
+class OfferingIndex:
+    """
+    Course code to offered-quarters bitsets, with the quarters indexed per department.
+    """
+
+    def __init__(self, path: Optional[Path] = None) -> None:
+        """
+        Args:
+            path: The file the index is loaded from and saved to. Defaults to
+                index_path().
+        """
+        self.path = path or index_path()
+        self.courses: Dict[str, int] = {}  # Course code -> offered quarters
+        self.departments: Dict[str, int] = {}  # Department -> indexed quarters
+        self.failed: Dict[str, int] = {}  # Department -> quarters that failed to fetch
+        # Department -> quarter ordinal -> when its page was indexed (epoch seconds)
+        self.fetched: Dict[str, Dict[int, float]] = {}
+        self.changed = False  # Unsaved updates
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()  # Held while writing the file
+
+    @classmethod
+    def load(cls, path: Optional[Path] = None) -> "OfferingIndex":
+        """
+        Load the saved index, or start an empty one if there is none (or it is from
+        another index version).
+        """
+        index = cls(path)
+        try:
+            with open(index.path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != INDEX_VERSION:
+                return index
+            index.courses = {
+                code: int(bits, 16) for code, bits in data["courses"].items()
+            }
+            index.departments = {
+                dept: int(bits, 16) for dept, bits in data["departments"].items()
+            }
+            # Indexes saved before these were recorded have neither
+            index.failed = {
+                dept: int(bits, 16) for dept, bits in data.get("failed", {}).items()
+            }
+            index.fetched = {
+                dept: {int(ordinal): at for ordinal, at in times.items()}
+                for dept, times in data.get("fetched", {}).items()
+            }
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            pass
+        return index
+
+    def save(self) -> None:
+        """
+        Write the index atomically if it has changed since it was loaded.
+
+        Saves are serialized, so an older snapshot never replaces a newer one, and each
+        writes a temporary file of its own that replaces the index once complete. If
+        writing fails, the index is left as it was and stays marked as changed.
+        """
+        with self._save_lock:
+            with self._lock:
+                if not self.changed:
+                    return
+                data = {
+                    "version": INDEX_VERSION,
+                    "courses": {code: hex(bits) for code, bits in self.courses.items()},
+                    "departments": {
+                        dept: hex(bits) for dept, bits in self.departments.items()
+                    },
+                    "failed": {
+                        dept: hex(bits) for dept, bits in self.failed.items() if bits
+                    },
+                    "fetched": {
+                        dept: {str(ordinal): at for ordinal, at in times.items()}
+                        for dept, times in self.fetched.items()
+                    },
+                }
+                self.changed = False
+            tmp_path: Optional[str] = None
+            try:
+                fd, tmp_path = tempfile.mkstemp(
+                    dir=self.path.parent, prefix=f"{self.path.name}.", suffix=".tmp"
+                )
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(data, f, separators=(",", ":"))
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                with self._lock:
+                    self.changed = True
+                if tmp_path is not None and os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+    def add_page(
+        self,
+        department: str,
+        quarter: str,
+        year: int,
+        html: Union[str, bytes],
+        fetched_at: Optional[float] = None,
+    ) -> int:
+        """
+        Index the courses listed on a department's schedule page.
+
+        A page without courses (e.g., a quarter the department had no offerings)
+        still marks the quarter as indexed. Adding a page that was already indexed
+        replaces it, so courses dropped from the schedule since are forgotten.
+
+        Args:
+            department: The department code (e.g., "cse").
+            quarter: The quarter code (e.g., "WIN").
+            year: The year (e.g., 2023).
+            html: The page content.
+            fetched_at: When the page was fetched (epoch seconds). Defaults to now.
+
+        Returns:
+            int: The number of distinct courses found.
+        """
+        if isinstance(html, bytes):
+            html = html.decode("utf-8", errors="replace")
+        codes = {code.lower() for code in COURSE_ANCHOR_PATTERN.findall(html)}
+        ordinal = quarter_ordinal(quarter, year)
+        bit = 1 << ordinal
+        department = department.lower()
+        with self._lock:
+            if self.departments.get(department, 0) & bit:
+                own_code = re.compile(rf"{re.escape(department)}\d+[a-z]*")
+                for code, bits in self.courses.items():
+                    if bits & bit and own_code.fullmatch(code):
+                        self.courses[code] = bits & ~bit
+            for code in codes:
+                self.courses[code] = self.courses.get(code, 0) | bit
+            self.departments[department] = self.departments.get(department, 0) | bit
+            self.failed[department] = self.failed.get(department, 0) & ~bit
+            self.fetched.setdefault(department, {})[ordinal] = (
+                time.time() if fetched_at is None else fetched_at
+            )
+            self.changed = True
+        return len(codes)
+
+    def add_failure(self, department: str, quarter: str, year: int) -> None:
+        """
+        Record that a department's page for the quarter could not be fetched.
+
+        An indexed page stays as it was; the failure only marks the quarter to be
+        retried.
+        """
+        department = department.lower()
+        with self._lock:
+            bit = 1 << quarter_ordinal(quarter, year)
+            self.failed[department] = self.failed.get(department, 0) | bit
+            self.changed = True
+
+    def failed_quarters(
+        self, department: str, first_year: int, last_year: int
+    ) -> List[Tuple[str, int]]:
+        """Returns the (quarter, year) whose pages last failed to fetch, newest first."""
+        bits = self.failed.get(department.lower(), 0) & _year_mask(
+            first_year, last_year
+        )
+        return _quarters(bits)[::-1]
+
+    def fetched_at(self, department: str, quarter: str, year: int) -> Optional[float]:
+        """
+        Returns when a department's page for the quarter was indexed, or None if it
+        wasn't (or was indexed before fetch times were recorded).
+        """
+        times = self.fetched.get(department.lower(), {})
+        return times.get(quarter_ordinal(quarter, year))
+
+    def has_page(self, department: str, quarter: str, year: int) -> bool:
+        """Returns whether a department's page for the quarter has been indexed."""
+        bits = self.departments.get(department.lower(), 0)
+        return bool(bits >> quarter_ordinal(quarter, year) & 1)
+
+    def offerings(
+        self, course_code: str, first_year: int, last_year: int
+    ) -> List[Tuple[str, int]]:
+        """
+        Returns the (quarter, year) a course was offered in, oldest first.
+
+        Args:
+            course_code: The course code as used in anchors (e.g., "cse143").
+            first_year: The first year of the window.
+            last_year: The last year of the window, inclusive.
+        """
+        bits = self.courses.get(course_code.lower(), 0) & _year_mask(
+            first_year, last_year
+        )
+        return _quarters(bits)
+
+    def quarter_counts(
+        self, course_code: str, first_year: int, last_year: int
+    ) -> Dict[str, int]:
+        """
+        Returns how many times a course was offered per quarter code in a window.
+
+        Quarters it was never offered in are left out, like frequency's output.
+        """
+        bits = self.courses.get(course_code.lower(), 0) & _year_mask(
+            first_year, last_year
+        )
+        counts = {
+            quarter: (bits & _quarter_mask(quarter, bits.bit_length())).bit_count()
+            for quarter in VALID_QUARTERS
+        }
+        return {quarter: count for quarter, count in counts.items() if count}
@@ -0,0 +1,26 @@
+"""
+Locations of files the scraper persists between runs (sessions, caches, indexes).
+"""
+
+import os
+from pathlib import Path
+
+# Overrides the default data directory, e.g. for tests or shared cron setups
+DATA_DIR_ENV = "SWECC_COURSE_SCRAPER_DIR"
+
+
+def data_dir() -> Path:
+    """
+    Returns the directory for persisted scraper state, creating it if needed.
+
+    Defaults to ~/.cache/swecc_course_scraper unless SWECC_COURSE_SCRAPER_DIR is set.
+    The directory is only accessible by the current user since it holds session cookies.
+
+    Returns:
+        Path: The data directory.
+    """
+    path = Path(
+        os.environ.get(DATA_DIR_ENV) or Path.home() / ".cache" / "swecc_course_scraper"
+    )
+    path.mkdir(parents=True, exist_ok=True, mode=0o700)
+    return path
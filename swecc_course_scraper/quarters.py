@@ -0,0 +1,122 @@
+"""
+Which quarters the time schedule has published.
+
+The time schedule's index page links every quarter it has, and the newest of
+them bounds which quarter pages exist: later quarters of the current year
+haven't been published and would only answer 404. The newest quarter is
+probed from the index page once and cached in the data directory for
+QUARTERS_MAX_AGE seconds.
+"""
+
+import json
+import logging
+import os
+import re
+import tempfile
+import time
+from typing import List, Optional, Tuple
+
+from swecc_course_scraper.commands.schedule import (
+    VALID_QUARTERS,
+    fetch_html,
+    schedule_root,
+)
+from swecc_course_scraper.offerings import quarter_ordinal
+from swecc_course_scraper.paths import data_dir
+
+QUARTERS_FILE = "quarters.json"
+QUARTERS_MAX_AGE = 6 * 60 * 60  # Seconds the probed quarter is trusted for
+
+# Quarter links on the index page, e.g. <a href="AUT2023/">
+QUARTER_LINK_PATTERN = re.compile(
+    rf"href\s*=\s*[\"']?[^\"'\s>]*?\b({'|'.join(VALID_QUARTERS)})(\d{{4}})/",
+    re.IGNORECASE,
+)
+
+
+def parse_latest_quarter(html: str) -> Optional[Tuple[str, int]]:
+    """
+    Returns the newest quarter linked from the time schedule index page.
+
+    Args:
+        str: The index page HTML.
+
+    Returns:
+        Optional[Tuple[str, int]]: The (quarter, year), or None if no quarter is linked.
+    """
+    quarters = {
+        (quarter.upper(), int(year))
+        for quarter, year in QUARTER_LINK_PATTERN.findall(html)
+    }
+    if not quarters:
+        return None
+    return max(quarters, key=lambda quarter_year: quarter_ordinal(*quarter_year))
+
+
+def latest_quarter(max_age: float = QUARTERS_MAX_AGE) -> Optional[Tuple[str, int]]:
+    """
+    Returns the newest quarter the time schedule has published.
+
+    The answer is cached for max_age seconds. If the index page can't be fetched, the
+    last cached answer is used however old it is.
+
+    Args:
+        float: Seconds a cached answer is used for. Default is QUARTERS_MAX_AGE.
+
+    Returns:
+        Optional[Tuple[str, int]]: The (quarter, year), or None if it is unknown.
+    """
+    path = data_dir() / QUARTERS_FILE
+    root = schedule_root()
+    cached: Optional[Tuple[str, int]] = None
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data["root"] == root:
+            quarter, year = data["latest"]
+            cached = (str(quarter), int(year))
+            if time.time() - data["fetched"] < max_age:
+                return cached
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    try:
+        latest = parse_latest_quarter(fetch_html(root))
+    except (FileNotFoundError, ConnectionError):
+        logging.exception(f"Error fetching the time schedule index {root}")
+        return cached
+    if latest is None:
+        return cached
+
+    # A temporary file of its own, so processes saving at once don't write into each
+    # other's
+    fd, tmp_path = tempfile.mkstemp(
+        dir=path.parent, prefix=f"{path.name}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"root": root, "latest": list(latest), "fetched": time.time()}, f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    return latest
+
+
+def published_quarters(year: int, latest: Optional[Tuple[str, int]]) -> List[str]:
+    """
+    Returns the quarters of a year that have been published, in VALID_QUARTERS order.
+
+    Args:
+        int: The year (e.g., 2023).
+        Optional[Tuple[str, int]]: The newest published quarter, from latest_quarter().
+            None (unknown) assumes every quarter is.
+    """
+    if latest is None:
+        return list(VALID_QUARTERS)
+    newest = quarter_ordinal(*latest)
+    return [
+        quarter
+        for quarter in VALID_QUARTERS
+        if quarter_ordinal(quarter, year) <= newest
+    ]
@@ -1,4 +1,107 @@
 """
 Response parsing module for the DawgPath API.
-Eventually we'll want to create dataclasses for the various API responses,
+
+Responses keep the raw body and only decode JSON (and build the typed
+records) the first time a field is read, so bulk fetches that only need a
+few fields don't pay for decoding everything.
 """
+
+import json
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Any, Dict, List
+
+
+@dataclass(frozen=True)
+class ApiResponse:
+    """
+    A raw DawgPath API response.
+    """
+
+    url: str
+    status_code: int
+    content: bytes = field(repr=False)
+
+    @cached_property
+    def data(self) -> Any:
+        """The decoded JSON body."""
+        return json.loads(self.content) if self.content else None
+
+
+@dataclass(frozen=True)
+class SearchResult:
+    """
+    One course matched by a DawgPath search.
+    """
+
+    course_id: str  # Course code (e.g., "CSE 142")
+    course_title: str  # Course title (e.g., "Computer Programming I")
+    # The full result object, including fields not modelled here
+    raw: Dict[str, Any] = field(repr=False, default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SearchResult":
+        return cls(
+            course_id=str(data.get("course_id", "")),
+            course_title=str(data.get("course_title", "")),
+            raw=data,
+        )
+
+
+@dataclass(frozen=True)
+class SearchResponse(ApiResponse):
+    """
+    Response of /api/v1/search/.
+    """
+
+    @cached_property
+    def results(self) -> List[SearchResult]:
+        """The matched courses, in the order DawgPath ranked them."""
+        items = self.data or []
+        if isinstance(items, dict):
+            items = items.get("results", [])
+        return [
+            SearchResult.from_dict(item) for item in items if isinstance(item, dict)
+        ]
+
+
+@dataclass(frozen=True)
+class CourseDetailsResponse(ApiResponse):
+    """
+    Response of /api/v1/courses/details/<course_id>.
+
+    Frequently used fields are exposed as properties; everything else is in data.
+    """
+
+    @property
+    def course_id(self) -> str:
+        return str(self._field("course_id"))
+
+    @property
+    def course_title(self) -> str:
+        return str(self._field("course_title"))
+
+    @property
+    def course_credits(self) -> str:
+        return str(self._field("course_credits"))
+
+    @property
+    def course_description(self) -> str:
+        return str(self._field("course_description"))
+
+    @property
+    def prereq_graph(self) -> Dict[str, Any]:
+        graph = self._field("prereq_graph", {})
+        return graph if isinstance(graph, dict) else {}
+
+    @property
+    def gpa_distro(self) -> List[Any]:
+        distro = self._field("gpa_distro", [])
+        return distro if isinstance(distro, list) else []
+
+    def _field(self, name: str, default: Any = "") -> Any:
+        data = self.data
+        if not isinstance(data, dict):
+            return default
+        value = data.get(name)
+        return default if value is None else value
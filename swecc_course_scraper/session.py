@@ -0,0 +1,104 @@
+"""
+Persistence of DawgPath session cookies.
+
+Cookies extracted after the browser login are saved to a file readable only
+by the current user and reused until the API rejects them, so the Chrome
+login flow only runs when the saved session has expired.
+"""
+
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import requests
+from requests.sessions import Session
+
+from swecc_course_scraper.paths import data_dir
+
+SESSION_FILE = "dawgpath_session.json"
+
+# Status codes meaning the saved cookies are no longer accepted
+AUTH_FAILURE_CODES = (401, 403)
+
+
+def session_path() -> Path:
+    """
+    Returns:
+        Path: The file the DawgPath session cookies are saved to.
+    """
+    return data_dir() / SESSION_FILE
+
+
+def save_cookies(cookies: List[Dict[str, Any]], path: Optional[Path] = None) -> None:
+    """
+    Save browser cookies (as returned by WebDriver.get_cookies()) to the session file.
+
+    The file is written atomically with owner-only permissions.
+
+    Args:
+        List[Dict[str, Any]]: Cookies with at least "name" and "value" keys.
+        Path: The file to write. Defaults to session_path().
+    """
+    path = path or session_path()
+    saved = [
+        {
+            "name": cookie["name"],
+            "value": cookie["value"],
+            "expiry": cookie.get("expiry"),
+        }
+        for cookie in cookies
+    ]
+
+    # mkstemp creates the file readable only by its owner, and unique to this save
+    fd, tmp_path = tempfile.mkstemp(
+        dir=path.parent, prefix=f"{path.name}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"saved_at": time.time(), "cookies": saved}, f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def load_session(path: Optional[Path] = None) -> Optional[Session]:
+    """
+    Create a requests Session from the saved cookies.
+
+    Args:
+        Path: The file to read. Defaults to session_path().
+
+    Returns:
+        Optional[Session]: A Session with the saved cookies, or None if there is no
+        saved session or all of its cookies have expired.
+    """
+    path = path or session_path()
+    try:
+        with open(path, encoding="utf-8") as f:
+            cookies: List[Dict[str, Any]] = json.load(f)["cookies"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+    now = time.time()
+    cookies = [c for c in cookies if c.get("expiry") is None or c["expiry"] > now]
+    if not cookies:
+        return None
+
+    session = requests.Session()
+    for cookie in cookies:
+        session.cookies.set(cookie["name"], cookie["value"])
+    return session
+
+
+def clear_session(path: Optional[Path] = None) -> None:
+    """
+    Delete the saved session, e.g. after the API rejected it.
+
+    Args:
+        Path: The file to delete. Defaults to session_path().
+    """
+    (path or session_path()).unlink(missing_ok=True)
@@ -0,0 +1,295 @@
+"""
+Watch department schedule pages for enrollment and status changes.
+
+A Watcher polls one quarter's pages for a list of departments with
+conditional requests: each page's ETag, Last-Modified and body hash from the
+previous poll are sent back, so a page that hasn't changed costs a 304 (or, on
+servers without validators, a download but no parsing). Changed pages are
+parsed and compared per SLN with the previous poll, and every difference in
+status, enrollment or capacity becomes an event.
+
+The first poll of a page only records it; events describe changes after that.
+Run by a FetchScheduler, each department is polled as a HOT job on its own
+jittered schedule.
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+)
+
+from swecc_course_scraper.commands.parser import iter_schedule_html
+from swecc_course_scraper.commands.schedule import schedule_url
+from swecc_course_scraper.constants import DEFAULT_INTERVAL
+from swecc_course_scraper.fetch import (
+    HOT,
+    Fetcher,
+    FetchScheduler,
+    PageVersion,
+    default_fetcher,
+)
+from swecc_course_scraper.models import Course
+
+# Kinds of event
+ADDED = "added"  # A section appeared on the page
+REMOVED = "removed"  # A section disappeared from the page
+CHANGED = "changed"  # A section's status, enrollment or capacity changed
+
+Event = Dict[str, Any]
+
+
+class SectionState(NamedTuple):
+    """The watched fields of one section (SLN)."""
+
+    course_code: str
+    meeting_id: str
+    status: str
+    enrolled: int
+    capacity: int
+
+
+@dataclass
+class WatchStats:
+    """
+    Counters describing how a watcher has polled.
+    """
+
+    polls: int = 0  # Rounds over every department
+    fetches: int = 0  # Page requests
+    not_modified: int = 0  # Pages the server answered 304 for
+    unchanged: int = 0  # Pages downloaded again with the same content
+    parsed: int = 0  # Pages that changed and were parsed
+    errors: int = 0  # Pages that couldn't be fetched or parsed
+    events: int = 0  # Events emitted
+
+
+def section_states(courses: Iterable[Course]) -> Dict[str, SectionState]:
+    """
+    Returns each section's watched fields, by SLN.
+
+    A section listed on several rows (e.g., meeting at two times) is taken from its
+    first row, which carries the enrollment.
+    """
+    states: Dict[str, SectionState] = {}
+    for course in courses:
+        for meeting in course.meetings:
+            if meeting.sln and meeting.sln not in states:
+                states[meeting.sln] = SectionState(
+                    course.course_code,
+                    meeting.meeting_id,
+                    meeting.status,
+                    meeting.enrolled,
+                    meeting.capacity,
+                )
+    return states
+
+
+def diff_sections(
+    before: Dict[str, SectionState], after: Dict[str, SectionState]
+) -> Iterator[Event]:
+    """
+    Yield an event for every section added, removed or changed, in SLN order.
+
+    Events have the kind, the SLN, the section's course code, meeting ID, status,
+    enrollment and capacity (as before, for removed sections) and, for changed
+    sections, the previous status, enrollment and capacity.
+    """
+    for sln in sorted(before.keys() | after.keys()):
+        old, new = before.get(sln), after.get(sln)
+        if old == new:
+            continue
+        if new is None:
+            assert old is not None
+            yield {"event": REMOVED, "sln": sln, **old._asdict()}
+        elif old is None:
+            yield {"event": ADDED, "sln": sln, **new._asdict()}
+        else:
+            yield {
+                "event": CHANGED,
+                "sln": sln,
+                **new._asdict(),
+                "previous": {
+                    "status": old.status,
+                    "enrolled": old.enrolled,
+                    "capacity": old.capacity,
+                },
+            }
+
+
+class Watcher:
+    """
+    Polls a quarter's department pages and reports per-SLN changes.
+    """
+
+    def __init__(
+        self,
+        departments: Iterable[str],
+        quarter: str,
+        year: int,
+        *,
+        fetcher: Optional[Fetcher] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Args:
+            departments: Department codes to watch (e.g., ["cse", "math"]).
+            quarter: The quarter code (e.g., "AUT").
+            year: The year (e.g., 2023).
+            fetcher: Fetches the pages. Defaults to the shared fetcher.
+            clock: Time source for the polling interval, in seconds.
+        """
+        self.departments = [department.lower() for department in departments]
+        self.quarter = quarter.upper()
+        self.year = year
+        self.stats = WatchStats()
+        self._fetcher = fetcher
+        self._clock = clock
+        self._versions: Dict[str, PageVersion] = {}
+        self._sections: Dict[str, Dict[str, SectionState]] = {}
+
+    def poll(self) -> List[Event]:
+        """
+        Fetch every department's page once and return the changes since the last poll.
+
+        Pages that can't be fetched or parsed are logged and tried again next poll.
+        """
+        events: List[Event] = []
+        for department in self.departments:
+            events += self.poll_department(department)
+        self.stats.polls += 1
+        return events
+
+    def poll_department(self, department: str) -> List[Event]:
+        """
+        Fetch one department's page and return its changes since the last fetch.
+
+        A page that can't be fetched or parsed is logged and counted as an error. Its
+        version isn't recorded, so the next poll fetches and parses it again.
+        """
+        fetcher = self._fetcher or default_fetcher()
+        url = schedule_url(department, self.quarter, self.year)
+        self.stats.fetches += 1
+        previous = self._versions.get(department)
+        try:
+            html, version = fetcher.fetch_if_changed(url, previous)
+        except Exception:
+            logging.exception(f"Error fetching {url}")
+            self.stats.errors += 1
+            return []
+        if html is None:
+            self._versions[department] = version
+            if previous is not None and version is previous:
+                self.stats.not_modified += 1
+            else:
+                self.stats.unchanged += 1
+            return []
+
+        try:
+            sections = section_states(iter_schedule_html(html, self.quarter, self.year))
+        except Exception:
+            logging.exception(f"Error parsing {url}")
+            self.stats.errors += 1
+            return []
+        self._versions[department] = version
+        self.stats.parsed += 1
+        before = self._sections.get(department)
+        self._sections[department] = sections
+        if before is None:
+            return []
+        timestamp = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        events = [
+            {
+                "time": timestamp,
+                "department": department,
+                "quarter": self.quarter,
+                "year": self.year,
+                **event,
+            }
+            for event in diff_sections(before, sections)
+        ]
+        self.stats.events += len(events)
+        return events
+
+    def run(
+        self,
+        emit: Callable[[Event], None],
+        interval: float = DEFAULT_INTERVAL,
+        polls: Optional[int] = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> WatchStats:
+        """
+        Poll every interval seconds, passing each event to emit.
+
+        Args:
+            emit: Called with every event, as soon as its poll finishes.
+            interval: Seconds from the start of one poll to the start of the next.
+            polls: Polls to run before returning; None runs until interrupted.
+            sleep: Waits between polls, in seconds.
+
+        Returns:
+            WatchStats: The watcher's counters.
+        """
+        while polls is None or self.stats.polls < polls:
+            start = self._clock()
+            for event in self.poll():
+                emit(event)
+            if polls is not None and self.stats.polls >= polls:
+                break
+            sleep(max(0.0, interval - (self._clock() - start)))
+        return self.stats
+
+    def run_scheduled(
+        self,
+        scheduler: FetchScheduler,
+        emit: Callable[[Event], None],
+        interval: float = DEFAULT_INTERVAL,
+        polls: Optional[int] = None,
+        stop: Optional[threading.Event] = None,
+    ) -> WatchStats:
+        """
+        Poll each department every interval seconds as a HOT job of a scheduler.
+
+        Departments are polled on their own jittered schedules rather than all at
+        once, and go ahead of any COLD requests (e.g., a backfill) competing for the
+        scheduler's budget.
+
+        Args:
+            scheduler: Hands out the request slots.
+            emit: Called with every event, as soon as its page is parsed.
+            interval: Seconds between polls of each department.
+            polls: Polls of every department before returning; None runs until stop
+                is set (or interrupted).
+            stop: Returns once set.
+
+        Returns:
+            WatchStats: The watcher's counters. polls counts complete rounds over
+                every department.
+        """
+        stop = stop or threading.Event()
+        counts = dict.fromkeys(self.departments, 0)
+
+        def poll(department: Hashable) -> None:
+            assert isinstance(department, str)
+            for event in self.poll_department(department):
+                emit(event)
+            counts[department] += 1
+            self.stats.polls = min(counts.values())
+            if polls is not None and self.stats.polls >= polls:
+                stop.set()
+
+        for department in self.departments:
+            scheduler.add(department, HOT, interval)
+        scheduler.run(poll, stop)
+        return self.stats
@@ -0,0 +1,38 @@
+"""
+Fixtures shared by the test modules.
+"""
+
+import pytest
+
+from swecc_course_scraper.commands import schedule
+from swecc_course_scraper.fetch import Fetcher, FetchPolicy, set_default_fetcher
+from swecc_course_scraper.paths import DATA_DIR_ENV
+from tests.servers.schedule import ScheduleServer
+
+
+class FakeClock:
+    """Time source that only moves when a test sets now."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def server(request, monkeypatch, tmp_path):
+    """
+    A time schedule stand-in used by the schedule commands and the default fetcher.
+
+    Parametrize it indirectly with (department, quarter, year, courses) tuples to also
+    serve synthetic pages.
+    """
+    with ScheduleServer() as server:
+        monkeypatch.setenv(schedule.SCHEDULE_ENV, server.schedule_url)
+        monkeypatch.setenv(DATA_DIR_ENV, str(tmp_path))
+        set_default_fetcher(Fetcher(FetchPolicy(backoff_base=0)))
+        for department, quarter, year, courses in getattr(request, "param", ()):
+            server.synthesize(department, quarter, year, courses=courses)
+        yield server
+        set_default_fetcher(None)
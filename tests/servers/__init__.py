@@ -0,0 +1,3 @@
+"""
+Local stand-in servers for exercising network code offline in tests and benchmarks.
+"""
@@ -0,0 +1,85 @@
+"""
+Shared plumbing for the stand-in servers: a threaded HTTP server run in the background.
+"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+
+class StandInServer:
+    """
+    Runs a handler class on 127.0.0.1 (a free port) in a daemon thread.
+
+    Subclasses set handler_class; the handler reaches the server's settings through
+    self.server.stand_in. Use as a context manager or call start()/stop().
+    """
+
+    handler_class: type = BaseHTTPRequestHandler
+
+    def __init__(self, latency: float = 0.0) -> None:
+        self.latency = latency  # Seconds added before every response
+        self.requests = 0  # Requests received
+        self.paths: Dict[str, int] = {}  # Requests received per path
+        self._lock = threading.Lock()
+        self._httpd: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        assert self._httpd is not None, "server not started"
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StandInServer":
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), self.handler_class)
+        self._httpd.daemon_threads = True
+        self._httpd.stand_in = self  # type: ignore[attr-defined]
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever,
+            kwargs={"poll_interval": 0.05},
+            daemon=True,
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def record(self, path: str) -> None:
+        """Count a request and apply the configured latency."""
+        with self._lock:
+            self.requests += 1
+            self.paths[path] = self.paths.get(path, 0) + 1
+        if self.latency:
+            time.sleep(self.latency)
+
+
+class QuietHandler(BaseHTTPRequestHandler):
+    """Request handler that doesn't log every request to stderr."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+    def send_body(
+        self, status: int, body: bytes, content_type: str, headers=None
+    ) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
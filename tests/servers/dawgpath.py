@@ -0,0 +1,151 @@
+"""
+Stand-in for the DawgPath API.
+
+Serves recorded course JSON for /api/v1/search/ and /api/v1/courses/details/<id>,
+only to requests carrying the expected session cookie, and can inject latency,
+401s, rate limiting (429) and scripted error statuses.
+"""
+
+import json
+import random
+import threading
+import time
+from collections import deque
+from http import HTTPStatus
+from http.cookies import SimpleCookie
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import requests
+
+from tests.servers.base import QuietHandler, StandInServer
+
+COURSES_FILE = Path(__file__).parent.parent / "test_files" / "dawgpath" / "courses.json"
+SESSION_COOKIE = "sessionid"
+DEFAULT_SESSION_ID = "stand-in-session"
+
+
+class DawgPathHandler(QuietHandler):
+    def do_GET(self) -> None:  # noqa: N802
+        server: DawgPathServer = self.server.stand_in  # type: ignore[attr-defined]
+        url = urlsplit(self.path)
+        server.record(url.path)
+
+        status, payload, headers = server.respond(
+            url.path, parse_qs(url.query), self._session_id()
+        )
+        body = json.dumps(payload).encode("utf-8")
+        self.send_body(status, body, "application/json", headers)
+
+    def _session_id(self) -> Optional[str]:
+        cookie = SimpleCookie(self.headers.get("Cookie", ""))
+        morsel = cookie.get(SESSION_COOKIE)
+        return morsel.value if morsel else None
+
+
+class DawgPathServer(StandInServer):
+    """
+    Local DawgPath API with a fake session cookie and failure injection.
+    """
+
+    handler_class = DawgPathHandler
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        unauthorized_rate: float = 0.0,
+        rate_limit: Optional[int] = None,
+        courses_file: Path = COURSES_FILE,
+        seed: int = 0,
+    ) -> None:
+        """
+        Args:
+            latency: Seconds added before every response.
+            unauthorized_rate: Fraction of authenticated requests answered with 401 anyway.
+            rate_limit: Maximum requests per second before answering 429.
+            courses_file: Recorded course details, a JSON list.
+            seed: Seed for the failure injection.
+        """
+        super().__init__(latency)
+        self.session_id = DEFAULT_SESSION_ID
+        self.unauthorized_rate = unauthorized_rate
+        self.rate_limit = rate_limit
+        self.unauthorized = 0  # 401s answered
+        self.throttled = 0  # 429s answered
+        self.courses: List[Dict[str, Any]] = json.loads(courses_file.read_text("utf-8"))
+        self._by_id = {course["course_id"]: course for course in self.courses}
+        self._random = random.Random(seed)
+        self._recent: deque = deque()
+        self._rate_lock = threading.Lock()
+        self._scripted: deque = deque()
+
+    def make_session(self) -> requests.Session:
+        """A requests Session carrying the currently accepted cookie."""
+        session = requests.Session()
+        session.cookies.set(SESSION_COOKIE, self.session_id)
+        return session
+
+    def expire_session(self) -> None:
+        """Reject every existing session from now on, as if it had timed out."""
+        self.session_id = f"{DEFAULT_SESSION_ID}-{time.monotonic_ns()}"
+
+    def script_statuses(self, *statuses: int) -> None:
+        """Answer the next authenticated requests with these statuses, in order."""
+        with self._rate_lock:
+            self._scripted.extend(statuses)
+
+    def respond(
+        self, path: str, query: Dict[str, List[str]], session_id: Optional[str]
+    ):
+        """Return (status, JSON payload, extra headers) for a request."""
+        if (
+            session_id != self.session_id
+            or self._random.random() < self.unauthorized_rate
+        ):
+            with self._rate_lock:
+                self.unauthorized += 1
+            return 401, {"detail": "Authentication credentials were not provided."}, {}
+        if self._rate_limited():
+            with self._rate_lock:
+                self.throttled += 1
+            return 429, {"detail": "Request was throttled."}, {"Retry-After": "1"}
+        with self._rate_lock:
+            status = self._scripted.popleft() if self._scripted else None
+        if status is not None:
+            headers = {"Retry-After": "1"} if status == HTTPStatus.TOO_MANY_REQUESTS else {}
+            return status, {"detail": HTTPStatus(status).phrase}, headers
+
+        if path == "/api/v1/search/":
+            text = query.get("search_string", [""])[0].lower()
+            compact = text.replace(" ", "")
+            results = [
+                {
+                    "course_id": course["course_id"],
+                    "course_title": course["course_title"],
+                    "course_credits": course["course_credits"],
+                }
+                for course in self.courses
+                if compact in course["course_id"].lower().replace(" ", "")
+                or text in course["course_title"].lower()
+            ]
+            return 200, results, {}
+
+        prefix = "/api/v1/courses/details/"
+        if path.startswith(prefix):
+            course = self._by_id.get(unquote(path[len(prefix) :]).upper())
+            if course is not None:
+                return 200, course, {}
+        return 404, {"detail": "Not found."}, {}
+
+    def _rate_limited(self) -> bool:
+        if self.rate_limit is None:
+            return False
+        now = time.monotonic()
+        with self._rate_lock:
+            while self._recent and now - self._recent[0] >= 1.0:
+                self._recent.popleft()
+            if len(self._recent) >= self.rate_limit:
+                return True
+            self._recent.append(now)
+            return False
@@ -0,0 +1,341 @@
+"""
+Stand-in for the UW time schedule (https://www.washington.edu/students/timeschd/).
+
+Serves /{QUARTER}{YEAR}/{dept}.html from the saved pages in tests/test_files
+(named {dept}_{QUARTER}_{YEAR}.html) and from synthetic pages added at
+runtime, an index page at / linking every quarter it has pages for, and one at
+/{QUARTER}{YEAR}/ linking that quarter's department pages. It answers 404 for
+anything else, and can inject latency, bandwidth throttling,
+random 5xx responses and connection resets. Pages carry an ETag (and department
+pages a Last-Modified), and conditional requests for unchanged pages get a 304.
+"""
+
+import hashlib
+import random
+import re
+import socket
+import struct
+import threading
+import time
+from collections import deque
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import Deque, Dict, Optional, Tuple
+
+from tests.servers.base import QuietHandler, StandInServer
+
+PAGES_DIR = Path(__file__).parent.parent / "test_files"
+PAGE_FILE_PATTERN = re.compile(r"([a-z]+)_(WIN|SPR|SUM|AUT)_(\d{4})\.html")
+PAGE_PATH_PATTERN = re.compile(r"/(WIN|SPR|SUM|AUT)(\d{4})/([a-z]+)\.html")
+QUARTER_PATH_PATTERN = re.compile(r"/(WIN|SPR|SUM|AUT)(\d{4})/")
+
+# Course header colours the parser uses to find course blocks
+QUARTER_COLORS = {
+    "WIN": "#99ccff",
+    "SPR": "#ccffcc",
+    "SUM": "#ffffcc",
+    "AUT": "#ffcccc",
+}
+QUARTERS = list(QUARTER_COLORS)
+SERVER_ERRORS = (500, 502, 503)
+CHUNK_SIZE = 4096
+
+PageKey = Tuple[str, str, int]  # (department, quarter, year)
+
+
+def synthetic_page(
+    department: str, quarter: str, year: int, courses: int = 20, sections: int = 3
+) -> str:
+    """
+    Build a time schedule page in the same layout as the real ones.
+
+    Args:
+        department: The department code (e.g., "cse").
+        quarter: The quarter code (e.g., "WIN").
+        year: The year (e.g., 2023).
+        courses: Number of courses, numbered 100, 101, ...
+        sections: Sections per course.
+
+    Returns:
+        str: The page HTML.
+    """
+    dept = department.upper()
+    color = QUARTER_COLORS[quarter]
+    parts = [
+        f"<HTML><HEAD><TITLE>{dept}</TITLE></HEAD><BODY>",
+        f"<B>{dept} TIME SCHEDULE ({quarter} {year})</B>",
+        "</P>",
+        '<table width="100%" bgcolor="#d3d3d3" class="scroll-header"><tr><td>'
+        "<pre><b>Restr   SLN  ID Cred    Meeting Times     Bldg/Rm       Instructor"
+        "</b></td></tr></table></pre>",
+        "<br>",
+    ]
+    for i in range(courses):
+        number = 100 + i
+        anchor = f"{department.lower()}{number}"
+        parts.append(
+            f"<table bgcolor='{color}' width='100%'><tr><td width=\"50%\"><b>"
+            f"<A NAME={anchor}>{dept}&nbsp;&nbsp; {number} </A>&nbsp;"
+            f"<A HREF=/students/crscat/{department.lower()}.html#{anchor}>"
+            f"SYNTHETIC COURSE {number}</A></b></td>"
+            '<td width="15%"><b>(NSc)</b></td></tr></table>'
+        )
+        for section in range(sections):
+            sln = 10000 + i * sections + section
+            section_id = chr(ord("A") + section)
+            parts.append(
+                '<table width="100%" ><tr><td><pre>\n'
+                f"Restr  <A HREF=/timeschd/sln.asp?SLN={sln}>{sln}</A> {section_id}  5"
+                "       MWF    1030-1120  <A HREF=/students/maps/map.cgi?KNE>KNE</A>"
+                f"  {110 + section}      Doe,Jane                   Open     "
+                f"{20 + section}/  40\n"
+                "</td></tr></table>"
+            )
+    parts.append("<P>")
+    parts.append("</BODY></HTML>")
+    return "\n".join(parts)
+
+
+class ScheduleHandler(QuietHandler):
+    def do_GET(self) -> None:  # noqa: N802
+        server: ScheduleServer = self.server.stand_in  # type: ignore[attr-defined]
+        server.record(self.path)
+
+        fault = server.pick_fault()
+        if fault == "stall":
+            time.sleep(server.stall)
+        elif fault == "error":
+            status = server.choice(SERVER_ERRORS)
+            self.send_body(status, b"<HTML>Server error</HTML>", "text/html")
+            return
+        if fault == "throttle":
+            self.send_body(
+                429, b"<HTML>Slow down</HTML>", "text/html", {"Retry-After": "0"}
+            )
+            return
+
+        page = server.page_for(self.path)
+        if page is None:
+            self.send_body(404, b"<HTML>Not Found</HTML>", "text/html")
+            return
+
+        validators = server.validators_for(self.path, page)
+        if server.not_modified(validators, self.headers):
+            server.count_not_modified()
+            self.send_response(304)
+            for name, value in validators.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(page)))
+        for name, value in validators.items():
+            self.send_header(name, value)
+        self.end_headers()
+        if fault == "reset":
+            # Send part of the body, then abort the connection with a TCP RST
+            self.wfile.write(page[: len(page) // 2])
+            self.connection.setsockopt(
+                socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0)
+            )
+            self.connection.close()
+            self.close_connection = True
+            return
+        self._write_throttled(page, server)
+
+    def _write_throttled(self, body: bytes, server: "ScheduleServer") -> None:
+        chunk_size = CHUNK_SIZE if server.bandwidth else len(body)
+        try:
+            for start in range(0, len(body), chunk_size):
+                chunk = body[start : start + chunk_size]
+                self.wfile.write(chunk)
+                if server.bandwidth:
+                    time.sleep(len(chunk) / server.bandwidth)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client stopped reading part way through
+            self.close_connection = True
+
+
+class ScheduleServer(StandInServer):
+    """
+    Local time schedule with failure injection.
+
+    Point the scraper at it with SWECC_SCHEDULE_URL=<server.schedule_url>.
+    """
+
+    handler_class = ScheduleHandler
+
+    def __init__(  # noqa: PLR0913
+        self,
+        latency: float = 0.0,
+        bandwidth: Optional[int] = None,
+        error_rate: float = 0.0,
+        reset_rate: float = 0.0,
+        *,
+        pages_dir: Optional[Path] = PAGES_DIR,
+        seed: int = 0,
+        validators: bool = True,
+    ) -> None:
+        """
+        Args:
+            latency: Seconds added before every response.
+            bandwidth: Bytes per second the page bodies are sent at (None for unlimited).
+            error_rate: Fraction of requests answered with a random 5xx.
+            reset_rate: Fraction of requests whose connection is reset mid-body.
+            pages_dir: Directory of saved pages named {dept}_{QUARTER}_{YEAR}.html.
+            seed: Seed for the failure injection.
+            validators: Send ETag/Last-Modified and answer conditional requests; off,
+                every request gets the whole page.
+        """
+        super().__init__(latency)
+        self.bandwidth = bandwidth
+        self.error_rate = error_rate
+        self.reset_rate = reset_rate
+        self.pages: Dict[PageKey, bytes] = {}
+        self.modified: Dict[PageKey, float] = {}  # When each page last changed
+        self.validators = validators
+        self.not_modified_sent = 0  # 304 responses sent
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        self._scripted: Deque[Optional[str]] = deque()
+        self.stall = 1.0  # Seconds a "stall" fault holds the response
+        if pages_dir is not None:
+            for path in pages_dir.glob("*.html"):
+                match = PAGE_FILE_PATTERN.fullmatch(path.name)
+                if match:
+                    department, quarter, year = match.groups()
+                    key = (department, quarter, int(year))
+                    self.pages[key] = path.read_bytes()
+                    self.modified[key] = path.stat().st_mtime
+
+    @property
+    def schedule_url(self) -> str:
+        """The URL to use in place of the real time schedule root."""
+        return f"{self.url}/"
+
+    def add_page(self, department: str, quarter: str, year: int, html: str) -> None:
+        """Serve html for one department and quarter."""
+        key = (department.lower(), quarter.upper(), year)
+        self.pages[key] = html.encode("utf-8")
+        self.modified[key] = time.time()
+
+    def synthesize(
+        self, department: str, quarter: str, year: int, courses: int = 20
+    ) -> None:
+        """Serve a synthetic_page() for one department and quarter."""
+        self.add_page(
+            department,
+            quarter,
+            year,
+            synthetic_page(department, quarter, year, courses),
+        )
+
+    def page_for(self, path: str) -> Optional[bytes]:
+        if path == "/":
+            return self.index_page()
+        match = QUARTER_PATH_PATTERN.fullmatch(path)
+        if match is not None:
+            quarter, year = match.groups()
+            return self.quarter_page(quarter, int(year))
+        match = PAGE_PATH_PATTERN.fullmatch(path)
+        if match is None:
+            return None
+        quarter, year, department = match.groups()
+        return self.pages.get((department, quarter, int(year)))
+
+    def index_page(self) -> bytes:
+        """The time schedule index, linking each quarter with a page, newest first."""
+        quarters = sorted(
+            {
+                (year, QUARTERS.index(quarter), quarter)
+                for _, quarter, year in self.pages
+            },
+            reverse=True,
+        )
+        links = [
+            f'<li><a href="{quarter}{year}/">{quarter} {year}</a></li>'
+            for year, _, quarter in quarters
+        ]
+        return "\n".join(["<HTML><BODY><ul>", *links, "</ul></BODY></HTML>"]).encode()
+
+    def quarter_page(self, quarter: str, year: int) -> Optional[bytes]:
+        """A quarter's index, linking each department with a page that quarter."""
+        departments = sorted(
+            department
+            for department, page_quarter, page_year in self.pages
+            if (page_quarter, page_year) == (quarter, year)
+        )
+        if not departments:
+            return None
+        links = [
+            f'<li><a href="{department}.html">{department.upper()}</a></li>'
+            for department in departments
+        ]
+        return "\n".join(["<HTML><BODY><ul>", *links, "</ul></BODY></HTML>"]).encode()
+
+    def validators_for(self, path: str, page: bytes) -> Dict[str, str]:
+        """The ETag (and Last-Modified, for department pages) sent with a page."""
+        if not self.validators:
+            return {}
+        headers = {"ETag": f'"{hashlib.sha256(page).hexdigest()[:16]}"'}
+        match = PAGE_PATH_PATTERN.fullmatch(path)
+        if match is not None:
+            quarter, year, department = match.groups()
+            modified = self.modified.get((department, quarter, int(year)))
+            if modified is not None:
+                headers["Last-Modified"] = formatdate(modified, usegmt=True)
+        return headers
+
+    @staticmethod
+    def not_modified(validators: Dict[str, str], request_headers) -> bool:
+        """Whether a conditional request's validators match the page's."""
+        if not validators:
+            return False
+        # If-None-Match takes precedence over If-Modified-Since (RFC 9110 13.2.2)
+        if_none_match = request_headers.get("If-None-Match")
+        if if_none_match is not None:
+            return validators["ETag"] in [
+                tag.strip() for tag in if_none_match.split(",")
+            ]
+        if_modified_since = request_headers.get("If-Modified-Since")
+        last_modified = validators.get("Last-Modified")
+        if if_modified_since is None or last_modified is None:
+            return False
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return parsedate_to_datetime(last_modified) <= since
+
+    def count_not_modified(self) -> None:
+        with self._lock:
+            self.not_modified_sent += 1
+
+    def script_faults(self, *faults: Optional[str]) -> None:
+        """
+        Apply these faults to the next requests, in order, before any random ones.
+
+        Each is "error" (a 5xx), "throttle" (a 429), "reset", "stall" (wait stall
+        seconds first) or None.
+        """
+        with self._random_lock:
+            self._scripted.extend(faults)
+
+    def pick_fault(self) -> Optional[str]:
+        """Return "error", "reset", "stall" or None for the next response."""
+        with self._random_lock:
+            if self._scripted:
+                return self._scripted.popleft()
+            roll = self._random.random()
+        if roll < self.error_rate:
+            return "error"
+        if roll < self.error_rate + self.reset_rate:
+            return "reset"
+        return None
+
+    def choice(self, options):
+        with self._random_lock:
+            return self._random.choice(options)
@@ -0,0 +1,83 @@
+"""
+Tests for the TTL cache with stale-while-revalidate.
+"""
+
+import threading
+
+from swecc_course_scraper.cache import TTLCache
+from tests.conftest import FakeClock
+
+
+class TestTTLCache:
+    """Test freshness, staleness, expiry and eviction."""
+
+    def setup_method(self):
+        self.clock = FakeClock()
+        self.cache = TTLCache(ttl=10, stale_ttl=20, clock=self.clock)
+
+    def test_fresh_hit_and_miss(self):
+        assert self.cache.get("a") is None
+        self.cache.set("a", 1)
+        assert self.cache.get("a") == 1
+        assert (self.cache.stats.hits, self.cache.stats.misses) == (1, 1)
+
+    def test_stale_value_served_while_refreshing(self):
+        self.cache.set("a", 1)
+        self.clock.now = 15
+        refreshed = threading.Event()
+
+        def reload():
+            refreshed.set()
+            return 2
+
+        assert self.cache.get("a", refresh=reload) == 1
+        assert refreshed.wait(timeout=5)
+        self.cache._executor.shutdown(wait=True)
+        assert self.cache.get("a") == 2
+        assert self.cache.stats.stale_hits == 1
+        assert self.cache.stats.refreshes == 1
+
+    def test_failed_refresh_keeps_stale_value(self):
+        self.cache.set("a", 1)
+        self.clock.now = 15
+
+        def reload():
+            raise ConnectionError("offline")
+
+        assert self.cache.get("a", refresh=reload) == 1
+        self.cache._executor.shutdown(wait=True)
+        assert self.cache.get("a") == 1
+        assert self.cache.stats.refresh_errors == 1
+
+    def test_expired_after_stale_window(self):
+        self.cache.set("a", 1)
+        self.clock.now = 30
+        assert self.cache.get("a") is None
+
+    def test_per_entry_ttl(self):
+        self.cache.set("short", 1, ttl=1, stale_ttl=0)
+        self.cache.set("default", 2)
+        self.clock.now = 5
+        assert self.cache.get("short") is None
+        assert self.cache.get("default") == 2
+
+    def test_get_or_load(self):
+        calls = []
+
+        def load():
+            calls.append(1)
+            return "value"
+
+        assert self.cache.get_or_load("a", load) == "value"
+        assert self.cache.get_or_load("a", load) == "value"
+        assert len(calls) == 1
+
+    def test_lru_eviction(self):
+        cache = TTLCache(ttl=10, max_entries=2, clock=self.clock)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert len(cache) == 2
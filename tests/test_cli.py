@@ -0,0 +1,61 @@
+"""
+Tests for the command line entry point: lazy command loading and deferred heavy imports.
+"""
+
+import subprocess
+import sys
+
+from swecc_course_scraper import cli
+from swecc_course_scraper.export import WRITERS
+
+HEAVY_MODULES = ("selenium", "requests", "swecc_course_scraper.export")
+
+
+def _run(code: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def _imported_modules(importtime_log: str) -> set:
+    """List the modules a -X importtime log shows being imported (timings are ignored)."""
+    modules = set()
+    for line in importtime_log.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        modules.add(line.split("|")[-1].strip())
+    return modules
+
+
+class TestLazyImports:
+    """Check which modules CLI startup imports; import time itself is not measured."""
+
+    def test_cli_import_does_not_import_heavy_modules(self):
+        modules = _imported_modules(_run("import swecc_course_scraper.cli").stderr)
+        assert "swecc_course_scraper.cli" in modules
+        for name in modules:
+            assert not name.startswith(HEAVY_MODULES), f"{name} imported at startup"
+
+    def test_schedule_does_not_import_selenium(self):
+        code = (
+            "import sys\n"
+            "from swecc_course_scraper import cli\n"
+            "cli.load_command('schedule')\n"
+            "cli.load_command('frequency')\n"
+            "print('selenium' in sys.modules)\n"
+        )
+        assert _run(code).stdout.strip() == "False"
+
+
+class TestCommandRegistry:
+    """Keep the CLI's command table and output formats in sync with the modules."""
+
+    def test_commands_resolve(self):
+        for name in cli.COMMANDS:
+            assert callable(cli.load_command(name))
+
+    def test_output_formats_match_writers(self):
+        assert set(cli.OUTPUT_FORMATS) == {"html", *WRITERS}
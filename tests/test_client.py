@@ -0,0 +1,91 @@
+"""
+Tests for the DawgPath client against the local stand-in server.
+"""
+
+import pytest
+
+from swecc_course_scraper.cache import TTLCache
+from swecc_course_scraper.client import DawgPathClient
+from swecc_course_scraper.fetch import FetchPolicy
+from tests.servers.dawgpath import DawgPathServer
+
+
+@pytest.fixture
+def server():
+    with DawgPathServer() as server:
+        yield server
+
+
+def _client(server, **kwargs):
+    kwargs.setdefault("relogin", None)
+    return DawgPathClient(server.make_session(), root=server.url, **kwargs)
+
+
+class TestDawgPathClient:
+    """Test typed responses, fan-out, dedup, re-login and caching."""
+
+    def test_search_and_details(self, server):
+        with _client(server) as client:
+            ids = [result.course_id for result in client.search("math 12").results]
+            details = client.course_details("cse 143")
+
+        assert ids == ["MATH 124", "MATH 125", "MATH 126"]
+        assert details.course_title == "Computer Programming II"
+        assert details.prereq_graph["x"]["course_number"]["0"] == "CSE 142"
+
+    def test_missing_course(self, server):
+        with _client(server) as client, pytest.raises(FileNotFoundError):
+            client.course_details("CSE 999")
+
+    def test_fan_out_deduplicates(self, server):
+        server.latency = 0.05
+        with _client(server, max_workers=4) as client:
+            responses = client.course_details_many(["MATH 124", "CSE 142", "MATH 124"] * 5)
+
+        assert set(responses) == {"MATH 124", "CSE 142"}
+        assert server.requests == 2
+
+    def test_relogin_on_rejected_session(self, server):
+        logins = []
+
+        def relogin():
+            logins.append(1)
+            return server.make_session()
+
+        with _client(server, relogin=relogin) as client:
+            server.expire_session()
+            assert client.search("chem").results[0].course_id == "CHEM 142"
+        assert len(logins) == 1
+
+    def test_rejected_session_without_relogin(self, server):
+        with _client(server) as client:
+            server.expire_session()
+            with pytest.raises(PermissionError):
+                client.search("chem")
+
+    def test_cache_answers_repeat_searches(self, server):
+        cache = TTLCache(ttl=60)
+        with _client(server, cache=cache) as client:
+            for _ in range(3):
+                client.search_many(["math", "cse"])
+
+        assert server.requests == 2
+        assert cache.stats.hits == 4
+
+    def test_throttled_requests_are_retried(self, server):
+        sleeps = []
+        server.script_statuses(429, 503)
+        with _client(server, sleep=sleeps.append) as client:
+            assert client.search("chem").results[0].course_id == "CHEM 142"
+
+        assert server.requests == 3
+        assert client.retries == 2
+        assert sleeps[0] >= 1.0  # The 429's Retry-After
+
+    def test_retries_are_bounded(self, server):
+        server.script_statuses(*[502] * 10)
+        policy = FetchPolicy(max_attempts=3, backoff_base=0)
+        with _client(server, policy=policy, sleep=lambda _: None) as client:
+            with pytest.raises(ConnectionError):
+                client.search("chem")
+        assert server.requests == 3
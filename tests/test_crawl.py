@@ -0,0 +1,401 @@
+"""
+Tests for crawling schedule pages with a checkpoint manifest.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from swecc_course_scraper.commands import crawl as crawl_command
+from swecc_course_scraper.crawl import (
+    DONE,
+    FAILED,
+    LEASED,
+    MISSING,
+    PENDING,
+    CrawlJob,
+    CrawlManifest,
+    Pipeline,
+    crawl,
+    enumerate_jobs,
+    leased_jobs,
+    run_worker,
+)
+from swecc_course_scraper.crawl.crawler import _last_quarter_digests
+from swecc_course_scraper.export import SQLiteStore
+from tests.servers.schedule import ScheduleServer
+
+CRAWLED_PAGES = [
+    CrawlJob("math", "AUT", 2023),
+    CrawlJob("math", "SUM", 2023),
+    CrawlJob("math", "WIN", 2023),
+    CrawlJob("chem", "SPR", 2021),
+    CrawlJob("math", "SPR", 2021),
+]
+
+
+class _InterruptingSink(SQLiteStore):
+    """Stops the crawl as if interrupted after some pages have been stored."""
+
+    def __init__(self, pages: int) -> None:
+        super().__init__()
+        self.pages = pages
+
+    def write_courses(self, courses) -> int:
+        if self.pages == 0:
+            raise KeyboardInterrupt
+        self.pages -= 1
+        return super().write_courses(courses)
+
+
+class _SlowSink(SQLiteStore):
+    """Stores a page every delay seconds, recording how far fetching ran ahead."""
+
+    def __init__(self, server: ScheduleServer, delay: float) -> None:
+        super().__init__()
+        self.server = server
+        self.delay = delay
+        self.pages = 0
+        self.ahead = 0  # Most pages fetched but not yet stored
+
+    def write_courses(self, courses) -> int:
+        time.sleep(self.delay)
+        self.ahead = max(self.ahead, self.server.requests - self.pages)
+        self.pages += 1
+        return super().write_courses(courses)
+
+
+class _BrokenManifest(CrawlManifest):
+    """Fails to look up stored pages, as a manifest on a busy shared volume can."""
+
+    def content_hash(self, job):
+        raise sqlite3.OperationalError("database is locked")
+
+
+def _failing_jobs():
+    yield CRAWLED_PAGES[0]
+    raise sqlite3.OperationalError("database is locked")
+
+
+class TestCrawl:
+    """Test enumerating, crawling and resuming."""
+
+    def test_enumerate_jobs(self, server):
+        assert list(enumerate_jobs(2021, 2023)) == CRAWLED_PAGES
+        assert list(enumerate_jobs(2021, 2023, ["MATH"])) == [
+            job for job in CRAWLED_PAGES if job.department == "math"
+        ]
+
+    def test_crawl(self, server):
+        manifest = CrawlManifest()
+        manifest.add_jobs([*CRAWLED_PAGES, CrawlJob("cse", "WIN", 2023)])
+        with SQLiteStore() as store:
+            # Parsed in a separate process
+            stats = crawl(manifest.jobs(), store, manifest, parse_workers=1)
+            (courses,) = store.connection.execute(
+                "SELECT COUNT(*) FROM courses"
+            ).fetchone()
+
+        assert stats.done == len(CRAWLED_PAGES)
+        assert stats.missing == 1
+        assert courses == stats.courses > 0
+        assert manifest.counts() == {
+            PENDING: 0,
+            DONE: 5,
+            MISSING: 1,
+            FAILED: 0,
+            LEASED: 0,
+        }
+        assert manifest.jobs() == []
+        assert stats.stages["fetch"].processed == len(CRAWLED_PAGES) + 1
+        assert stats.stages["parse"].processed == len(CRAWLED_PAGES)
+        assert stats.stages["store"].processed == len(CRAWLED_PAGES) + 1
+
+    def test_slow_sink_throttles_fetching(self, server):
+        jobs = []
+        for i in range(20):
+            server.synthesize(f"dept{chr(ord('a') + i)}", "WIN", 2023, courses=1)
+            jobs.append(CrawlJob(f"dept{chr(ord('a') + i)}", "WIN", 2023))
+        sink = _SlowSink(server, delay=0.02)
+        pipeline = Pipeline(
+            sink, CrawlManifest(), fetch_workers=2, parse_workers=0, queue_size=1
+        )
+        stats = pipeline.run(jobs)
+
+        assert stats.done == len(jobs)
+        # One page in each queue and held by each worker, and one being stored
+        assert sink.ahead <= 2 + 1 + 1 + 1 + 1
+        assert all(stage.max_depth <= 1 for stage in stats.stages.values())
+        assert "store: 20 done" in pipeline.report()
+
+    def test_failing_jobs_stop_the_crawl(self, server):
+        manifest = CrawlManifest()
+        pipeline = Pipeline(SQLiteStore(), manifest, parse_workers=0)
+        with pytest.raises(sqlite3.OperationalError):
+            pipeline.run(_failing_jobs())
+
+    def test_failing_stage_stops_the_crawl(self, server):
+        pipeline = Pipeline(SQLiteStore(), _BrokenManifest(), parse_workers=0)
+        with pytest.raises(sqlite3.OperationalError):
+            pipeline.run(CRAWLED_PAGES)
+
+    def test_interrupted_crawl_resumes(self, server):
+        manifest = CrawlManifest()
+        manifest.add_jobs(CRAWLED_PAGES)
+        with pytest.raises(KeyboardInterrupt):
+            crawl(
+                manifest.jobs(),
+                _InterruptingSink(pages=2),
+                manifest,
+                workers=1,
+                parse_workers=0,
+            )
+        assert len(manifest.jobs(DONE)) == 2
+
+        requests = server.requests
+        stats = crawl(manifest.jobs(), SQLiteStore(), manifest, parse_workers=0)
+        assert stats.done == 3
+        assert server.requests - requests == 3
+
+    def test_failed_pages_are_retried(self, server):
+        jobs = list(enumerate_jobs(2021, 2023))
+        manifest = CrawlManifest()
+        manifest.add_jobs(jobs)
+        server.script_faults(*["error"] * 4)  # Every attempt at the first page fails
+        stats = crawl(manifest.jobs(), SQLiteStore(), manifest, 1, parse_workers=0)
+
+        assert stats.failed == 1
+        assert manifest.jobs() == [jobs[0]]
+        assert (
+            crawl(manifest.jobs(), SQLiteStore(), manifest, parse_workers=0).done == 1
+        )
+        assert manifest.jobs() == []
+
+    def test_unchanged_pages_are_not_rewritten(self, server):
+        manifest = CrawlManifest()
+        manifest.add_jobs(CRAWLED_PAGES[:1])
+        crawl(manifest.jobs(), SQLiteStore(), manifest, parse_workers=0)
+        stats = crawl(manifest.jobs(DONE), SQLiteStore(), manifest, parse_workers=0)
+        assert (stats.done, stats.unchanged) == (0, 1)
+
+    def test_command_resumes_into_jsonl(self, server, tmp_path):
+        output = tmp_path / "schedules.jsonl"
+        result = crawl_command.command(str(output), 2021, ["math"], parse_workers=0)
+        assert "Crawled 4 pages" in result
+        lines = output.read_text().splitlines()
+        assert {json.loads(line)["quarter"] for line in lines} == {
+            "WIN",
+            "SPR",
+            "SUM",
+            "AUT",
+        }
+
+        requests = server.requests
+        result = crawl_command.command(str(output), 2021, ["math"], parse_workers=0)
+        assert "Crawled 0 pages" in result
+        assert "New pages: 0" in result
+        assert output.read_text().splitlines() == lines
+        assert server.requests - requests == 0
+
+    def test_jsonl_pages_stored_again_are_not_duplicated(self, server, tmp_path):
+        output = tmp_path / "schedules.jsonl"
+        crawl_command.command(str(output), 2021, ["math"], parse_workers=0)
+        lines = output.read_text().splitlines()
+        last = json.loads(lines[-1])
+        # As if the crawl had stopped after flushing its last page but before marking it
+        connection = sqlite3.connect(f"{output}{crawl_command.MANIFEST_SUFFIX}")
+        connection.execute(
+            "UPDATE pages SET status = ? WHERE quarter = ? AND year = ?",
+            (PENDING, last["quarter"], last["year"]),
+        )
+        connection.commit()
+        connection.close()
+
+        result = crawl_command.command(str(output), 2021, ["math"], parse_workers=0)
+        assert "Crawled 1 pages" in result
+        assert output.read_text().splitlines() == lines
+
+    def test_jsonl_resume_keeps_only_the_last_quarter(self, server, tmp_path):
+        output = tmp_path / "schedules.jsonl"
+        crawl_command.command(str(output), 2021, ["math"], parse_workers=0)
+        lines = output.read_text().splitlines()
+        quarters = [
+            (course["quarter"], course["year"]) for course in map(json.loads, lines)
+        ]
+        earlier = max(
+            i for i, quarter in enumerate(quarters) if quarter != quarters[-1]
+        )
+        trailing = len(quarters) - earlier - 1
+
+        assert 0 < len(_last_quarter_digests(output)) <= trailing < len(lines)
+
+    def test_command_rejects_unknown_outputs(self, server, tmp_path):
+        with pytest.raises(ValueError):
+            crawl_command.command(str(tmp_path / "schedules.csv"))
+        with pytest.raises(ValueError):
+            crawl_command.command(str(tmp_path / "schedules.db"), 2021, ["mth"])
+
+
+class TestWorkers:
+    """Test sharing a manifest between workers through leases."""
+
+    def test_leases_are_exclusive(self, tmp_path):
+        path = tmp_path / "crawl.sqlite3"
+        first, second = CrawlManifest(path), CrawlManifest(path)
+        first.add_jobs(CRAWLED_PAGES)
+
+        leased = first.lease("a", 2)
+        assert leased == CRAWLED_PAGES[:2]
+        assert second.lease("b", 10) == CRAWLED_PAGES[2:]
+        assert second.lease("b", 10) == []
+        assert first.counts()[LEASED] == len(CRAWLED_PAGES)
+
+    def test_expired_leases_are_reclaimed(self, tmp_path):
+        manifest = CrawlManifest(tmp_path / "crawl.sqlite3")
+        manifest.add_jobs(CRAWLED_PAGES[:2])
+        job = CRAWLED_PAGES[0]
+        manifest.lease("a", 1, duration=-1)  # Expired as soon as it's taken
+
+        assert manifest.lease("b", 1) == [job]
+        assert manifest.heartbeat("a") == 0
+        # A report from the worker that lost the lease doesn't undo the new holder's
+        assert not manifest.mark_failed(job, "timed out", worker="a")
+        assert manifest.jobs(LEASED) == [job]
+
+    def test_heartbeats_renew_leases(self, tmp_path):
+        manifest = CrawlManifest(tmp_path / "crawl.sqlite3")
+        manifest.add_jobs(CRAWLED_PAGES[:1])
+        manifest.lease("a", duration=-1)
+        assert manifest.heartbeat("a", duration=60) == 1
+        assert manifest.lease("b") == []
+
+    def test_completion_is_idempotent(self, tmp_path):
+        manifest = CrawlManifest(tmp_path / "crawl.sqlite3")
+        job = CRAWLED_PAGES[0]
+        manifest.add_jobs([job])
+        manifest.lease("a", duration=-1)
+        manifest.lease("b")
+
+        assert manifest.mark_done(job, "hash", 10, worker="a")
+        assert not manifest.mark_done(job, "hash", 10, worker="b")
+        assert not manifest.mark_failed(job, "timed out", worker="b")
+        assert manifest.jobs(DONE) == [job]
+        assert manifest.lease("c") == []
+
+    def test_release(self, tmp_path):
+        manifest = CrawlManifest(tmp_path / "crawl.sqlite3")
+        manifest.add_jobs(CRAWLED_PAGES)
+        manifest.lease("a", 2)
+        assert manifest.release("a") == 2
+        assert manifest.lease("b", 2) == CRAWLED_PAGES[:2]
+
+    def test_pages_taken_over_are_not_stored(self, server):
+        manifest = CrawlManifest()
+        job = CRAWLED_PAGES[0]
+        manifest.add_jobs([job])
+        manifest.lease("a", duration=-1)
+
+        store = SQLiteStore()
+        pipeline = Pipeline(store, manifest, parse_workers=0, worker="a")
+        stats = pipeline.run([job])
+        assert (stats.done, stats.taken_over) == (0, 1)
+        assert store.connection.execute("SELECT COUNT(*) FROM courses").fetchone() == (0,)
+
+        manifest.lease("b")
+        assert not manifest.claim(job, "a")
+        assert manifest.claim(job, "b")
+
+    def test_no_wal_on_shared_volumes(self, tmp_path):
+        path = tmp_path / "crawl.sqlite3"
+        connection = sqlite3.connect(path)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.close()
+
+        CrawlManifest(path).close()
+        connection = sqlite3.connect(path)
+        assert connection.execute("PRAGMA journal_mode").fetchone() == ("delete",)
+        connection.close()
+
+    def test_stop_ends_the_wait_for_leases(self):
+        manifest = CrawlManifest()
+        manifest.add_jobs(CRAWLED_PAGES[:1])
+        manifest.lease("other")
+        stop = threading.Event()
+        threading.Timer(0.05, stop.set).start()
+
+        start = time.monotonic()
+        assert list(leased_jobs(manifest, "a", poll_interval=60, stop=stop)) == []
+        assert time.monotonic() - start < 5
+
+    def test_workers_split_the_crawl(self, server, tmp_path):
+        path = tmp_path / "crawl.sqlite3"
+        manifest = CrawlManifest(path)
+        manifest.add_jobs(CRAWLED_PAGES)
+        # A worker that died holding a page
+        manifest.lease("dead", 1, duration=0.2)
+
+        results = {}
+
+        def work(worker: str) -> None:
+            with SQLiteStore() as store:
+                results[worker] = run_worker(
+                    store,
+                    CrawlManifest(path),
+                    worker,
+                    fetch_workers=1,
+                    parse_workers=0,
+                    batch=1,
+                    poll_interval=0.05,
+                )
+
+        threads = [threading.Thread(target=work, args=(w,)) for w in ("a", "b")]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sum(stats.done for stats in results.values()) == len(CRAWLED_PAGES)
+        assert manifest.jobs(DONE) == CRAWLED_PAGES
+        assert server.requests >= len(CRAWLED_PAGES)
+
+    def test_failing_sink_releases_the_leases(self, server):
+        manifest = CrawlManifest()
+        manifest.add_jobs(CRAWLED_PAGES)
+        store = SQLiteStore()
+        errors = []
+
+        def disk_full(courses):
+            raise OSError("No space left on device")
+
+        store.write_courses = disk_full
+
+        def work():
+            try:
+                run_worker(store, manifest, "a", parse_workers=0, batch=2)
+            except OSError as error:
+                errors.append(error)
+
+        thread = threading.Thread(target=work, daemon=True)
+        thread.start()
+        thread.join(timeout=10)
+        assert not thread.is_alive()
+        assert len(errors) == 1
+        assert manifest.leased() == 0
+        store.close()
+
+    def test_command_as_worker(self, server, tmp_path):
+        output = tmp_path / "node.jsonl"
+        manifest_path = str(tmp_path / "shared.sqlite3")
+        result = crawl_command.command(
+            str(output),
+            2021,
+            ["math"],
+            manifest_path=manifest_path,
+            parse_workers=0,
+            worker="node1",
+        )
+        assert "Crawled 4 pages" in result
+        assert CrawlManifest(manifest_path).counts()[DONE] == 4
@@ -0,0 +1,88 @@
+"""
+Tests for the cached department directory.
+"""
+
+import threading
+
+from swecc_course_scraper.departments import DepartmentDirectory, parse_departments
+
+QUARTER_INDEX = """
+<ul>
+<li><a href="cse.html">Computer Science &amp; Engineering (CSE)</a></li>
+<li><A HREF=math.html>Mathematics (MATH)</A></li>
+<li><a href="/students/timeschd/">Time Schedule home</a></li>
+<li><a href="https://www.washington.edu/students/crscat/cse.html">Catalog</a></li>
+</ul>
+"""
+
+ROOT = "http://127.0.0.1:8000/"
+
+
+class TestDepartmentDirectory:
+    """Test parsing quarter index pages and persisting the directory."""
+
+    def test_parse_departments(self):
+        assert parse_departments(QUARTER_INDEX) == {
+            "cse": "cse.html",
+            "math": "math.html",
+        }
+
+    def test_lookup(self, tmp_path):
+        directory = DepartmentDirectory(tmp_path / "departments.json", ROOT)
+        assert directory.add_quarter("aut", 2023, QUARTER_INDEX) == 2
+        directory.add_quarter("WIN", 2010, '<a href="chem.html">')
+
+        assert "CSE" in directory
+        assert "chem" in directory
+        assert "csee" not in directory
+        assert directory.departments("AUT", 2023) == {
+            "cse": "cse.html",
+            "math": "math.html",
+        }
+        assert directory.departments("SPR", 2023) == {}
+        assert directory.suggestions("mth") == ["math"]
+
+    def test_save_and_load(self, tmp_path):
+        path = tmp_path / "departments.json"
+        directory = DepartmentDirectory(path, ROOT)
+        directory.add_quarter("AUT", 2023, QUARTER_INDEX, fetched_at=100.0)
+        directory.save()
+
+        loaded = DepartmentDirectory.load(path, ROOT)
+        assert loaded.quarters == directory.quarters
+        assert loaded.fetched == {"AUT 2023": 100.0}
+        assert "math" in loaded
+
+        # Lists from another time schedule aren't reused
+        assert len(DepartmentDirectory.load(path, "http://example.com/")) == 0
+
+    def test_load_ignores_bad_file(self, tmp_path):
+        path = tmp_path / "departments.json"
+        path.write_text(f'{{"version": 1, "root": "{ROOT}", "quarters": []}}')
+        assert len(DepartmentDirectory.load(path, ROOT)) == 0
+
+    def test_concurrent_saves(self, tmp_path):
+        path = tmp_path / "departments.json"
+        directory = DepartmentDirectory(path, ROOT)
+        errors = []
+
+        def add_year(year):
+            try:
+                for quarter in ("WIN", "SPR", "SUM", "AUT"):
+                    directory.add_quarter(quarter, year, QUARTER_INDEX)
+                    directory.save()
+            except Exception as error:
+                errors.append(error)
+
+        threads = [
+            threading.Thread(target=add_year, args=(year,))
+            for year in range(2010, 2020)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        assert list(tmp_path.iterdir()) == [path]
+        assert DepartmentDirectory.load(path, ROOT).quarters == directory.quarters
@@ -0,0 +1,217 @@
+"""
+Tests for the streaming CSV/JSON Lines writers.
+"""
+
+import csv
+import io
+import json
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from swecc_course_scraper.commands.parser import iter_schedule_html
+from swecc_course_scraper.export import CsvWriter, JsonLinesWriter, SQLiteStore, open_writer
+from swecc_course_scraper.models import MEETING_FIELDS
+
+TEST_FILE = Path(__file__).parent / "test_files" / "math_WIN_2023.html"
+
+
+def _courses():
+    return iter_schedule_html(TEST_FILE.read_text(encoding="utf-8"), "WIN", 2023)
+
+
+class TestCsvWriter:
+    """Test CSV output for meetings and courses."""
+
+    def test_meeting_rows(self):
+        expected = sum(len(course.meetings) for course in _courses())
+        stream = io.StringIO()
+        with CsvWriter(stream, batch_size=7) as writer:
+            writer.write_courses(_courses())
+
+        rows = list(csv.reader(io.StringIO(stream.getvalue())))
+        assert tuple(rows[0]) == MEETING_FIELDS
+        assert len(rows) - 1 == expected == writer.rows_written
+
+    def test_course_rows_with_fields(self):
+        stream = io.StringIO()
+        with CsvWriter(stream, kind="courses", fields=["course_code", "title"]) as writer:
+            count = writer.write_courses(_courses())
+
+        rows = list(csv.reader(io.StringIO(stream.getvalue())))
+        assert rows[0] == ["course_code", "title"]
+        assert len(rows) - 1 == count == 65
+
+    def test_writes_file(self, tmp_path):
+        path = tmp_path / "meetings.csv"
+        with open_writer("csv", path, fields=["sln"]) as writer:
+            writer.write_courses(_courses())
+        assert path.read_text(encoding="utf-8").startswith("sln\n")
+
+
+class TestJsonLinesWriter:
+    """Test JSON Lines output for meetings and courses."""
+
+    def test_meeting_lines(self):
+        stream = io.StringIO()
+        with JsonLinesWriter(stream, fields=["sln", "start_minutes", "day_mask"]) as writer:
+            writer.write_courses(_courses())
+
+        lines = stream.getvalue().splitlines()
+        assert len(lines) == writer.rows_written
+        assert set(json.loads(lines[0])) == {"sln", "start_minutes", "day_mask"}
+
+    def test_course_lines_nest_meetings(self):
+        stream = io.StringIO()
+        with JsonLinesWriter(stream, kind="courses") as writer:
+            writer.write_courses(_courses())
+
+        first = json.loads(stream.getvalue().splitlines()[0])
+        assert first["quarter"] == "WIN"
+        assert isinstance(first["meetings"], list)
+
+
+class TestJsonAndTableWriters:
+    """Test the JSON array and plain-text table writers used by the CLI."""
+
+    def test_json_array(self):
+        stream = io.StringIO()
+        with open_writer("json", stream, fields=["sln"], batch_size=5) as writer:
+            writer.write_courses(_courses())
+
+        rows = json.loads(stream.getvalue())
+        assert len(rows) == writer.rows_written
+        assert list(rows[0]) == ["sln"]
+
+    def test_empty_json_array(self):
+        stream = io.StringIO()
+        open_writer("json", stream).close()
+        assert json.loads(stream.getvalue()) == []
+
+    def test_table(self):
+        stream = io.StringIO()
+        with open_writer("table", stream, fields=["sln", "days", "time"]) as writer:
+            writer.write_courses(_courses())
+
+        lines = stream.getvalue().splitlines()
+        assert lines[0].split() == ["sln", "days", "time"]
+        assert set(lines[1]) == {"-", " "}
+        assert len(lines) - 2 == writer.rows_written
+
+
+class TestSQLiteStore:
+    """Test the normalized SQLite store."""
+
+    def _counts(self, store):
+        return tuple(
+            store.connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in ("courses", "sections", "meeting_times")
+        )
+
+    def test_write_and_reparse_is_idempotent(self, tmp_path):
+        meetings = sum(len(course.meetings) for course in _courses())
+        with SQLiteStore(tmp_path / "schedule.db", batch_size=10) as store:
+            store.write_courses(_courses())
+            store.flush()
+            first = self._counts(store)
+            store.write_courses(_courses())
+            store.flush()
+            assert self._counts(store) == first
+
+        courses, sections, meeting_times = first
+        assert courses == 65
+        assert 0 < sections <= meeting_times == meetings
+
+    def test_rewrite_in_same_batch(self, tmp_path):
+        with SQLiteStore(tmp_path / "schedule.db", batch_size=1000) as store:
+            store.write_courses(_courses())
+            store.flush()
+            first = self._counts(store)
+
+        with SQLiteStore(tmp_path / "again.db", batch_size=1000) as store:
+            store.write_courses(_courses())
+            store.write_courses(_courses())
+            store.flush()
+            assert self._counts(store) == first
+
+    def test_rewrite_drops_meeting_times(self):
+        store = SQLiteStore()
+        course, index = next(
+            (course, index)
+            for course in _courses()
+            for index in range(1, len(course.meetings))
+            if course.meetings[index].sln == course.meetings[index - 1].sln
+        )
+        sln = course.meetings[index].sln
+        store.write_course(course)
+        del course.meetings[index]
+        store.write_course(course)
+        store.flush()
+
+        rows = store.connection.execute(
+            "SELECT COUNT(*) FROM meeting_times WHERE sln = ?", (sln,)
+        ).fetchone()
+        assert rows[0] == 1
+        store.close()
+
+    def test_failed_flush_keeps_rows(self, tmp_path):
+        with SQLiteStore(tmp_path / "schedule.db", batch_size=1000) as store:
+            store.write_courses(_courses())
+            store.flush()
+            expected = self._counts(store)
+
+        store = SQLiteStore(batch_size=1000)
+        store.connection.execute(
+            "CREATE TEMP TRIGGER disk_full BEFORE INSERT ON meeting_times "
+            "BEGIN SELECT RAISE(ABORT, 'disk full'); END"
+        )
+        store.write_courses(_courses())
+        with pytest.raises(sqlite3.Error):
+            store.flush()
+        assert self._counts(store) == (0, 0, 0)
+
+        store.connection.execute("DROP TRIGGER disk_full")
+        store.flush()
+        assert self._counts(store) == expected
+        assert store.courses_written == expected[0]
+        store.close()
+
+    def test_upsert_updates_enrollment(self):
+        store = SQLiteStore()
+        course = next(course for course in _courses() if course.meetings)
+        store.write_course(course)
+        store.flush()
+
+        course.meetings[0].enrolled += 1
+        store.write_course(course)
+        store.flush()
+
+        rows = store.sections_for_course(course.course_code, "WIN", 2023)
+        assert rows[0]["enrolled"] == course.meetings[0].enrolled
+        store.close()
+
+    def test_queries_use_indexes(self):
+        store = SQLiteStore()
+        queries = [
+            "SELECT * FROM sections WHERE course_code = 'MATH 124'",
+            "SELECT * FROM sections WHERE instructor = 'Staff'",
+            "SELECT * FROM meeting_times WHERE building = 'KNE' AND room = '130'",
+            "SELECT * FROM courses WHERE quarter = 'WIN' AND year = 2023",
+        ]
+        for query in queries:
+            plan = " ".join(
+                row[-1]
+                for row in store.connection.execute(f"EXPLAIN QUERY PLAN {query}")
+            )
+            assert "USING" in plan, plan
+        store.close()
+
+
+def test_rejects_unknown_options():
+    with pytest.raises(ValueError):
+        open_writer("xml", io.StringIO())
+    with pytest.raises(ValueError):
+        open_writer("csv", io.StringIO(), fields=["not_a_field"])
+    with pytest.raises(ValueError):
+        open_writer("csv", io.StringIO(), kind="sections")
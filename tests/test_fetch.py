@@ -0,0 +1,417 @@
+"""
+Tests for the fetch layer against the local time schedule stand-in.
+"""
+
+import multiprocessing
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from swecc_course_scraper.fetch import (
+    COLD,
+    HOT,
+    CircuitBreaker,
+    CircuitOpenError,
+    Fetcher,
+    FetchPolicy,
+    FetchScheduler,
+    PageVersion,
+    RateLimiter,
+    SingleFlight,
+)
+from tests.conftest import FakeClock
+from tests.servers.schedule import ScheduleServer
+
+
+def _page_url(server):
+    return f"{server.schedule_url}WIN2023/math.html"
+
+
+class TestFetchPolicy:
+    """Test the jittered backoff."""
+
+    def test_backoff_is_bounded(self):
+        policy = FetchPolicy(backoff_base=1, backoff_max=4)
+        rng = random.Random(0)
+        for attempt, ceiling in [(1, 1), (2, 2), (3, 4), (10, 4)]:
+            delays = [policy.backoff(attempt, rng=rng) for _ in range(50)]
+            assert all(0 <= delay <= ceiling for delay in delays)
+
+    def test_backoff_honours_retry_after(self):
+        policy = FetchPolicy(backoff_base=1, max_retry_after=5)
+        assert policy.backoff(1, retry_after=3) >= 3
+        assert policy.backoff(1, retry_after=100) <= 5
+
+
+class TestCircuitBreaker:
+    """Test the closed/open/half-open transitions."""
+
+    def test_opens_and_recovers(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(threshold=2, cooldown=10, clock=clock)
+        breaker.record_failure()
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        assert not breaker.allow()
+
+        clock.now = 10
+        assert breaker.allow()  # The probe
+        assert not breaker.allow()  # Only one at a time
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+
+        clock.now = 20
+        assert breaker.allow()
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+
+def _acquire_many(path, count):
+    limiter = RateLimiter(20, path=path)
+    for _ in range(count):
+        limiter.acquire("host")
+    limiter.close()
+
+
+class TestRateLimiter:
+    """Test the token bucket, in-flight slots and sharing between processes."""
+
+    def setup_method(self):
+        self.clock = FakeClock()
+
+    def _sleep(self, seconds):
+        self.clock.now += seconds
+
+    def _limiter(self, path=":memory:", **kwargs):
+        return RateLimiter(path=path, clock=self.clock, sleep=self._sleep, **kwargs)
+
+    def test_token_bucket(self):
+        limiter = self._limiter(rate=10, burst=3)
+        for _ in range(3):
+            limiter.acquire()
+        assert self.clock.now == 0  # The burst is free
+        for _ in range(10):
+            limiter.acquire()
+        assert self.clock.now == pytest.approx(1.0)
+
+    def test_budget_is_shared_through_the_file(self, tmp_path):
+        path = tmp_path / "limits.sqlite3"
+        first, second = self._limiter(path, rate=10), self._limiter(path, rate=10)
+        for _ in range(5):
+            first.acquire("host")
+            second.acquire("host")
+        second.acquire("other-host")
+
+        assert self.clock.now == pytest.approx(0.9)
+
+    def test_max_in_flight(self):
+        limiter = self._limiter(rate=1000, burst=10, max_in_flight=2, lease=5)
+        first = limiter.acquire()
+        limiter.acquire()
+        limiter.release(first)
+        limiter.acquire()
+        assert self.clock.now == 0
+
+        limiter.acquire()  # Waits until the abandoned slots' leases expire
+        assert self.clock.now == pytest.approx(5, abs=0.1)
+
+    def test_separate_processes(self, tmp_path):
+        path = tmp_path / "limits.sqlite3"
+        RateLimiter(20, path=path).close()
+        workers = [
+            multiprocessing.Process(target=_acquire_many, args=(path, 10))
+            for _ in range(2)
+        ]
+        start = time.monotonic()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        # 20 tokens at 20/s, the first of them free
+        assert time.monotonic() - start >= 0.9
+
+
+class TestSingleFlight:
+    """Test that concurrent identical calls share one result."""
+
+    def test_concurrent_calls_share_result(self):
+        group = SingleFlight()
+        calls = []
+        release = threading.Event()
+
+        def call():
+            calls.append(1)
+            release.wait(5)
+            return "page"
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [executor.submit(group.do, "url", call) for _ in range(4)]
+            while len(group) == 0:
+                time.sleep(0.01)
+            time.sleep(0.05)
+            release.set()
+            results = [future.result() for future in futures]
+
+        assert calls == [1]
+        assert sorted(shared for _, shared in results) == [False, True, True, True]
+        assert {value for value, _ in results} == {"page"}
+        assert len(group) == 0
+
+    def test_exceptions_are_shared_and_not_kept(self):
+        group = SingleFlight()
+
+        def fail():
+            raise FileNotFoundError("missing")
+
+        with pytest.raises(FileNotFoundError):
+            group.do("url", fail)
+        assert group.do("url", lambda: "page") == ("page", False)
+
+
+class TestFetchScheduler:
+    """Test sharing a request budget between hot and cold requests."""
+
+    def test_slots_are_spaced_by_the_budget(self):
+        scheduler = FetchScheduler(50, jitter=0)
+        start = time.monotonic()
+        for _ in range(6):
+            assert scheduler.acquire()
+        assert time.monotonic() - start >= 5 / 50
+        assert scheduler.stats.granted == {COLD: 6}
+
+    def test_hot_requests_go_first(self):
+        scheduler = FetchScheduler(10, jitter=0)
+        scheduler.acquire()  # The next slot is 0.1s away
+        order = []
+
+        def request(name, priority):
+            scheduler.acquire(priority)
+            order.append(name)
+
+        threads = [
+            threading.Thread(target=request, args=(f"cold{i}", COLD)) for i in range(3)
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.02)  # The cold requests are waiting
+        threads.append(threading.Thread(target=request, args=("hot", HOT)))
+        threads[-1].start()
+        for thread in threads:
+            thread.join()
+
+        assert order == ["hot", "cold0", "cold1", "cold2"]
+
+    def test_backfill_does_not_starve_refreshes(self):
+        scheduler = FetchScheduler(100)
+        stop = threading.Event()
+        backfill = scheduler.gate(lambda: "page", COLD, stop)
+
+        def saturate():
+            while not stop.is_set():
+                try:
+                    backfill()
+                except ConnectionError:
+                    return
+
+        backfillers = [threading.Thread(target=saturate) for _ in range(4)]
+        for thread in backfillers:
+            thread.start()
+        refreshes = []
+
+        def refresh(key):
+            refreshes.append(key)
+            if len(refreshes) == 10:
+                stop.set()
+
+        scheduler.add("cse", HOT, interval=0.05)
+        scheduler.run(refresh, stop)
+        for thread in backfillers:
+            thread.join()
+
+        assert refreshes == ["cse"] * 10
+        assert scheduler.stats.granted[COLD] > 0
+        # Never held back by the backfill for more than about one slot
+        assert scheduler.stats.max_wait[HOT] < 0.1
+
+    def test_run_jobs(self):
+        scheduler = FetchScheduler(1000)
+        runs = []
+        scheduler.add("history", COLD)
+        scheduler.add("cse", HOT, interval=0)
+        stop = threading.Event()
+
+        def handle(key):
+            runs.append(key)
+            if runs.count("cse") == 3:
+                stop.set()
+
+        scheduler.run(handle, stop)
+        assert runs.count("history") == 1
+        assert len(scheduler) == 1  # The recurring job
+
+    def test_stopped_waits_give_up(self):
+        scheduler = FetchScheduler(0.1)
+        scheduler.acquire()
+        stop = threading.Event()
+        stop.set()
+        assert not scheduler.acquire(HOT, stop)
+        with pytest.raises(ConnectionError):
+            scheduler.gate(lambda: "page", stop=stop)()
+        with pytest.raises(ValueError):
+            FetchScheduler(0)
+
+
+class TestFetcher:
+    """Test retries, fail-fast breakers and hedging."""
+
+    def test_retries_transient_failures(self, server):
+        delays = []
+        fetcher = Fetcher(FetchPolicy(backoff_base=0.01), sleep=delays.append)
+        server.script_faults("error", "reset", "error")
+
+        assert "MATHEMATICS" in fetcher.fetch_text(_page_url(server))
+        assert server.requests == 4
+        assert (fetcher.stats.retries, len(delays)) == (3, 3)
+
+    def test_gives_up_after_max_attempts(self, server):
+        fetcher = Fetcher(FetchPolicy(max_attempts=2), sleep=lambda _: None)
+        server.error_rate = 1.0
+
+        with pytest.raises(ConnectionError, match="after 2 attempts"):
+            fetcher.fetch_text(_page_url(server))
+        assert server.requests == 2
+
+    def test_missing_page_is_not_retried(self, server):
+        fetcher = Fetcher(sleep=lambda _: None)
+        with pytest.raises(FileNotFoundError):
+            fetcher.fetch_text(f"{server.schedule_url}WIN2022/math.html")
+        assert server.requests == 1
+
+    def test_breaker_fails_fast(self, server):
+        clock = FakeClock()
+        policy = FetchPolicy(max_attempts=3, breaker_threshold=3, breaker_cooldown=30)
+        fetcher = Fetcher(policy, sleep=lambda _: None, clock=clock)
+        server.error_rate = 1.0
+
+        with pytest.raises(ConnectionError):
+            fetcher.fetch_text(_page_url(server))
+        with pytest.raises(CircuitOpenError):
+            fetcher.fetch_text(_page_url(server))
+        assert server.requests == 3
+        assert fetcher.stats.rejected == 1
+
+        server.error_rate = 0.0
+        clock.now = 30
+        assert "MATHEMATICS" in fetcher.fetch_text(_page_url(server))
+        assert fetcher.breaker(_page_url(server)).state == CircuitBreaker.CLOSED
+
+    def test_errors_name_the_status(self, server):
+        fetcher = Fetcher(FetchPolicy(max_attempts=2), sleep=lambda _: None)
+        server.script_faults("throttle", "throttle")
+        with pytest.raises(ConnectionError, match="429 Client Error: Too Many Requests"):
+            fetcher.fetch_text(_page_url(server))
+
+    def test_interrupted_probe_is_released(self, server, monkeypatch):
+        clock = FakeClock()
+        policy = FetchPolicy(max_attempts=1, breaker_threshold=1, breaker_cooldown=30)
+        fetcher = Fetcher(policy, clock=clock)
+        server.script_faults("error")
+        with pytest.raises(ConnectionError):
+            fetcher.fetch_text(_page_url(server))
+        clock.now = 30
+
+        def interrupted(*args):
+            raise KeyboardInterrupt
+
+        with monkeypatch.context() as patch:
+            patch.setattr(fetcher, "_send", interrupted)
+            with pytest.raises(KeyboardInterrupt):
+                fetcher.fetch_text(_page_url(server))
+        assert "MATHEMATICS" in fetcher.fetch_text(_page_url(server))
+
+    def test_coalesces_concurrent_fetches(self, server):
+        server.latency = 0.2
+        fetcher = Fetcher()
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            pages = list(executor.map(fetcher.fetch_text, [_page_url(server)] * 8))
+
+        assert len(set(pages)) == 1
+        assert server.requests == 1
+        assert fetcher.stats.coalesced == 7
+
+    def test_rate_limited(self, server):
+        clock = FakeClock()
+        limiter = RateLimiter(
+            2,
+            clock=clock,
+            sleep=lambda seconds: setattr(clock, "now", clock.now + seconds),
+        )
+        fetcher = Fetcher(limiter=limiter)
+        for _ in range(5):
+            fetcher.fetch_text(_page_url(server))
+
+        assert server.requests == 5
+        assert clock.now == pytest.approx(2.0)
+
+    def test_hedges_slow_requests(self, server):
+        policy = FetchPolicy(hedge=True, hedge_min_samples=5)
+        fetcher = Fetcher(policy)
+        for _ in range(5):
+            fetcher.fetch_text(_page_url(server))
+
+        server.stall = 2.0
+        server.script_faults("stall")
+        start = time.monotonic()
+        assert "MATHEMATICS" in fetcher.fetch_text(_page_url(server))
+
+        assert time.monotonic() - start < 1.0
+        assert (fetcher.stats.hedges, fetcher.stats.hedge_wins) == (1, 1)
+        fetcher.close()
+
+    def test_conditional_fetch(self, server):
+        fetcher = Fetcher()
+        html, version = fetcher.fetch_if_changed(_page_url(server))
+        assert "MATHEMATICS" in html
+        assert version.etag and version.last_modified and version.content_hash
+
+        assert fetcher.fetch_if_changed(_page_url(server), version) == (None, version)
+        assert server.not_modified_sent == 1
+        assert fetcher.stats.not_modified == 1
+
+        server.add_page("math", "WIN", 2023, html.replace("MATHEMATICS", "MATH"))
+        html, changed = fetcher.fetch_if_changed(_page_url(server), version)
+        assert html is not None and changed.etag != version.etag
+
+    def test_coalesces_concurrent_conditional_fetches(self, server):
+        fetcher = Fetcher()
+        _, version = fetcher.fetch_if_changed(_page_url(server))
+        server.latency = 0.2
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(
+                executor.map(
+                    fetcher.fetch_if_changed, [_page_url(server)] * 4, [version] * 4
+                )
+            )
+            fresh = executor.map(fetcher.fetch_if_changed, [_page_url(server)] * 4)
+            pages = {html for html, _ in fresh}
+
+        assert results == [(None, version)] * 4
+        assert len(pages) == 1
+        assert server.requests == 3  # The first fetch, one 304 and one full page
+        assert fetcher.stats.coalesced == 6
+
+    def test_conditional_fetch_without_validators(self):
+        with ScheduleServer(validators=False) as server:
+            fetcher = Fetcher()
+            _, version = fetcher.fetch_if_changed(_page_url(server))
+            assert version.etag is None and version.headers() == {}
+
+            html, unchanged = fetcher.fetch_if_changed(_page_url(server), version)
+            assert html is None and unchanged.content_hash == version.content_hash
+            assert server.requests == 2
+            assert isinstance(unchanged, PageVersion)
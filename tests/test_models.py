@@ -0,0 +1,63 @@
+"""
+Tests for the Course/CourseMeeting row serialization helpers.
+"""
+
+import dataclasses
+
+from swecc_course_scraper.models import COURSE_FIELDS, MEETING_FIELDS, Course, CourseMeeting
+
+
+def _sample_course() -> Course:
+    meeting = CourseMeeting(
+        sln="12924",
+        course_code="CSE 122",
+        meeting_id="A",
+        days="WF",
+        time="1130-1220",
+        start_minutes=690,
+        end_minutes=740,
+        day_mask=20,
+        enrolled=357,
+        capacity=376,
+        quarter="WIN",
+        year=2023,
+    )
+    return Course(
+        course_code="CSE 122",
+        title="COMP PROGRAMMING II",
+        prerequisites="",
+        credits="5",
+        credit_types="",
+        meetings=[meeting],
+        quarter="WIN",
+        year=2023,
+    )
+
+
+class TestRowSerialization:
+    """Test to_tuple/to_row/to_dict against dataclasses.asdict."""
+
+    def test_field_schema_matches_dataclasses(self):
+        assert MEETING_FIELDS == tuple(f.name for f in dataclasses.fields(CourseMeeting))
+        assert "meetings" not in COURSE_FIELDS
+
+    def test_meeting_matches_asdict(self):
+        meeting = _sample_course().meetings[0]
+        assert meeting.to_dict() == dataclasses.asdict(meeting)
+        assert meeting.to_tuple() == dataclasses.astuple(meeting)
+
+    def test_meeting_projection(self):
+        meeting = _sample_course().meetings[0]
+        assert meeting.to_row(["sln"]) == ("12924",)
+        assert meeting.to_row(("sln", "start_minutes")) == ("12924", 690)
+        assert meeting.to_dict(["days", "day_mask"]) == {"days": "WF", "day_mask": 20}
+        assert meeting.to_row([]) == ()
+        assert meeting.to_dict(["sln"]) == {"sln": "12924"}
+
+    def test_course_matches_asdict(self):
+        course = _sample_course()
+        assert course.to_dict() == dataclasses.asdict(course)
+        assert course.to_tuple() == (
+            "CSE 122", "COMP PROGRAMMING II", "", "5", "", "WIN", 2023
+        )
+        assert "meetings" not in course.to_dict(include_meetings=False)
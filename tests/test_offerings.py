@@ -0,0 +1,166 @@
+"""
+Tests for the persisted course offering index.
+"""
+
+import json
+import threading
+
+import pytest
+
+from swecc_course_scraper.commands.schedule import VALID_QUARTERS
+from swecc_course_scraper.offerings import (
+    OfferingIndex,
+    ordinal_quarter,
+    quarter_ordinal,
+)
+
+PAGE = """
+<A NAME=cse142>CSE&nbsp;&nbsp; 142 </A>
+<A NAME=cse143>CSE&nbsp;&nbsp; 143 </A>
+<A NAME=cse1430>CSE&nbsp;&nbsp; 1430 </A>
+<A NAME=cse599h>CSE&nbsp;&nbsp; 599 H </A>
+<A HREF=/students/crscat/cse.html#cse311>Not an anchor</A>
+"""
+
+
+class TestOfferingIndex:
+    """Test indexing pages, window queries and persistence."""
+
+    def setup_method(self):
+        self.index = OfferingIndex()
+
+    def test_ordinals(self):
+        assert quarter_ordinal("WIN", 2003) == 0
+        assert quarter_ordinal("AUT", 2004) == 7
+        assert ordinal_quarter(7) == ("AUT", 2004)
+
+    def test_add_page(self):
+        assert self.index.add_page("CSE", "WIN", 2023, PAGE) == 4
+        assert self.index.has_page("cse", "WIN", 2023)
+        assert not self.index.has_page("cse", "SPR", 2023)
+        assert not self.index.has_page("math", "WIN", 2023)
+        assert set(self.index.courses) == {"cse142", "cse143", "cse1430", "cse599h"}
+
+    def test_window_queries(self):
+        for year in range(2015, 2024):
+            self.index.add_page("cse", "WIN", year, PAGE)
+            self.index.add_page("cse", "AUT", year, PAGE)
+        self.index.add_page("cse", "SPR", 2023, PAGE)
+        self.index.add_page("cse", "SUM", 2023, "")
+
+        assert self.index.offerings("cse143", 2022, 2023) == [
+            ("WIN", 2022),
+            ("AUT", 2022),
+            ("WIN", 2023),
+            ("SPR", 2023),
+            ("AUT", 2023),
+        ]
+        assert self.index.quarter_counts("CSE143", 2019, 2023) == {
+            "WIN": 5,
+            "SPR": 1,
+            "AUT": 5,
+        }
+        assert self.index.quarter_counts("cse999", 2003, 2023) == {}
+        assert self.index.offerings("cse143", 2000, 2014) == []
+
+    def test_readding_a_page_replaces_it(self):
+        self.index.add_page("cse", "WIN", 2023, PAGE)
+        self.index.add_page("cse", "SPR", 2023, PAGE)
+        self.index.add_page("cse", "WIN", 2023, "<A NAME=cse142>")
+
+        assert self.index.offerings("cse142", 2023, 2023) == [
+            ("WIN", 2023),
+            ("SPR", 2023),
+        ]
+        assert self.index.offerings("cse143", 2023, 2023) == [("SPR", 2023)]
+        assert self.index.offerings("cse599h", 2023, 2023) == [("SPR", 2023)]
+
+    def test_failures(self):
+        self.index.add_failure("cse", "WIN", 2023)
+        self.index.add_failure("cse", "AUT", 2023)
+        assert not self.index.has_page("cse", "WIN", 2023)
+        assert self.index.failed_quarters("cse", 2023, 2023) == [
+            ("AUT", 2023),
+            ("WIN", 2023),
+        ]
+
+        self.index.add_page("cse", "WIN", 2023, PAGE, fetched_at=100.0)
+        assert self.index.failed_quarters("CSE", 2023, 2023) == [("AUT", 2023)]
+        assert self.index.fetched_at("cse", "WIN", 2023) == 100.0
+        assert self.index.fetched_at("cse", "AUT", 2023) is None
+
+    def test_save_and_load(self, tmp_path):
+        path = tmp_path / "offerings.json"
+        index = OfferingIndex(path)
+        index.add_page("cse", "WIN", 2023, PAGE)
+        index.add_failure("cse", "SPR", 2023)
+        index.save()
+
+        loaded = OfferingIndex.load(path)
+        assert loaded.courses == index.courses
+        assert loaded.departments == index.departments
+        assert loaded.failed == index.failed
+        assert loaded.fetched == index.fetched
+        assert not loaded.changed
+
+    def test_load_without_fetch_times(self, tmp_path):
+        path = tmp_path / "offerings.json"
+        path.write_text(
+            '{"version": 1, "courses": {"cse142": "0x1"}, "departments": {"cse": "0x1"}}'
+        )
+        loaded = OfferingIndex.load(path)
+        assert loaded.has_page("cse", "WIN", 2003)
+        assert loaded.fetched_at("cse", "WIN", 2003) is None
+
+    def test_load_ignores_bad_file(self, tmp_path):
+        path = tmp_path / "offerings.json"
+        path.write_text("{not json")
+        assert OfferingIndex.load(path).courses == {}
+
+    def test_failed_save_keeps_the_saved_index(self, tmp_path, monkeypatch):
+        path = tmp_path / "offerings.json"
+        index = OfferingIndex(path)
+        index.add_page("cse", "WIN", 2023, PAGE)
+        index.save()
+        saved = path.read_text()
+
+        def broken_dump(*args, **kwargs):
+            raise OSError("No space left on device")
+
+        index.add_page("cse", "SPR", 2023, PAGE)
+        with monkeypatch.context() as patch:
+            patch.setattr(json, "dump", broken_dump)
+            with pytest.raises(OSError):
+                index.save()
+        assert path.read_text() == saved
+        assert list(tmp_path.iterdir()) == [path]
+        assert index.changed
+
+        index.save()
+        assert OfferingIndex.load(path).has_page("cse", "SPR", 2023)
+
+    def test_concurrent_saves(self, tmp_path):
+        path = tmp_path / "offerings.json"
+        index = OfferingIndex(path)
+        errors = []
+
+        def index_year(year):
+            try:
+                for quarter in VALID_QUARTERS:
+                    index.add_page("cse", quarter, year, PAGE)
+                    index.save()
+            except Exception as error:
+                errors.append(error)
+
+        threads = [
+            threading.Thread(target=index_year, args=(year,))
+            for year in range(2010, 2020)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        assert list(tmp_path.iterdir()) == [path]
+        assert OfferingIndex.load(path).departments == index.departments
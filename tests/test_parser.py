@@ -29,6 +29,7 @@ try:
         _parse_course_meetings,
         _clean_instructor_name,
         _parse_time_slot,
+        _parse_days,
         _parse_enrollment_numbers
     )
     PARSER_AVAILABLE = True
@@ -263,18 +264,40 @@ class TestUtilityFunctions:
         try:
             # Test cases
             test_cases = [
-                ("MWF    930-1020", "MWF 9:30-10:20"),
-                ("TTh    1230-120", "TTh 12:30-1:20"),
-                ("to be arranged", "TBA")
+                ("MWF    930-1020", (570, 620)),
+                ("TTh    1230-120", (750, 800)),
+                ("1030-120", (630, 800)),
+                ("630-920P", (1110, 1280)),
+                ("800-950P", (1200, 1310)),
+                ("to be arranged", (None, None))
             ]
             
             for input_time, expected in test_cases:
                 result = _parse_time_slot(input_time)
                 print(f"\nTime slot: '{input_time}' -> '{result}'")
+                assert result == expected, f"Expected {expected}, got {result}"
                 
         except NotImplementedError:
             pytest.skip("Function not yet implemented")
     
+    def test_parse_days(self):
+        """Test day mask parsing."""
+        if not PARSER_AVAILABLE:
+            pytest.skip("Parser functions not yet implemented")
+        
+        test_cases = [
+            ("MWF", 0b10101),
+            ("TTh", 0b01010),
+            ("MTWThF", 0b11111),
+            ("Sa", 0b100000),
+            ("to be arranged", 0)
+        ]
+        
+        for input_days, expected in test_cases:
+            result = _parse_days(input_days)
+            print(f"\nDays: '{input_days}' -> {result:07b}")
+            assert result == expected, f"Expected {expected:07b}, got {result:07b}"
+    
     def test_parse_enrollment_numbers(self):
         """Test enrollment number parsing."""
         if not PARSER_AVAILABLE:
@@ -0,0 +1,198 @@
+"""
+Tests for fetching time schedule pages from the local stand-in server.
+"""
+
+import csv
+import json
+
+import pytest
+
+from swecc_course_scraper import departments, quarters
+from swecc_course_scraper.commands import frequency, frequency_dept, schedule
+from swecc_course_scraper.offerings import OfferingIndex
+
+
+class TestSchedule:
+    """Test the schedule command and the SWECC_SCHEDULE_URL override."""
+
+    def test_schedule_root_override(self, monkeypatch):
+        monkeypatch.delenv(schedule.SCHEDULE_ENV, raising=False)
+        assert schedule.schedule_root() == schedule.SCHEDULE
+        monkeypatch.setenv(schedule.SCHEDULE_ENV, "http://127.0.0.1:8000/timeschd")
+        assert schedule.schedule_root() == "http://127.0.0.1:8000/timeschd/"
+
+    def test_saved_and_synthetic_pages(self, server):
+        server.synthesize("cse", "AUT", 2024, courses=3)
+
+        assert "MATHEMATICS" in schedule.command("math", "WIN", 2023)
+        assert "name=cse102" in schedule.command("CSE", "aut", 2024).lower()
+        pages = {path: n for path, n in server.paths.items() if path.endswith(".html")}
+        assert pages == {"/WIN2023/math.html": 1, "/AUT2024/cse.html": 1}
+
+    def test_missing_quarter(self, server):
+        with pytest.raises(FileNotFoundError):
+            schedule.command("math", "WIN", 2022)
+
+    def test_connection_reset(self, server):
+        server.reset_rate = 1.0
+        with pytest.raises(ConnectionError):
+            schedule.command("math", "WIN", 2023)
+
+    def test_transient_errors_are_retried(self, server):
+        departments.check_department("math", "WIN", 2023)
+        requests = server.requests
+        server.script_faults("error", "reset")
+        assert "MATHEMATICS" in schedule.command("math", "WIN", 2023)
+        assert server.requests - requests == 3
+
+    def test_frequency(self, server, monkeypatch):
+        monkeypatch.setattr(frequency, "CURRENT_YEAR", 2023)
+        result = frequency.command("math124", 3)
+
+        assert "Offered 4 times for 12 quarters" in result
+        assert "- SPR 2021" in result
+        assert "- WIN 2023" in result
+
+    def test_frequency_reuses_the_index(self, server, monkeypatch):
+        monkeypatch.setattr(frequency, "CURRENT_YEAR", 2023)
+        first = frequency.command("math124", 3)
+        requests = server.requests
+        assert frequency.command("math124", 3) == first
+        assert "- SPR 2021" in frequency.command("math126", 3)
+
+        # Only this year's missing quarter (SPR 2023) is fetched again
+        assert server.requests - requests == 2
+
+    def test_frequency_reports_unreachable_quarters(self, server, monkeypatch):
+        monkeypatch.setattr(frequency, "CURRENT_YEAR", 2023)
+        departments.check_department("math")
+        server.script_faults(*["error"] * 4)  # Every attempt at WIN 2023 fails
+        result = frequency.command("math124", 1)
+
+        assert "Offered 2 times for 3 quarters" in result
+        assert "Could not fetch 1 quarters (not counted):\n- WIN 2023" in result
+
+    def test_frequency_retries_failed_quarters(self, server, monkeypatch):
+        monkeypatch.setattr(frequency, "CURRENT_YEAR", 2023)
+        departments.check_department("math")
+        server.script_faults(*["error"] * 4)  # Every attempt at WIN 2023 fails
+        frequency.command("math124", 2)
+        requests = server.requests
+
+        # Only the failed WIN 2023 and unpublished SPR 2023 are fetched again
+        result = frequency.command("math124", 2)
+        assert "Offered 3 times for 8 quarters" in result
+        assert "Could not fetch" not in result
+        assert server.requests - requests == 2
+
+    def test_current_year_pages_are_refreshed(self, server, monkeypatch):
+        monkeypatch.setattr(frequency, "CURRENT_YEAR", 2023)
+        index = OfferingIndex.load()
+        frequency.update_index(index, "math", 2022)
+        requests = server.requests
+
+        # Within max_age nothing but the unpublished SPR 2023 is fetched again
+        frequency.update_index(index, "math", 2022)
+        assert server.requests - requests == 1
+
+        server.add_page("math", "WIN", 2023, "<A NAME=math999>")
+        assert frequency.update_index(index, "math", 2022, max_age=0) == (8, [])
+        assert server.requests - requests == 5  # Every 2023 quarter, none of 2022
+        assert index.offerings("math999", 2023, 2023) == [("WIN", 2023)]
+        assert ("WIN", 2023) not in index.offerings("math124", 2023, 2023)
+
+    def test_frequency_dept_matrix(self, server, monkeypatch):
+        monkeypatch.setattr(frequency, "CURRENT_YEAR", 2023)
+        monkeypatch.setattr(frequency_dept, "CURRENT_YEAR", 2023)
+        rows = list(csv.DictReader(frequency_dept.command("math", 3).splitlines()))
+        requests = server.requests
+
+        math124 = next(row for row in rows if row["course_code"] == "MATH124")
+        assert math124["offered"] == "4"
+        assert math124["SPR 2021"] == "1"
+        assert math124["WIN 2023"] == "1"
+        assert "SPR 2023" not in math124  # Not published yet
+
+        # The index built for the department answers single courses too
+        assert "Offered 4 times for 12 quarters" in frequency.command("math124", 3)
+        data = json.loads(frequency_dept.command("math", 3, "json"))
+        assert server.requests - requests == 2  # Only SPR 2023 is retried
+        assert [c["course_code"] for c in data["courses"]] == [
+            row["course_code"] for row in rows
+        ]
+
+
+class TestQuarters:
+    """Test probing which quarters have been published."""
+
+    def test_parse_latest_quarter(self):
+        html = '<a href="SPR2023/">Spring</a> <A HREF=/timeschd/AUT2022/>Autumn</A>'
+        assert quarters.parse_latest_quarter(html) == ("SPR", 2023)
+        assert quarters.parse_latest_quarter("<a href=WIN.html>") is None
+
+    def test_published_quarters(self):
+        assert quarters.published_quarters(2023, ("SPR", 2023)) == ["WIN", "SPR"]
+        assert quarters.published_quarters(2022, ("SPR", 2023)) == [
+            "WIN",
+            "SPR",
+            "SUM",
+            "AUT",
+        ]
+        assert quarters.published_quarters(2024, ("SPR", 2023)) == []
+        assert quarters.published_quarters(2024, None) == ["WIN", "SPR", "SUM", "AUT"]
+
+    def test_latest_quarter_is_cached(self, server):
+        assert quarters.latest_quarter() == ("AUT", 2023)
+        server.add_page("math", "WIN", 2024, "")
+        assert quarters.latest_quarter() == ("AUT", 2023)
+        assert server.requests == 1
+
+        assert quarters.latest_quarter(max_age=0) == ("WIN", 2024)
+        server.script_faults(*["error"] * 4)
+        assert quarters.latest_quarter(max_age=0) == ("WIN", 2024)  # Stale copy
+
+    def test_latest_quarter_saves_through_its_own_temp_file(self, server, tmp_path):
+        # Where the cache used to be staged, as if another process were saving it
+        (tmp_path / "quarters.tmp").mkdir()
+        assert quarters.latest_quarter() == ("AUT", 2023)
+        assert sorted(path.name for path in tmp_path.iterdir()) == [
+            "quarters.json",
+            "quarters.tmp",
+        ]
+
+    def test_frequency_skips_unpublished_quarters(self, server, monkeypatch):
+        monkeypatch.setattr(frequency, "CURRENT_YEAR", 2023)
+        del server.pages[("math", "SUM", 2023)]
+        del server.pages[("math", "AUT", 2023)]
+        result = frequency.command("math124", 1)
+
+        assert "Offered 1 times for 1 quarters" in result
+        assert server.requests == 3  # The index page, WIN 2023's list and its math page
+
+
+class TestDepartments:
+    """Test rejecting unknown departments before fetching their pages."""
+
+    def test_unknown_department(self, server, monkeypatch):
+        monkeypatch.setattr(frequency, "CURRENT_YEAR", 2023)
+        with pytest.raises(ValueError, match="did you mean math"):
+            schedule.command("mth", "WIN", 2023)
+        requests = server.requests
+
+        # The directory is reused, so the typo costs no further requests
+        with pytest.raises(ValueError, match="Unknown department: mth"):
+            frequency.command("mth124", 10)
+        assert server.requests == requests
+        assert not any(path.endswith(".html") for path in server.paths)
+
+    def test_current_year_lists_are_refreshed(self, server, monkeypatch):
+        monkeypatch.setattr(departments, "CURRENT_YEAR", 2023)
+        assert departments.quarter_departments("WIN", 2023) == {"math": "math.html"}
+        server.synthesize("cse", "WIN", 2023, courses=1)
+        with pytest.raises(ValueError):
+            schedule.command("cse", "WIN", 2023)
+
+        departments.load_directory().fetched[
+            "WIN 2023"
+        ] -= departments.DEPARTMENTS_MAX_AGE
+        assert "name=cse100" in schedule.command("cse", "WIN", 2023).lower()
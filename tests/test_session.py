@@ -0,0 +1,56 @@
+"""
+Tests for persisting DawgPath session cookies.
+"""
+
+import stat
+import time
+
+import pytest
+
+from swecc_course_scraper.paths import DATA_DIR_ENV
+from swecc_course_scraper.session import (
+    clear_session,
+    load_session,
+    save_cookies,
+    session_path,
+)
+
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv(DATA_DIR_ENV, str(tmp_path))
+    return tmp_path
+
+
+class TestSessionFile:
+    """Test saving, loading and clearing the session file."""
+
+    def test_round_trip(self):
+        save_cookies([{"name": "sessionid", "value": "abc", "domain": "dawgpath.uw.edu"}])
+        session = load_session()
+        assert session is not None
+        assert session.cookies.get("sessionid") == "abc"
+
+    def test_file_is_private(self):
+        save_cookies([{"name": "sessionid", "value": "abc"}])
+        assert stat.S_IMODE(session_path().stat().st_mode) == 0o600
+
+    def test_saves_through_its_own_temp_file(self, data_dir):
+        # Where the session used to be staged, as if another process were saving it
+        (data_dir / "dawgpath_session.tmp").mkdir()
+        save_cookies([{"name": "sessionid", "value": "abc"}])
+        assert sorted(path.name for path in data_dir.iterdir()) == [
+            "dawgpath_session.json",
+            "dawgpath_session.tmp",
+        ]
+
+    def test_missing_or_expired(self):
+        assert load_session() is None
+        save_cookies([{"name": "sessionid", "value": "abc", "expiry": time.time() - 1}])
+        assert load_session() is None
+
+    def test_clear(self):
+        save_cookies([{"name": "sessionid", "value": "abc"}])
+        clear_session()
+        assert load_session() is None
+        clear_session()
@@ -0,0 +1,182 @@
+"""
+Tests for watching schedule pages for section changes.
+"""
+
+import io
+import threading
+
+import pytest
+
+from swecc_course_scraper import watch
+from swecc_course_scraper.commands import watch as watch_command
+from swecc_course_scraper.crawl import DONE, CrawlJob, CrawlManifest
+from swecc_course_scraper.fetch import HOT, FetchScheduler
+from swecc_course_scraper.watch import (
+    ADDED,
+    CHANGED,
+    REMOVED,
+    SectionState,
+    Watcher,
+    diff_sections,
+)
+from tests.servers.schedule import synthetic_page
+
+FIRST_SECTION = "Open     20/  40"  # Enrollment of SLN 10000 in a synthetic page
+# Synthetic pages the server fixture serves: (department, quarter, year, courses)
+WATCHED_PAGES = [("cse", "AUT", 2023, 5)]
+
+
+def test_diff_sections():
+    before = {
+        "1": SectionState("CSE 142", "A", "Open", 10, 20),
+        "2": SectionState("CSE 142", "B", "Open", 10, 20),
+    }
+    after = {
+        "1": SectionState("CSE 142", "A", "Closed", 20, 20),
+        "3": SectionState("CSE 142", "C", "Open", 0, 20),
+    }
+    events = list(diff_sections(before, after))
+    assert [(event["event"], event["sln"]) for event in events] == [
+        (CHANGED, "1"),
+        (REMOVED, "2"),
+        (ADDED, "3"),
+    ]
+    assert events[0]["previous"] == {
+        "status": "Open",
+        "enrolled": 10,
+        "capacity": 20,
+    }
+    assert list(diff_sections(after, after)) == []
+
+
+@pytest.mark.parametrize("server", [WATCHED_PAGES], indirect=True, ids=["cse"])
+class TestWatcher:
+    """Test polling pages and reporting section changes."""
+
+    def test_unchanged_pages_are_not_parsed(self, server):
+        watcher = Watcher(["cse", "math"], "AUT", 2023)
+        assert watcher.poll() == []  # The first poll only records the pages
+        assert watcher.poll() == []
+        assert watcher.stats.parsed == 2
+        assert watcher.stats.not_modified == 2
+        assert server.not_modified_sent == 2
+
+    def test_changes_become_events(self, server):
+        watcher = Watcher(["cse", "math"], "AUT", 2023)
+        watcher.poll()
+        html = synthetic_page("cse", "AUT", 2023, courses=5)
+        server.add_page(
+            "cse", "AUT", 2023, html.replace(FIRST_SECTION, "Closed   40/  40", 1)
+        )
+
+        (event,) = watcher.poll()
+        assert event["event"] == CHANGED
+        assert (event["department"], event["quarter"], event["year"]) == (
+            "cse",
+            "AUT",
+            2023,
+        )
+        assert (event["sln"], event["status"], event["enrolled"]) == (
+            "10000",
+            "Closed",
+            40,
+        )
+        assert event["previous"]["status"] == "Open"
+        assert watcher.stats.parsed == 3
+
+    def test_body_hash_without_validators(self, server):
+        server.validators = False
+        watcher = Watcher(["cse"], "AUT", 2023)
+        watcher.poll()
+        assert watcher.poll() == []
+        assert (watcher.stats.parsed, watcher.stats.unchanged) == (1, 1)
+
+    def test_missing_pages_are_retried(self, server):
+        watcher = Watcher(["chem"], "AUT", 2023)
+        assert watcher.poll() == []
+        server.synthesize("chem", "AUT", 2023, courses=1)
+        watcher.poll()
+        assert (watcher.stats.errors, watcher.stats.parsed) == (1, 1)
+
+    def test_pages_that_fail_to_parse_are_retried(self, server, monkeypatch):
+        watcher = Watcher(["cse"], "AUT", 2023)
+
+        def broken_parser(*args):
+            raise AttributeError("unexpected page layout")
+
+        with monkeypatch.context() as patch:
+            patch.setattr(watch, "iter_schedule_html", broken_parser)
+            assert watcher.poll() == []
+
+        watcher.poll()
+        assert (watcher.stats.errors, watcher.stats.parsed) == (1, 1)
+        assert watcher.stats.not_modified == 0
+
+    def test_run_and_command(self, server):
+        sleeps = []
+        watcher = Watcher(["cse"], "AUT", 2023)
+
+        def change_page(seconds):
+            sleeps.append(seconds)
+            server.synthesize("cse", "AUT", 2023, courses=4)
+
+        events = []
+        stats = watcher.run(events.append, interval=60, polls=2, sleep=change_page)
+        assert len(sleeps) == 1
+        assert {event["event"] for event in events} == {REMOVED}
+        assert stats.events == len(events) == 3  # The last course's sections
+
+        output = io.StringIO()
+        summary = watch_command.command(
+            ["CSE"], "aut", 2023, interval=0, polls=2, output=output
+        )
+        assert output.getvalue() == ""
+        assert "2 polls" in summary and "1 not modified" in summary
+
+    def test_scheduled_polls(self, server):
+        watcher = Watcher(["cse", "math"], "AUT", 2023)
+        scheduler = FetchScheduler(100)
+        stats = watcher.run_scheduled(scheduler, print, interval=0.01, polls=3)
+        assert stats.polls == 3
+        assert stats.parsed == 2
+        assert scheduler.stats.granted == {HOT: stats.fetches}
+
+    def test_backfill(self, server, tmp_path):
+        output = str(tmp_path / "history.sqlite")
+        stats = watch_command.backfill(
+            output,
+            FetchScheduler(100),
+            threading.Event(),
+            first_year=2021,
+            departments=["math"],
+            watched=("AUT", 2023),
+        )
+        assert stats.done == 3
+        manifest = CrawlManifest(f"{output}{watch_command.MANIFEST_SUFFIX}")
+        assert CrawlJob("math", "AUT", 2023) not in manifest.jobs(DONE)
+
+    def test_command_with_backfill(self, server, tmp_path):
+        summary = watch_command.command(
+            ["cse"],
+            "AUT",
+            2023,
+            interval=0.05,
+            polls=2,
+            output=io.StringIO(),
+            budget=100,
+            backfill_output=str(tmp_path / "history.jsonl"),
+            backfill_since=2021,
+            backfill_departments=["math"],
+        )
+        assert "Backfilled" in summary
+        assert "2 polls" in summary
+        with pytest.raises(ValueError):
+            watch_command.command(
+                ["cse"], "AUT", 2023, backfill_output=str(tmp_path / "history.csv")
+            )
+
+    def test_command_rejects_unknown_departments(self, server):
+        with pytest.raises(ValueError):
+            watch_command.command(["cs"], "AUT", 2023, polls=1)
+        with pytest.raises(ValueError):
+            watch_command.command([], "AUT", 2023, polls=1)